@@ -0,0 +1,44 @@
+"""
+Budget optimizer scale.
+
+Fits revenue-vs-spend log curves for 5k synthetic campaigns x 90 days in
+one batch and solves the water-filling allocation under the total
+budget (target: fit + allocate < 1 s).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from agents import budget_optimizer
+
+CAMPAIGNS = 5_000
+DAYS = 90
+
+
+def run():
+    rng = np.random.default_rng(0)
+    base = rng.uniform(50, 2000, CAMPAIGNS)
+    spend = base[:, None] * rng.uniform(0.3, 1.7, (CAMPAIGNS, DAYS))
+    beta = rng.uniform(50, 5000, CAMPAIGNS)
+    revenue = beta[:, None] * np.log1p(spend / base[:, None]) * rng.uniform(0.8, 1.2, spend.shape)
+    spend[rng.random(spend.shape) < 0.1] = np.nan
+    campaigns = [f"campaign_{i:05d}" for i in range(CAMPAIGNS)]
+
+    t0 = time.perf_counter()
+    result = budget_optimizer.optimize(campaigns, {"spend": spend, "revenue": revenue})
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "campaigns": CAMPAIGNS,
+        "days": DAYS,
+        "optimized": result["campaigns_optimized"],
+        "expected_lift_pct": round(result["expected_daily_revenue"]["lift_pct"] * 100, 2),
+        "optimize_sec": round(elapsed, 4),
+        "targets": {"optimize_sec": 1.0},
+    }
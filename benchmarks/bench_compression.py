@@ -0,0 +1,90 @@
+"""
+Compressed-input throughput benchmark.
+
+For each codec (plain, gzip, block gzip with parallel inflate, zstd when
+`zstandard` is installed) reports, in uncompressed MB/s:
+- decompress_mb_s: draining the decompressed stream only
+- load_mb_s:       full DataAgent.load() (decompress + parse + clean)
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from agents.data_agent import DataAgent
+from agents.sources import open_source, write_block_gzip
+
+DATA = os.path.join(ROOT_DIR, "data", "synthetic_fb_ads_undergarments.csv")
+REPEAT = 20
+WORKERS = 4
+
+
+def _payload():
+    with open(DATA, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    return header + body * REPEAT
+
+
+def _write_inputs(tmp, data):
+    files = {"plain": os.path.join(tmp, "ads.csv")}
+    with open(files["plain"], "wb") as f:
+        f.write(data)
+
+    files["gzip"] = os.path.join(tmp, "ads.csv.gz")
+    with gzip.open(files["gzip"], "wb", compresslevel=6) as f:
+        f.write(data)
+
+    files["gzip_block"] = os.path.join(tmp, "blocks", "ads.csv.gz")
+    os.makedirs(os.path.dirname(files["gzip_block"]))
+    write_block_gzip(files["gzip_block"], data)
+
+    try:
+        import zstandard
+        files["zstd"] = os.path.join(tmp, "ads.csv.zst")
+        with open(files["zstd"], "wb") as f:
+            f.write(zstandard.ZstdCompressor(level=3).compress(data))
+    except ImportError:
+        pass
+    return files
+
+
+def _best_of(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _drain(path):
+    with open_source(path, workers=WORKERS) as fh:
+        while fh.read(1 << 20):
+            pass
+
+
+def run():
+    data = _payload()
+    mb = len(data) / 1e6
+    results = {"uncompressed_mb": round(mb, 2), "codecs": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec, path in _write_inputs(tmp, data).items():
+            t_drain = _best_of(lambda: _drain(path))
+            t_load = _best_of(lambda: DataAgent(path, config={"decompress_workers": WORKERS}).load(), repeats=2)
+            results["codecs"][codec] = {
+                "ratio": round(len(data) / os.path.getsize(path), 2),
+                "decompress_mb_s": round(mb / t_drain, 1),
+                "load_mb_s": round(mb / t_load, 1),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    print(run())
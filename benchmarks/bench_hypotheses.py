@@ -0,0 +1,81 @@
+"""
+Hypothesis representation memory.
+
+Holds N synthetic CTR-drop hypotheses (plus their evaluation) once as the
+usual list of dicts and once as a columnar HypothesisBatch, and reports the
+tracemalloc-measured bytes retained by each plus evaluator time
+(target: the batch needs <= 15% of the dicts' memory).
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from agents.evaluator import EvaluatorAgent
+from agents.hypotheses import HypothesisBatch
+
+N = 200_000
+CAMPAIGNS = 5_000
+
+
+def _columns():
+    rng = np.random.default_rng(0)
+    names = [f"campaign_{i % CAMPAIGNS}_slice_{i}" for i in range(N)]
+    return names, -rng.random(N) * 0.05, rng.random(N) * 0.04, rng.integers(3, 365, N)
+
+
+def _dicts(names, trend, mean, n):
+    return [
+        {
+            "id": f"ctr_drop_{c}",
+            "hypothesis": "CTR is falling — creative fatigue or weak messaging",
+            "campaign": c,
+            "metric": "ctr",
+            "direction": "decrease",
+            "evidence": {"campaign": c, "trend": float(t), "mean": float(m), "n": int(k)},
+        }
+        for c, t, m, k in zip(names, trend, mean, n)
+    ]
+
+
+def _batch(names, trend, mean, n):
+    return HypothesisBatch.of("ctr_drop", campaigns=names, trend=trend, mean=mean, n=n)
+
+
+def _measure(build, evaluator, columns):
+    """(retained bytes, validate seconds) for candidates + validated results."""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    candidates = build(*columns)
+    t0 = time.perf_counter()
+    validated = evaluator.validate(candidates)
+    elapsed = time.perf_counter() - t0
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del candidates, validated
+    return retained, elapsed
+
+
+def run():
+    columns = _columns()
+    evaluator = EvaluatorAgent(pd.DataFrame(), {})
+    dict_bytes, dict_sec = _measure(_dicts, evaluator, columns)
+    batch_bytes, batch_sec = _measure(_batch, evaluator, columns)
+    return {
+        "hypotheses": N,
+        "dict_mb": round(dict_bytes / 2**20, 1),
+        "batch_mb": round(batch_bytes / 2**20, 1),
+        "dict_bytes_per_hypothesis": round(dict_bytes / N),
+        "batch_bytes_per_hypothesis": round(batch_bytes / N),
+        "batch_memory_ratio": round(batch_bytes / dict_bytes, 4),
+        "dict_validate_sec": round(dict_sec, 4),
+        "batch_validate_sec": round(batch_sec, 4),
+        "targets": {"batch_memory_ratio": 0.15},
+    }
@@ -0,0 +1,94 @@
+"""
+SQLite execution backend vs the pandas path.
+
+- 1M synthetic rows (2k campaigns x 365 days, subsampled): bulk load into
+  SQLite, then the aggregates the pipeline pushes down -- daily totals,
+  per-campaign totals with first/last day, summary() tables -- as pandas
+  groupby on the frame vs GROUP BY queries on the indexed table.
+- tracemalloc peak of each aggregation pass (target: the SQL pass allocates
+  <= 25% of the pandas pass). SQLite is slower than an in-memory groupby;
+  what it saves is the Python-side memory of the intermediate groups.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from agents.sql_store import SqlStore
+
+ROWS = 1_000_000
+CAMPAIGNS = 2_000
+DAYS = 365
+METRICS = ["spend", "impressions", "clicks", "purchases", "revenue"]
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    campaign = rng.integers(0, CAMPAIGNS, ROWS)
+    day = rng.integers(0, DAYS, ROWS)
+    df = pd.DataFrame({
+        "campaign_name": np.char.add("campaign_", campaign.astype(str)).astype(object),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(day, unit="D"),
+    })
+    for m in METRICS:
+        df[m] = rng.gamma(2.0, 50.0, ROWS)
+    return df
+
+
+def _pandas_aggregates(df):
+    daily = df.groupby("date")[["spend", "revenue"]].sum()
+    per_campaign = df.groupby("campaign_name").agg(
+        impressions=("impressions", "sum"), clicks=("clicks", "sum"),
+        first_date=("date", "min"), last_date=("date", "max"))
+    ts = df.groupby("date")[METRICS].sum()
+    cs = df.groupby("campaign_name")[METRICS].sum()
+    return len(daily) + len(per_campaign) + len(ts) + len(cs)
+
+
+def _sql_aggregates(store):
+    daily = store.daily_totals(("spend", "revenue"))
+    per_campaign = store.campaign_totals(("impressions", "clicks"))
+    return len(daily) + len(per_campaign) + len(store.timeseries()) + len(store.campaign_summary())
+
+
+def _measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    n = fn(*args)
+    sec = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return n, sec, peak / 1e6
+
+
+def run():
+    df = _frame()
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        store = SqlStore.create(os.path.join(tmp, "metrics.sqlite"), df)
+        load_sec = time.perf_counter() - t0
+
+        _pandas_aggregates(df)  # warm up
+        n_pd, pd_sec, pd_mb = _measure(_pandas_aggregates, df)
+        n_sql, sql_sec, sql_mb = _measure(_sql_aggregates, store)
+        store.close()
+
+    assert n_pd == n_sql
+    return {
+        "rows": ROWS,
+        "sqlite_bulk_load_sec": round(load_sec, 3),
+        "pandas_aggregate_sec": round(pd_sec, 4),
+        "sql_aggregate_sec": round(sql_sec, 4),
+        "pandas_aggregate_peak_mb": round(pd_mb, 2),
+        "sql_aggregate_peak_mb": round(sql_mb, 2),
+        "sql_memory_ratio": round(sql_mb / pd_mb, 4),
+        "targets": {"sql_memory_ratio": 0.25},
+    }
@@ -0,0 +1,95 @@
+"""
+CLI startup benchmark.
+
+- `python -X importtime src/run.py --help`: total import time and the
+  slowest top-level imports; heavy libraries must not appear here.
+- Time from process start to the first structured log line of a real run
+  on the bundled sample dataset.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PY = os.path.join(ROOT_DIR, "src", "run.py")
+
+HELP_TARGET_SEC = 0.3
+FIRST_LOG_TARGET_SEC = 0.25
+HEAVY_MODULES = ("pandas", "numpy", "sklearn", "scipy")
+
+
+def _importtime_help():
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", RUN_PY, "--help"],
+        capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - t0
+
+    total_us = 0
+    seen = set()
+    top_level = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        seen.add(name.strip().split(".")[0])
+        # nested imports are indented by two extra spaces per level
+        if len(name) - len(name.lstrip()) == 1:
+            top_level.append((name.strip(), int(cumulative_us)))
+
+    top_level.sort(key=lambda x: -x[1])
+    heavy = sorted(seen & set(HEAVY_MODULES))
+    return wall, total_us / 1e6, top_level[:5], heavy
+
+
+def _first_log_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = os.path.join(tmp, "cfg.yaml")
+        with open(cfg, "w", encoding="utf-8") as f:
+            f.write(
+                f"data_csv: {os.path.join(ROOT_DIR, 'data', 'sample_fb_ads.csv')}\n"
+                f"logs_dir: {os.path.join(tmp, 'logs')}\n"
+                f"output_dir: {os.path.join(tmp, 'reports')}\n"
+                f"insights_file: {os.path.join(tmp, 'reports', 'insights.json')}\n"
+                f"creatives_file: {os.path.join(tmp, 'reports', 'creatives.json')}\n"
+                f"report_file: {os.path.join(tmp, 'reports', 'report.md')}\n"
+            )
+
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, RUN_PY, "benchmark startup", "--config", cfg],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd=tmp,
+        )
+        first_log = None
+        for line in proc.stdout:
+            if first_log is None and line.startswith("[INFO]"):
+                first_log = time.perf_counter() - t0
+        proc.wait()
+        total = time.perf_counter() - t0
+    return first_log, total
+
+
+def run():
+    help_wall, import_sec, top_imports, heavy = _importtime_help()
+    first_log, run_total = _first_log_line()
+    return {
+        "help_wall_sec": round(help_wall, 4),
+        "help_import_sec": round(import_sec, 4),
+        "help_top_imports": [{"module": n, "cumulative_sec": round(us / 1e6, 4)} for n, us in top_imports],
+        "help_heavy_imports": heavy,
+        "first_log_line_sec": round(first_log, 4) if first_log is not None else None,
+        "full_run_sec": round(run_total, 4),
+        "targets": {
+            "help_wall_sec": HELP_TARGET_SEC,
+            "first_log_line_sec": FIRST_LOG_TARGET_SEC,
+        },
+    }
+
+
+if __name__ == "__main__":
+    print(run())
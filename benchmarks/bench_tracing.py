@@ -0,0 +1,69 @@
+"""
+Tracing overhead.
+
+- Cost of one `with tracer.span(...)` block: NULL_TRACER (tracing off),
+  a Tracer recording every span, and a Tracer sampling 1% of per-group
+  spans.
+- Load, insights and evaluation on the bundled dataset with tracing off and on
+  (target: a disabled span costs <= 1 us, and full tracing adds <= 10%
+  to the pipeline).
+"""
+
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from agents.data_agent import DataAgent
+from agents.evaluator import EvaluatorAgent
+from agents.insight_agent import InsightAgent
+from agents.tracing import NULL_TRACER, Tracer
+
+DATA = os.path.join(ROOT_DIR, "data", "synthetic_fb_ads_undergarments.csv")
+SPANS = 200_000
+REPEATS = 5
+
+
+def _span_ns(tracer):
+    t0 = time.perf_counter_ns()
+    for i in range(SPANS):
+        with tracer.span("group", sampled=True, campaign=i):
+            pass
+    return (time.perf_counter_ns() - t0) / SPANS
+
+
+def _pipeline_sec(df, make_tracer):
+    best = float("inf")
+    for _ in range(REPEATS):
+        tracer = make_tracer()
+        t0 = time.perf_counter()
+        agent = DataAgent(DATA, tracer=tracer)
+        agent.load()
+        candidates = InsightAgent(df, {}, tracer=tracer).candidate_batch()
+        EvaluatorAgent(df, {}, tracer=tracer).validate(candidates)
+        best = min(best, time.perf_counter() - t0)
+    return best, len(tracer.events)
+
+
+def run():
+    df = DataAgent(DATA).load()
+
+    off_ns = _span_ns(NULL_TRACER)
+    on_ns = _span_ns(Tracer())
+    sampled_ns = _span_ns(Tracer(sample_rate=0.01))
+
+    _pipeline_sec(df, lambda: NULL_TRACER)  # warm lazy imports first
+    off_sec, _ = _pipeline_sec(df, lambda: NULL_TRACER)
+    on_sec, spans = _pipeline_sec(df, Tracer)
+    return {
+        "disabled_span_us": round(off_ns / 1000, 4),
+        "enabled_span_us": round(on_ns / 1000, 4),
+        "sampled_1pct_span_us": round(sampled_ns / 1000, 4),
+        "pipeline_untraced_sec": round(off_sec, 4),
+        "pipeline_traced_sec": round(on_sec, 4),
+        "pipeline_spans": spans,
+        "tracing_overhead_ratio": round(on_sec / off_sec - 1.0, 4),
+        "targets": {"disabled_span_us": 1.0, "tracing_overhead_ratio": 0.1},
+    }
@@ -0,0 +1,60 @@
+"""
+Benchmark suite runner.
+
+Discovers every benchmarks/bench_*.py module, calls its run() function and
+prints one result block per benchmark. A benchmark returns a dict of
+measurements; an optional "targets" entry maps measurement -> upper bound,
+and any measurement above its target marks the suite as failed.
+
+Usage:
+    python benchmarks/run_all.py            # all benchmarks
+    python benchmarks/run_all.py startup    # only bench_startup.py
+"""
+
+import importlib.util
+import json
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+
+def _load(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main(selected=None):
+    failed = []
+    for fname in sorted(os.listdir(BENCH_DIR)):
+        if not (fname.startswith("bench_") and fname.endswith(".py")):
+            continue
+        short = fname[len("bench_"):-len(".py")]
+        if selected and short not in selected:
+            continue
+
+        result = _load(os.path.join(BENCH_DIR, fname)).run()
+        targets = result.pop("targets", {})
+        misses = {k: {"value": result.get(k), "target": v} for k, v in targets.items() if result.get(k, 0) > v}
+
+        print(f"## {short}")
+        print(json.dumps(result, indent=2, default=str))
+        if targets:
+            print(f"targets: {json.dumps(targets)} -> {'MISSED ' + json.dumps(misses) if misses else 'ok'}")
+        print()
+        if misses:
+            failed.append(short)
+
+    if failed:
+        print(f"[!] targets missed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,161 @@
+import numpy as np
+
+INPUT_COLUMNS = ("spend", "revenue")
+
+
+def config_params(config):
+    """optimize() keyword arguments from the budget_* config keys."""
+    total = config.get("budget_total")
+    return {
+        "total": None if total is None else float(total),
+        "max_change": float(config.get("budget_max_change", 0.5)),
+        "min_days": int(config.get("budget_min_days", 7)),
+    }
+
+
+# kappa candidates, as multiples of each campaign's mean daily spend
+KAPPA_GRID = np.geomspace(0.05, 20.0, 49)
+# F statistic of the error reduction a grid kappa needs to replace kappa = mean spend
+# (one extra parameter; ~ p < 0.05 for a few weeks of days)
+KAPPA_MIN_F = 4.0
+
+
+def fit_log_curves(spend, revenue, grid=KAPPA_GRID, min_f=KAPPA_MIN_F):
+    """
+    Fit revenue = beta * log(1 + spend / kappa) for every campaign (row)
+    at once, over the days with spend. kappa (where returns start to
+    diminish) is searched over `grid` multiples of the campaign's mean
+    daily spend; for each candidate, beta is the closed-form least-squares
+    slope through the origin, and each campaign keeps the candidate with
+    the lowest squared error. Flat or noisy spend says little about
+    curvature, so kappa stays at the mean spend unless the best candidate
+    lowers the error significantly (F statistic >= `min_f` for the extra
+    parameter). Returns (beta, kappa, r2, days).
+    """
+    observed = ~np.isnan(spend) & ~np.isnan(revenue) & (np.nan_to_num(spend) > 0)
+    days = observed.sum(axis=1)
+    s = np.where(observed, spend, 0.0)
+    y = np.where(observed, revenue, 0.0)
+    n = len(s)
+
+    mean_spend = np.divide(s.sum(axis=1), days, out=np.zeros(n), where=days > 0)
+    syy = (y * y).sum(axis=1)
+
+    def fit(multiple):
+        kappa = mean_spend * multiple
+        x = np.log1p(np.divide(s, kappa[:, None], out=np.zeros(s.shape), where=kappa[:, None] > 0))
+        sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+        beta = np.maximum(np.divide(sxy, sxx, out=np.zeros(n), where=sxx > 0), 0.0)
+        return beta, kappa, syy - 2 * beta * sxy + beta * beta * sxx
+
+    beta, kappa, sse = fit(1.0)
+    best_beta, best_kappa, best_sse = beta.copy(), kappa.copy(), sse.copy()
+    for multiple in grid:
+        b, k, e = fit(multiple)
+        better = e < best_sse
+        best_beta[better], best_kappa[better], best_sse[better] = b[better], k[better], e[better]
+    gain = np.maximum(sse - best_sse, 0.0)
+    scale = np.divide(np.maximum(best_sse, 0.0), days - 2, out=np.zeros(n), where=days > 2)
+    moved = (days > 2) & (gain > min_f * scale)
+    beta = np.where(moved, best_beta, beta)
+    kappa = np.where(moved, best_kappa, kappa)
+    ss_res = np.where(moved, best_sse, sse)
+
+    y_mean = np.divide(y.sum(axis=1), days, out=np.zeros(n), where=days > 0)
+    ss_tot = (np.where(observed, y - y_mean[:, None], 0.0) ** 2).sum(axis=1)
+    r2 = 1.0 - np.divide(np.maximum(ss_res, 0.0), ss_tot, out=np.ones(n), where=ss_tot > 0)
+    return beta, kappa, r2, days
+
+
+def response(beta, kappa, spend):
+    """Expected daily revenue at `spend` under the fitted curves."""
+    return beta * np.log1p(np.divide(spend, kappa, out=np.zeros(len(kappa)), where=kappa > 0))
+
+
+def allocate(beta, kappa, lo, hi, total, iters=100):
+    """
+    Water-filling: maximise sum(beta * log(1 + s / kappa)) subject to
+    sum(s) = total and lo <= s <= hi. At the optimum every unclamped
+    campaign has the same marginal ROAS lambda = beta / (kappa + s), so
+    s(lambda) = clip(beta / lambda - kappa, lo, hi); lambda is found by
+    bisection (in log space) on the total, vectorised over campaigns.
+    """
+    if total <= lo.sum():
+        return lo * (total / lo.sum()) if lo.sum() > 0 else lo.copy()
+    if total >= hi.sum():
+        return hi.copy()
+
+    with np.errstate(divide="ignore"):
+        lam_hi = np.max(beta / (kappa + lo))   # everyone at lo
+        lam_lo = np.min(beta / (kappa + hi))   # everyone at hi
+    lam_lo, lam_hi = max(lam_lo, 1e-12), max(lam_hi, 1e-12)
+    for _ in range(iters):
+        lam = np.sqrt(lam_lo * lam_hi)
+        s = np.clip(beta / lam - kappa, lo, hi)
+        if s.sum() > total:
+            lam_lo = lam
+        else:
+            lam_hi = lam
+    s = np.clip(beta / np.sqrt(lam_lo * lam_hi) - kappa, lo, hi)
+    # close the bisection residual on the campaigns that are not clamped
+    free = (s > lo) & (s < hi)
+    if free.any():
+        s[free] += (total - s.sum()) / free.sum()
+    return s
+
+
+def optimize(campaigns, sums, total=None, max_change=0.5, min_days=7):
+    """
+    Recommended daily budget per campaign. Campaigns with at least
+    `min_days` days of spend and a positive fitted response move within
+    +-max_change of their current mean daily spend; the rest keep it.
+    `total` is the daily budget to distribute (default: the current total).
+    """
+    spend, revenue = sums["spend"], sums["revenue"]
+    beta, kappa, r2, days = fit_log_curves(spend, revenue)
+    observed = ~np.isnan(spend) & ~np.isnan(revenue) & (np.nan_to_num(spend) > 0)
+    # mean daily spend over active days
+    current = np.divide(np.where(observed, spend, 0.0).sum(axis=1), days, out=np.zeros(len(days)), where=days > 0)
+
+    eligible = (days >= min_days) & (beta > 0) & (current > 0)
+    fixed = current[~eligible].sum()
+    total = float(current.sum() if total is None else total)
+
+    recommended = current.copy()
+    if eligible.any():
+        lo = current[eligible] * (1 - max_change)
+        hi = current[eligible] * (1 + max_change)
+        recommended[eligible] = allocate(beta[eligible], kappa[eligible], lo, hi, max(total - fixed, 0.0))
+
+    current_rev = response(beta, kappa, current)
+    recommended_rev = response(beta, kappa, recommended)
+    marginal = np.divide(beta, kappa + recommended, out=np.zeros(len(beta)), where=(kappa + recommended) > 0)
+
+    allocations = [
+        {
+            "campaign": c,
+            "current_daily_spend": float(cur),
+            "recommended_daily_spend": float(rec),
+            "change_pct": float((rec - cur) / cur) if cur > 0 else 0.0,
+            "marginal_roas": float(m),
+            "expected_daily_revenue": float(rv),
+            "curve": {"beta": float(b), "kappa": float(k), "r2": float(q), "days": int(d)},
+            "optimized": bool(e),
+        }
+        for c, cur, rec, m, rv, b, k, q, d, e in zip(
+            campaigns, current, recommended, marginal, recommended_rev, beta, kappa, r2, days, eligible
+        )
+    ]
+    current_total = float(current_rev.sum())
+    recommended_total = float(recommended_rev.sum())
+    return {
+        "model": "revenue = beta * log(1 + spend / kappa)",
+        "total_daily_budget": total,
+        "campaigns_optimized": int(eligible.sum()),
+        "expected_daily_revenue": {
+            "current": current_total,
+            "recommended": recommended_total,
+            "lift_pct": (recommended_total - current_total) / current_total if current_total > 0 else 0.0,
+        },
+        "allocations": allocations,
+    }
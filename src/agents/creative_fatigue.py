@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+LN2 = np.log(2.0)
+
+
+def config_params(config):
+    """detect() keyword arguments from the creative_fatigue_* config keys."""
+    return {
+        "min_days": int(config.get("creative_fatigue_min_days", 7)),
+        "min_impressions": float(config.get("creative_fatigue_min_impressions", 10000)),
+        "min_t": float(config.get("creative_fatigue_min_t", 2.0)),
+    }
+
+
+def exposure_days(df):
+    """
+    One row per (creative_message, day) with summed clicks / impressions and
+    the creative's exposure age: calendar days since the creative was first
+    seen in any campaign. Returned as arrays -- creative code, age, clicks,
+    impressions -- plus the creative names and each creative's main
+    campaign (most impressions). Rows are sorted by creative, then day.
+    """
+    dates = pd.to_datetime(df["date"], errors="coerce").to_numpy().astype("datetime64[D]")
+    keep = ~np.isnat(dates) & df["creative_message"].notna().to_numpy()
+    rows = df[keep]
+    day = dates[keep].astype(np.int64)
+    if not len(rows):
+        empty = np.zeros(0)
+        return np.zeros(0, np.int64), empty, empty, empty, [], []
+
+    codes, creatives = pd.factorize(rows["creative_message"].astype(str))
+    day -= day.min()
+    cells, inv = np.unique(codes.astype(np.int64) * (int(day.max()) + 1) + day, return_inverse=True)
+    creative, cell_day = np.divmod(cells, int(day.max()) + 1)
+    clicks = np.bincount(inv, weights=np.nan_to_num(rows["clicks"].to_numpy(dtype=np.float64)))
+    impressions = np.bincount(inv, weights=np.nan_to_num(rows["impressions"].to_numpy(dtype=np.float64)))
+
+    # cells are sorted by creative, so each creative's first day opens its run
+    starts = np.flatnonzero(np.r_[True, creative[1:] != creative[:-1]])
+    age = cell_day - np.repeat(cell_day[starts], np.diff(np.r_[starts, len(cells)]))
+
+    return creative, age.astype(np.float64), clicks, impressions, list(creatives), _main_campaigns(rows, codes, len(creatives))
+
+
+def _main_campaigns(rows, codes, n):
+    """Campaign with the most impressions for each creative code."""
+    c_codes, campaigns = pd.factorize(rows["campaign_name"].astype(str))
+    pairs, inv = np.unique(codes.astype(np.int64) * len(campaigns) + c_codes, return_inverse=True)
+    impressions = np.bincount(inv, weights=np.nan_to_num(rows["impressions"].to_numpy(dtype=np.float64)))
+    creative, campaign = np.divmod(pairs, len(campaigns))
+    order = np.lexsort((-impressions, creative))
+    first = order[np.r_[True, creative[order][1:] != creative[order][:-1]]]
+    out = np.empty(n, dtype=object)
+    out[creative[first]] = np.asarray(campaigns, dtype=object)[campaign[first]]
+    return list(out)
+
+
+def fit_decay(group, x, y, w, n_groups):
+    """
+    Weighted least squares y = a - decay * x for every group at once: the
+    per-group means and centred sums are np.bincount reductions, so the
+    fit is two passes over the rows whatever the number of groups.
+    Returns (intercept, decay, standard error of decay, points) per group;
+    groups with fewer than 3 points or a single x get NaN.
+    """
+    n = np.bincount(group, minlength=n_groups)
+    W = np.bincount(group, weights=w, minlength=n_groups)
+    safe = np.where(W > 0, W, 1.0)
+    mx = np.bincount(group, weights=w * x, minlength=n_groups) / safe
+    my = np.bincount(group, weights=w * y, minlength=n_groups) / safe
+    dx, dy = x - mx[group], y - my[group]
+    sxx = np.bincount(group, weights=w * dx * dx, minlength=n_groups)
+    sxy = np.bincount(group, weights=w * dx * dy, minlength=n_groups)
+    syy = np.bincount(group, weights=w * dy * dy, minlength=n_groups)
+
+    ok = (n >= 3) & (sxx > 0)
+    slope = np.divide(sxy, sxx, out=np.full(n_groups, np.nan), where=ok)
+    ssr = np.maximum(syy - slope * sxy, 0.0)
+    se = np.sqrt(np.divide(ssr, (n - 2) * sxx, out=np.full(n_groups, np.nan), where=ok))
+    return my - slope * mx, -slope, se, n
+
+
+def detect(df, min_days=7, min_impressions=10000, min_t=2.0):
+    """
+    Per-creative CTR decay curves, CTR(age) = ctr_start * exp(-decay * age),
+    fitted on log CTR by exposure age (impression-weighted). A creative is
+    fatigued when its decay is positive with a t-statistic >= `min_t`,
+    it ran on >= `min_days` days with >= `min_impressions` impressions,
+    and its current age is past the half-life ln(2) / decay.
+    """
+    creative, age, clicks, impressions, creatives, campaigns = exposure_days(df)
+    n_groups = len(creatives)
+    # half a click of smoothing keeps zero-click days finite on the log scale
+    log_ctr = np.log((clicks + 0.5) / (impressions + 1.0))
+    intercept, decay, se, days = fit_decay(creative, age, log_ctr, impressions, n_groups)
+
+    total = np.bincount(creative, weights=impressions, minlength=n_groups)
+    max_age = np.zeros(n_groups)
+    np.maximum.at(max_age, creative, age)
+    growing = ~(decay > 0)
+    half_life = np.divide(LN2, decay, out=np.full(n_groups, np.inf), where=~growing)
+    t_stat = np.divide(decay, se, out=np.zeros(n_groups), where=se > 0)
+
+    curves = pd.DataFrame({
+        "creative_message": creatives,
+        "campaign_name": campaigns,
+        "days": days,
+        "age_days": max_age,
+        "impressions": total,
+        "ctr_start": np.exp(intercept),
+        "ctr_now": np.exp(intercept - decay * max_age),
+        "decay_per_day": decay,
+        "half_life_days": half_life,
+        "t_stat": t_stat,
+    })
+    curves["fatigued"] = (
+        ~growing & (t_stat >= min_t) & (days >= min_days) & (total >= min_impressions) & (max_age > half_life)
+    )
+    return curves
+
+
+def targets(curves):
+    """
+    Fatigued creatives grouped by their main campaign, most worn out
+    (age / half-life) first; campaigns are ordered by their worst creative.
+    """
+    worn = curves[curves["fatigued"]]
+    worn = worn.assign(half_lives=worn["age_days"] / worn["half_life_days"])
+    worn = worn.sort_values("half_lives", ascending=False, kind="stable")
+    out = {}
+    for row in worn.itertuples(index=False):
+        out.setdefault(row.campaign_name, []).append({
+            "creative": row.creative_message,
+            "age_days": int(row.age_days),
+            "half_life_days": round(float(row.half_life_days), 2),
+            "decay_per_day": float(row.decay_per_day),
+            "ctr_start": float(row.ctr_start),
+            "ctr_now": float(row.ctr_now),
+        })
+    return out
@@ -1,15 +1,79 @@
 import random
 from collections import Counter
 
+import numpy as np
+
+from . import creative_fatigue
+from .tracing import NULL_TRACER
+
 
 class CreativeGenerator:
     """
     Suggests new creative message variations for low-CTR campaigns.
     Uses dataset phrases as building blocks.
+
+    `rng` (a random.Random) keeps concurrent runs in one process from
+    sharing the global RNG; by default the seeded module RNG is used.
+
+    Headline phrases come from a TF-IDF MessageIndex over all messages:
+    the highest CTR-lift phrases among messages similar to the campaign's
+    own (creative_phrase_source = "lift"), rather than the campaign's most
+    frequent -- and underperforming -- words ("frequency").
+
+    With creative_mode = "ranked", each campaign instead gets
+    creative_variants bulk-generated candidates, scored by a CTR-lift
+    model over historical messages (see VariantEngine), and the best n
+    distinct ones are returned with their scores.
+
+    With creative_fatigue on, per-creative CTR decay curves (see
+    creative_fatigue) pick out creatives past their half-life. Their main
+    campaigns are targeted too (up to creative_fatigue_max_campaigns), and
+    each campaign's output lists the creatives to replace under
+    "fatigued_creatives".
     """
 
-    def __init__(self, df):
+    def __init__(self, df, rng=None, config=None, tracer=None):
+        self.tracer = tracer or NULL_TRACER
         self.df = df.copy()
+        self.rng = rng or random
+        self.config = config or {}
+        self.mode = self.config.get("creative_mode", "random")
+        self.phrase_source = self.config.get("creative_phrase_source", "lift")
+        self.fatigue = bool(self.config.get("creative_fatigue", False))
+        self._engine = None
+        self._index = None
+        self._fatigue_targets = None
+
+    def _message_index(self):
+        if self._index is None:
+            from .message_index import MessageIndex
+            self._index = MessageIndex.load_or_build(
+                self.df,
+                cache_dir=self.config.get("message_index_dir"),
+                prior_impressions=float(self.config.get("creative_prior_impressions", 1000)),
+            )
+        return self._index
+
+    def _variant_engine(self):
+        if self._engine is None:
+            from .creative_variants import VariantEngine
+            self._engine = VariantEngine(
+                self.df, prior_impressions=float(self.config.get("creative_prior_impressions", 1000))
+            )
+        return self._engine
+
+    def fatigue_targets(self):
+        """{campaign: [fatigued creative curve, ...]}, most worn-out campaigns first."""
+        if self._fatigue_targets is None:
+            with self.tracer.span("creatives.fatigue", rows=len(self.df)):
+                curves = creative_fatigue.detect(self.df, **creative_fatigue.config_params(self.config))
+                self._fatigue_targets = creative_fatigue.targets(curves)
+        return self._fatigue_targets
+
+    def fatigue_campaigns(self, exclude=()):
+        """The creative_fatigue_max_campaigns most worn-out campaigns not in `exclude`."""
+        limit = int(self.config.get("creative_fatigue_max_campaigns", 5))
+        return [c for c in list(self.fatigue_targets())[:limit] if c not in exclude]
 
     def _extract_phrases(self, texts, top_k=20):
         words = []
@@ -24,42 +88,70 @@ class CreativeGenerator:
         return [w for w, _ in common]
 
     def generate_for_campaigns(self, campaigns, n=5):
-        output = {}
-
-        for campaign in campaigns:
-            rows = self.df[self.df["campaign_name"] == campaign]
-            creatives = rows["creative_message"].dropna().astype(str).tolist()
-
-            if not creatives:
-                # fallback messages
-                output[campaign] = {
-                    "suggestions": [
-                        "Try a benefit-first headline.",
-                        "Add clear CTA such as 'Shop Now'.",
-                        "Highlight discount or free shipping.",
-                    ],
-                    "source_examples": []
-                }
-                continue
+        with self.tracer.span("creatives", mode=self.mode) as span:
+            fatigued = self.fatigue_targets() if self.fatigue else {}
+            if fatigued:
+                campaigns = list(campaigns) + self.fatigue_campaigns(exclude=campaigns)
+            span.set(campaigns=len(campaigns))
+            output = {}
+            for campaign in campaigns:
+                with self.tracer.span("creatives.campaign", sampled=True, campaign=campaign):
+                    output[campaign] = self._campaign_creatives(campaign, n)
+                if campaign in fatigued:
+                    output[campaign]["fatigued_creatives"] = fatigued[campaign]
+            return output
+
+    def _campaign_creatives(self, campaign, n):
+        rows = self.df[self.df["campaign_name"] == campaign]
+        creatives = rows["creative_message"].dropna().astype(str).tolist()
 
+        if not creatives:
+            # fallback messages
+            return {
+                "suggestions": [
+                    "Try a benefit-first headline.",
+                    "Add clear CTA such as 'Shop Now'.",
+                    "Highlight discount or free shipping.",
+                ],
+                "source_examples": []
+            }
+
+        if self.mode == "ranked":
+            return self._ranked_suggestions(campaign, creatives, n)
+
+        phrases = self._message_index().top_phrases(campaign) if self.phrase_source == "lift" else []
+        if len(phrases) < 3:
             phrases = self._extract_phrases(creatives)
 
-            suggestions = []
-            for _ in range(n):
-                if len(phrases) >= 3:
-                    headline = " ".join(random.sample(phrases[:10], 3)).title()
-                else:
-                    headline = "Discover Comfort Today"
+        suggestions = []
+        for _ in range(n):
+            if len(phrases) >= 3:
+                headline = " ".join(self.rng.sample(phrases[:10], 3)).title()
+            else:
+                headline = "Discover Comfort Today"
 
-                cta = random.choice(["Shop Now", "Buy Today", "Limited Offer", "Get Yours", "Explore"])
+            cta = self.rng.choice(["Shop Now", "Buy Today", "Limited Offer", "Get Yours", "Explore"])
 
-                suggestions.append(
-                    f"{headline}. {cta}. Highlight key benefits like comfort, material, or value."
-                )
+            suggestions.append(
+                f"{headline}. {cta}. Highlight key benefits like comfort, material, or value."
+            )
 
-            output[campaign] = {
-                "suggestions": suggestions,
-                "source_examples": creatives[:5]
-            }
+        return {
+            "suggestions": suggestions,
+            "source_examples": creatives[:5]
+        }
 
-        return output
+    def _ranked_suggestions(self, campaign, creatives, n):
+        rng = np.random.default_rng(self.rng.getrandbits(32))
+        variants, considered = self._variant_engine().top_variants(
+            campaign, n=int(self.config.get("creative_variants", 500)), k=n, rng=rng
+        )
+        suggestions = [v["text"] for v in variants]
+        if not suggestions:
+            suggestions = ["Discover Comfort Today. Shop Now. Highlight key benefits like comfort, material, or value."]
+        return {
+            "suggestions": suggestions,
+            "scores": variants,
+            "variants_considered": considered,
+            "source_examples": creatives[:5]
+        }
@@ -0,0 +1,169 @@
+import numpy as np
+
+CTAS = ("Shop Now", "Buy Today", "Limited Offer", "Get Yours", "Explore")
+TEMPLATE = "{headline}. {cta}. Highlight key benefits like comfort, material, or value."
+HEADLINE_LEN = 3
+
+
+def tokenize(text):
+    """Lower-cased words longer than two characters, edge punctuation stripped."""
+    if not isinstance(text, str):
+        return []
+    words = (w.strip(".,!?:;") for w in text.lower().split())
+    return [w for w in words if len(w) > 2]
+
+
+class VariantEngine:
+    """
+    Bulk headline variant generation and scoring.
+
+    Historical message-level clicks/impressions give every unigram and
+    adjacent bigram a smoothed CTR lift over the account baseline
+    (log(ctr_term / ctr_base), shrunk toward 0 with `prior_impressions`).
+    Variants are drawn as index arrays over a per-campaign token pool (the
+    campaign's own frequent words plus the best-lift words of high-CTR
+    campaigns), scored with array lookups, deduplicated by their
+    order-insensitive token set, and only the top-k are turned into text.
+    """
+
+    def __init__(self, df, prior_impressions=1000.0, high_ctr_quantile=0.75, pool_size=20):
+        self.prior = float(prior_impressions)
+        self.pool_size = int(pool_size)
+
+        rows = df.dropna(subset=["creative_message"])
+        msgs = rows.groupby("creative_message")[["clicks", "impressions"]].sum()
+        clicks = np.nan_to_num(msgs["clicks"].to_numpy(dtype=np.float64))
+        impressions = np.nan_to_num(msgs["impressions"].to_numpy(dtype=np.float64))
+        self.base_ctr = clicks.sum() / impressions.sum() if impressions.sum() > 0 else 0.0
+
+        # vocabulary + (message, token) / (message, bigram) incidence
+        self.vocab = {}
+        tokens_per_msg = [[self.vocab.setdefault(t, len(self.vocab)) for t in tokenize(m)] for m in msgs.index]
+        self.words = np.array(sorted(self.vocab, key=self.vocab.get), dtype=object)
+        V = self.V = max(1, len(self.vocab))
+
+        uni_msg, uni_tok, bi_msg, bi_code = [], [], [], []
+        for m, toks in enumerate(tokens_per_msg):
+            for t in set(toks):
+                uni_msg.append(m)
+                uni_tok.append(t)
+            for code in {a * V + b for a, b in zip(toks, toks[1:])}:
+                bi_msg.append(m)
+                bi_code.append(code)
+
+        uni_msg, uni_tok = np.array(uni_msg, dtype=np.int64), np.array(uni_tok, dtype=np.int64)
+        self.unigram_lift = self._lift(
+            np.bincount(uni_tok, weights=clicks[uni_msg], minlength=V),
+            np.bincount(uni_tok, weights=impressions[uni_msg], minlength=V),
+        )
+
+        bi_msg, bi_code = np.array(bi_msg, dtype=np.int64), np.array(bi_code, dtype=np.int64)
+        self.bigram_codes, inverse = np.unique(bi_code, return_inverse=True)
+        self.bigram_lift = self._lift(
+            np.bincount(inverse, weights=clicks[bi_msg], minlength=len(self.bigram_codes)),
+            np.bincount(inverse, weights=impressions[bi_msg], minlength=len(self.bigram_codes)),
+        )
+
+        # per-campaign word frequencies and the high-CTR campaigns' best words
+        self._campaign_counts = {}
+        for campaign, g in rows.groupby("campaign_name"):
+            counts = np.zeros(V)
+            for msg in g["creative_message"]:
+                for t in tokenize(msg):
+                    counts[self.vocab[t]] += 1
+            self._campaign_counts[campaign] = counts
+
+        camp = rows.groupby("campaign_name")[["clicks", "impressions"]].sum()
+        camp_ctr = camp["clicks"] / camp["impressions"].replace(0, np.nan)
+        winners = camp_ctr[camp_ctr >= camp_ctr.quantile(high_ctr_quantile)].index
+        winner_counts = sum((self._campaign_counts[c] for c in winners), np.zeros(V))
+        used = np.flatnonzero((winner_counts > 0) & (self.unigram_lift > 0))
+        self.winner_pool = used[np.argsort(-self.unigram_lift[used], kind="stable")][:self.pool_size]
+
+    def _lift(self, clicks, impressions):
+        if self.base_ctr <= 0:
+            return np.zeros(len(clicks))
+        smoothed = (clicks + self.prior * self.base_ctr) / (impressions + self.prior)
+        return np.log(np.maximum(smoothed, 1e-12) / self.base_ctr)
+
+    # --------------------------------------------------------
+    # Generation / scoring
+    # --------------------------------------------------------
+    def pool(self, campaign):
+        """Token ids a campaign's variants are drawn from."""
+        counts = self._campaign_counts.get(campaign)
+        own = np.zeros(0, dtype=np.int64)
+        if counts is not None:
+            nz = np.flatnonzero(counts)
+            own = nz[np.argsort(-counts[nz], kind="stable")][:self.pool_size]
+        merged = np.concatenate((own, self.winner_pool))
+        _, first = np.unique(merged, return_index=True)
+        return merged[np.sort(first)]
+
+    def generate(self, pool, n, rng):
+        """(n, HEADLINE_LEN) token ids: half random permutations, half seeded by known bigrams."""
+        P = len(pool)
+        n_bigram = n // 2
+
+        # random ordered picks of distinct pool tokens
+        picks = np.argsort(rng.random((n - n_bigram, P)), axis=1)[:, :HEADLINE_LEN]
+        variants = [pool[picks]]
+
+        # known bigrams inside the pool, extended by a third pool token
+        in_pool = np.zeros(self.V, dtype=bool)
+        in_pool[pool] = True
+        a, b = self.bigram_codes // self.V, self.bigram_codes % self.V
+        seeds = np.flatnonzero(in_pool[a] & in_pool[b] & (a != b) & (self.bigram_lift > 0))
+        if n_bigram and len(seeds):
+            chosen = seeds[rng.integers(0, len(seeds), n_bigram)]
+            third = pool[rng.integers(0, P, n_bigram)]
+            rows = np.column_stack((a[chosen], b[chosen], third))
+            variants.append(rows[(third != rows[:, 0]) & (third != rows[:, 1])])
+        return np.concatenate(variants)
+
+    def score(self, ids):
+        """Mean unigram lift plus mean adjacent-bigram lift (0 for unseen bigrams)."""
+        uni = self.unigram_lift[ids].mean(axis=1)
+        codes = ids[:, :-1] * self.V + ids[:, 1:]
+        pos = np.searchsorted(self.bigram_codes, codes)
+        pos = np.minimum(pos, max(0, len(self.bigram_codes) - 1))
+        found = (self.bigram_codes[pos] == codes) if len(self.bigram_codes) else np.zeros(codes.shape, bool)
+        bi = np.where(found, self.bigram_lift[pos] if len(self.bigram_lift) else 0.0, 0.0)
+        return uni + bi.mean(axis=1)
+
+    def dedupe(self, ids, scores):
+        """Indices of the best-scoring variant per token set, in descending score order."""
+        s = np.sort(ids, axis=1)
+        key = s[:, 0]
+        for col in range(1, s.shape[1]):
+            key = key * self.V + s[:, col]
+        order = np.argsort(-scores, kind="stable")
+        _, first = np.unique(key[order], return_index=True)
+        keep = order[first]
+        return keep[np.argsort(-scores[keep], kind="stable")]
+
+    def top_variants(self, campaign, n=500, k=5, rng=None):
+        """
+        Generate `n` candidates for `campaign` and return the `k` best
+        distinct ones as {"text", "score", "predicted_ctr"}, plus the number
+        of distinct candidates considered.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        pool = self.pool(campaign)
+        if len(pool) < HEADLINE_LEN:
+            return [], 0
+
+        ids = self.generate(pool, n, rng)
+        scores = self.score(ids)
+        keep = self.dedupe(ids, scores)
+        ctas = rng.integers(0, len(CTAS), len(keep))
+
+        out = []
+        for idx, cta in zip(keep[:k], ctas):
+            headline = " ".join(self.words[ids[idx]]).title()
+            out.append({
+                "text": TEMPLATE.format(headline=headline, cta=CTAS[cta]),
+                "score": float(scores[idx]),
+                "predicted_ctr": float(self.base_ctr * np.exp(scores[idx])),
+            })
+        return out, len(keep)
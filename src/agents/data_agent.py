@@ -1,13 +1,139 @@
 import pandas as pd
 import numpy as np
+import hashlib
+import io
+import json
+import os
 import time
 import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .metric_store import MetricStore
+from .sketches import GroupSketch
+from .sql_store import SqlStore
+from .sources import open_source, resolve_sources
+from .tracing import NULL_TRACER
 
 
 class SchemaError(Exception):
     pass
 
 
+class DataProfile:
+    """
+    Mergeable per-column data-quality counters (nulls, parse failures,
+    infs, value ranges), accumulated over one frame or many chunks.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    def add(self, col, nulls=0, parse_failures=0, infs=0, vmin=None, vmax=None, total=0.0, count=0):
+        c = self.columns.setdefault(col, {"nulls": 0, "parse_failures": 0, "infs": 0,
+                                          "min": None, "max": None, "sum": 0.0, "count": 0})
+        c["nulls"] += nulls
+        c["parse_failures"] += parse_failures
+        c["infs"] += infs
+        c["sum"] += total
+        c["count"] += count
+        if vmin is not None:
+            c["min"] = vmin if c["min"] is None else min(c["min"], vmin)
+        if vmax is not None:
+            c["max"] = vmax if c["max"] is None else max(c["max"], vmax)
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, c in other.columns.items():
+            self.add(col, c["nulls"], c["parse_failures"], c["infs"], c["min"], c["max"], c["sum"], c["count"])
+        return self
+
+    def null_ratios(self):
+        rows = max(1, self.rows)
+        return {col: round(c["nulls"] / rows, 3) for col, c in self.columns.items()}
+
+    def to_dict(self):
+        rows = max(1, self.rows)
+        columns = {}
+        for col, c in self.columns.items():
+            entry = {
+                "null_ratio": round(c["nulls"] / rows, 4),
+                "parse_failures": c["parse_failures"],
+                "infs": c["infs"],
+            }
+            if c["min"] is not None:
+                entry.update(min=c["min"], max=c["max"])
+            if c["count"]:
+                entry["mean"] = c["sum"] / c["count"]
+            columns[col] = entry
+        return {"rows": self.rows, "columns": columns}
+
+
+class LoadCheckpoint:
+    """
+    Progress of a chunked load of one source: everything before byte
+    `offset` has been parsed into `chunks` (with their merged `profile` and
+    per-chunk partial aggregates). `lost_bytes` / `lost_rows` are what the
+    last failed attempt had read past the offset, i.e. what a resume
+    re-reads.
+    """
+
+    __slots__ = ("source", "offset", "rows", "chunks", "partials", "profile", "lost_bytes", "lost_rows")
+
+    def __init__(self, source):
+        self.source = source
+        self.offset = 0
+        self.rows = 0
+        self.chunks = []
+        self.partials = []
+        self.profile = DataProfile()
+        self.lost_bytes = 0
+        self.lost_rows = 0
+
+
+def _skip_to(fh, offset, position):
+    """Move `fh` from byte `position` to byte `offset`: seek when possible, else read past."""
+    if fh.seekable():
+        fh.seek(offset)
+        return
+    remaining = offset - position
+    while remaining > 0:
+        block = fh.read(min(remaining, 1 << 20))
+        if not block:
+            raise OSError(f"input ended before the checkpoint at byte {offset}")
+        remaining -= len(block)
+
+
+def _partial_aggregates(df):
+    """(daily, per-campaign) metric sums of one shard or chunk, or None without the key columns."""
+    keys = ["date", "campaign_name", *MetricStore.METRICS]
+    if not all(k in df.columns for k in keys):
+        return None
+    metrics = list(MetricStore.METRICS)
+    return df.groupby("date")[metrics].sum(), df.groupby("campaign_name")[metrics].sum()
+
+
+def merge_partial_summaries(partials, schema):
+    """
+    Combine (daily_sums, campaign_sums) frame pairs -- from file shards or
+    from campaign-shard workers -- into the summary() structure.
+    """
+    ts = pd.concat([p[0] for p in partials]).groupby(level=0).sum().sort_index()
+    cs = pd.concat([p[1] for p in partials]).groupby(level=0).sum().sort_index()
+    ts.index.name, cs.index.name = "date", "campaign_name"
+
+    for t in (ts, cs):
+        t["ctr"] = t["clicks"] / t["impressions"].replace(0, 1)
+        t["roas"] = t["revenue"] / t["spend"].replace(0, 1)
+
+    return {
+        "timeseries": ts.reset_index().to_dict(orient="records"),
+        "campaign_summary": cs.reset_index().to_dict(orient="records"),
+        "schema": schema,
+    }
+
+
 class DataAgent:
     EXPECTED_SCHEMA = {
         "campaign_name": str,
@@ -26,37 +152,300 @@ class DataAgent:
         "platform": str,
         "country": str,
     }
+    # descriptive columns that are never grouped on; safe to hold as categoricals
+    COMPACT_CATEGORIES = ("adset_name", "creative_type", "audience_type", "platform", "country")
 
-    def __init__(self, csv_path, logger=None, config=None):
+    def __init__(self, csv_path, logger=None, config=None, opener=None, tracer=None):
         self.csv_path = csv_path
         self.logger = logger
         self.config = config or {}
+        self.opener = opener
+        self.tracer = tracer or NULL_TRACER
         self.df = None
+        self.profile = None
+        self.column_mapping = None
+        self._mapped_names = None
+        self._shards = None
+        self._partials = None
+        self.store = None
+        self.sketches = None
+        self.daily_totals = None
+        self._checkpoint = None
 
     # --------------------------------------------------------
     # Load CSV
     # --------------------------------------------------------
     def load(self):
+        with self.tracer.span("data.load", path=str(self.csv_path)) as span:
+            df = self._load()
+            span.set(rows=len(df))
+            return df
+
+    def _load(self):
         t0 = time.time()
-        try:
-            df = pd.read_csv(self.csv_path)
-        except Exception as e:
-            raise SchemaError(f"Failed to load CSV: {e}")
+        mode = self.config.get("validation_mode", "full")
+        shards = self._resolve_shards()
+        self._partials = None
+
+        # drift map mode: resolve near-miss renames from the header alone
+        mapped_from_cache = False
+        if self._drift_mode() == "map":
+            mapped_from_cache = self._resolve_column_mapping()
+
+        # fast fail: validate a small head sample before parsing everything
+        if mode in ("sample", "both"):
+            with self.tracer.span("data.validate_sample"):
+                self._validate_sample()
+
+        if self.config.get("execution_backend", "pandas") == "sqlite":
+            return self._load_sql(check_columns=not mapped_from_cache)
 
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        sharded = len(shards) > 1 or shards[0].partitions
+        if sharded and self.config.get("load_chunksize"):
+            with self.tracer.span("data.chunked", shards=len(shards)):
+                df, profile, missing = self._load_shards_chunked(shards, check_columns=not mapped_from_cache)
+        elif sharded:
+            with self.tracer.span("data.shards", shards=len(shards)):
+                df, profile, missing = self._load_shards(shards, check_columns=not mapped_from_cache)
+        elif self.config.get("load_chunksize"):
+            with self.tracer.span("data.chunked"):
+                df, profile, missing = self._load_chunked(check_columns=not mapped_from_cache)
+        else:
+            with self.tracer.span("data.parse"):
+                try:
+                    df = self._read_csv()
+                except Exception as e:
+                    raise SchemaError(f"Failed to load CSV: {e}")
 
-        # validate schema BEFORE cleaning types
-        self._validate_schema(df)
+            # column-level checks are cheap and run before touching the data;
+            # a cached mapping was only stored for a header that fully resolved
+            with self.tracer.span("data.validate_columns"):
+                missing = [] if mapped_from_cache else self._validate_columns(df.columns)
 
-        # safe cleaning
-        self._clean_types(df)
+            # one fused pass: profile every column while cleaning it
+            with self.tracer.span("data.clean"):
+                profile = self._profile_and_clean(df)
+
+        if self.config.get("compact_dtypes"):
+            with self.tracer.span("data.compact"):
+                self._compact(df)
+
+        if not missing and mode != "sample":
+            with self.tracer.span("data.validate_profile"):
+                self._validate_profile(profile)
 
         load_time = round(time.time() - t0, 3)
         if self.logger:
+            self.logger.info({"event": "data_quality_profile", "scope": "full", **profile.to_dict()})
             self.logger.info({"event": "data_loaded", "rows": len(df), "time_sec": load_time})
 
         self.df = df
+        self.profile = profile
+
+        store_dir = self.config.get("metric_store_dir")
+        if store_dir:
+            with self.tracer.span("data.persist_store"):
+                self.persist_store(store_dir)
+
+        return df
+
+    # --------------------------------------------------------
+    # Sharded input (directory / glob / manifest)
+    # --------------------------------------------------------
+    def _resolve_shards(self):
+        if self._shards is None:
+            shards, pruned = resolve_sources(str(self.csv_path), self.config.get("date_window"))
+            if not shards:
+                raise SchemaError(f"No input files found for {self.csv_path} (pruned {pruned} partitions)")
+            if self.logger and (len(shards) > 1 or pruned):
+                self.logger.info({"event": "shards_resolved", "shards": len(shards), "pruned": pruned})
+            self._shards = shards
+        return self._shards
+
+    def fingerprint(self):
+        """
+        Cheap identity of the input: path, size and mtime of every resolved
+        shard. Any rewrite of the data changes it without reading a byte.
+        """
+        h = hashlib.sha1()
+        for shard in self._resolve_shards():
+            st = os.stat(shard.path)
+            h.update(f"{os.path.abspath(shard.path)}\x1f{st.st_size}\x1f{st.st_mtime_ns}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def campaign_names(self):
+        """Sorted distinct campaign names, read from the campaign column alone."""
+        names = set()
+        for shard in self._resolve_shards():
+            if "campaign_name" in shard.partitions:
+                names.add(shard.partitions["campaign_name"])
+                continue
+            try:
+                col = self._read_csv(shard, usecols=["campaign_name"])["campaign_name"]
+            except Exception as e:
+                raise SchemaError(f"Failed to read campaign names from {shard.path}: {e}")
+            names.update(col.dropna().astype(str).unique())
+        return sorted(names)
+
+    def _open(self, shard):
+        if self.opener is not None:
+            return self.opener(shard.path)
+        return open_source(shard.path, workers=int(self.config.get("decompress_workers", 4) or 1))
+
+    def _load_shard(self, shard, columns):
+        with self.tracer.span("data.shard", sampled=True, path=shard.path):
+            try:
+                df = self._read_csv(shard)
+            except Exception as e:
+                raise SchemaError(f"Failed to load CSV shard {shard.path}: {e}")
+            if set(df.columns) != set(columns):
+                raise SchemaError(f"Shard {shard.path} columns differ from the first shard: {list(df.columns)}")
+
+            profile = self._profile_and_clean(df)
+            partial = _partial_aggregates(df)
+            if list(df.columns) != list(columns):
+                df = df[list(columns)]
+            return df, profile, partial
+
+    def _load_shards(self, shards, check_columns=True):
+        """
+        Read, clean and profile shards in parallel on a thread pool, keeping
+        per-shard partial aggregates for summary(). Shards are concatenated
+        once at the end, in shard order.
+        """
+        columns = list(self._read_csv(shards[0], nrows=0).columns)
+        missing = self._validate_columns(columns) if check_columns else []
+
+        workers = int(self.config.get("read_workers", 4) or 1)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(shards)))) as pool:
+            results = list(pool.map(lambda sh: self._load_shard(sh, columns), shards))
+
+        profile = DataProfile()
+        for _, p, _ in results:
+            profile.merge(p)
+        partials = [part for _, _, part in results]
+        self._partials = partials if all(part is not None for part in partials) else None
+
+        df = pd.concat([frame for frame, _, _ in results], ignore_index=True, copy=False)
+        return df, profile, missing
+
+    def _load_shards_chunked(self, shards, check_columns=True):
+        """
+        Stream every shard in `load_chunksize` row chunks, cleaning and --
+        with compact_dtypes -- downcasting each chunk before it is kept, so
+        no shard is ever parsed whole. Partial aggregates are kept per
+        chunk for summary(), as in _load_chunked.
+        """
+        columns = list(self._read_csv(shards[0], nrows=0).columns)
+        missing = self._validate_columns(columns) if check_columns else []
+
+        profile = DataProfile()
+        chunks, partials = [], []
+        try:
+            for chunk in self._stream_chunks(int(self.config["load_chunksize"]), profile=profile):
+                if set(chunk.columns) != set(columns):
+                    raise SchemaError(f"Shard columns differ from the first shard: {list(chunk.columns)}")
+                if self.config.get("compact_dtypes"):
+                    self._compact(chunk, categories=False)
+                chunks.append(chunk[columns])
+                partials.append(_partial_aggregates(chunk))
+        except (OSError, ValueError) as e:
+            raise SchemaError(f"Failed to load CSV shards: {e}")
+
+        self._partials = partials if partials and all(p is not None for p in partials) else None
+        df = pd.concat(chunks, ignore_index=True, copy=False) if chunks else pd.DataFrame(columns=columns)
+        return df, profile, missing
+
+    def _load_chunked(self, check_columns=True):
+        """
+        Stream the (single) input in `load_chunksize` row chunks, cleaning,
+        profiling and -- with compact_dtypes -- downcasting each chunk before
+        it is kept, so the raw parsed text of the whole file never exists
+        at once.
+
+        Chunks are cut at line boundaries, so after every kept chunk the
+        LoadCheckpoint holds the byte offset reached plus the chunks, their
+        profile and partial aggregates so far. When a read fails and load()
+        is retried, it resumes from that offset instead of byte zero.
+        """
+        shard = self._resolve_shards()[0]
+        chunksize = int(self.config["load_chunksize"])
+        source = self.fingerprint()
+        ckpt = self._checkpoint
+        if ckpt is None or ckpt.source != source:
+            ckpt = self._checkpoint = LoadCheckpoint(source)
+        elif ckpt.offset and self.logger:
+            self.logger.info({
+                "event": "load_resumed",
+                "offset": ckpt.offset,
+                "rows_kept": ckpt.rows,
+                "bytes_reread": ckpt.lost_bytes,
+                "rows_reread": ckpt.lost_rows,
+            })
+
+        kwargs = {"header": 0, "names": self._mapped_names} if self.column_mapping else {}
+        lines, size = [], 0
+        try:
+            with self._open(shard) as fh:
+                header = fh.readline()
+                columns = list(pd.read_csv(io.BytesIO(header), **kwargs).columns)
+                missing = self._validate_columns(columns) if check_columns else []
+                if ckpt.offset:
+                    _skip_to(fh, ckpt.offset, len(header))
+                else:
+                    ckpt.offset = len(header)
+                for line in fh:
+                    lines.append(line)
+                    size += len(line)
+                    if len(lines) >= chunksize and self._keep_chunk(ckpt, header, lines, size, kwargs):
+                        lines, size = [], 0
+                if lines and not self._keep_chunk(ckpt, header, lines, size, kwargs, final=True):
+                    raise ValueError("unterminated quoted field at end of file")
+        except (OSError, ValueError) as e:
+            ckpt.lost_bytes, ckpt.lost_rows = size, len(lines)
+            raise SchemaError(f"Failed to load CSV at byte {ckpt.offset + size}: {e}")
+
+        self._checkpoint = None
+        df = pd.concat(ckpt.chunks, ignore_index=True, copy=False) if ckpt.chunks else pd.DataFrame(columns=columns)
+        if ckpt.partials and all(p is not None for p in ckpt.partials):
+            self._partials = ckpt.partials
+        return df, ckpt.profile, missing
+
+    def _keep_chunk(self, ckpt, header, lines, size, kwargs, final=False):
+        """
+        Parse, clean and keep one chunk of raw lines, then advance the
+        checkpoint past it. Returns False (keeping nothing) while the lines
+        end inside a quoted field, so a chunk never splits a record.
+        """
+        body = b"".join(lines)
+        if body.count(b'"') % 2 and not final:
+            return False
+        with self.tracer.span("data.chunk", sampled=True, offset=ckpt.offset, rows=len(lines)):
+            chunk = pd.read_csv(io.BytesIO(header + body), **kwargs)
+            profile = self._profile_and_clean(chunk)
+            if self.config.get("compact_dtypes"):
+                self._compact(chunk, categories=False)
+            partial = _partial_aggregates(chunk)
+
+        ckpt.chunks.append(chunk)
+        ckpt.partials.append(partial)
+        ckpt.profile.merge(profile)
+        ckpt.offset += size
+        ckpt.rows += len(chunk)
+        return True
+
+    def _compact(self, df, categories=True):
+        """
+        Downcast in place: metric columns to float32 and, with `categories`,
+        the COMPACT_CATEGORIES string columns to categoricals. Grouping keys
+        (campaign, message, date) keep their dtype.
+        """
+        for col in df.columns:
+            expected = self.EXPECTED_SCHEMA.get(col)
+            if expected == float and df[col].dtype != np.float32:
+                df[col] = df[col].astype(np.float32)
+            elif categories and col in self.COMPACT_CATEGORIES and df[col].dtype != "category":
+                df[col] = df[col].astype("category")
         return df
 
     # --------------------------------------------------------
@@ -65,8 +454,21 @@ class DataAgent:
     def _normalize_col(self, col):
         return re.sub(r"[^a-z0-9]", "", str(col).lower())
 
+    def _drift_mode(self):
+        return getattr(self, "drift_mode", None) or self.config.get("schema_drift_mode", "fail")
+
+    def _near_misses(self, actual):
+        norm_expected = {self._normalize_col(c): c for c in self.EXPECTED_SCHEMA}
+        norm_actual = {self._normalize_col(c): c for c in actual}
+
+        near_miss = []
+        for ncol, raw in norm_actual.items():
+            if ncol in norm_expected and norm_expected[ncol] not in actual:
+                near_miss.append({"expected": norm_expected[ncol], "actual": raw})
+        return near_miss
+
     def _detect_drift(self, df_columns):
-        mode = getattr(self, "drift_mode", None) or self.config.get("schema_drift_mode", "fail")
+        mode = self._drift_mode()
 
         expected = set(self.EXPECTED_SCHEMA)
         actual = set(df_columns)
@@ -74,13 +476,7 @@ class DataAgent:
         missing = [c for c in expected if c not in actual]
         extra = [c for c in actual if c not in expected]
 
-        norm_expected = {self._normalize_col(c): c for c in expected}
-        norm_actual = {self._normalize_col(c): c for c in actual}
-
-        near_miss = []
-        for ncol, raw in norm_actual.items():
-            if ncol in norm_expected and norm_expected[ncol] not in actual:
-                near_miss.append({"expected": norm_expected[ncol], "actual": raw})
+        near_miss = self._near_misses(actual)
 
         # Missing columns are always severe
         # Extra columns are not considered "drift" for failure purposes
@@ -100,12 +496,13 @@ class DataAgent:
             return
 
         # Missing columns should fail if mode=fail
+        # (or mode=map: anything still missing after renaming is real drift)
         if missing:
             if mode == "warn":
                 if self.logger:
                     self.logger.warning({"event": "schema_drift_warning", "details": details})
                 return
-            if mode == "fail":
+            if mode in ("fail", "map"):
                 raise SchemaError(f"Schema drift detected: {details}")
             return
 
@@ -116,20 +513,138 @@ class DataAgent:
         if self.logger:
             self.logger.warning({"event": "schema_drift_warning", "details": details})
 
-    def _validate_schema(self, df):
-        missing = [c for c in self.EXPECTED_SCHEMA if c not in df.columns]
-        extra = [c for c in df.columns if c not in self.EXPECTED_SCHEMA]
-        null_report = df.isnull().mean().round(3).to_dict()
+    # --------------------------------------------------------
+    # Drift auto-mapping (schema_drift_mode: "map")
+    # --------------------------------------------------------
+    def _read_csv(self, shard=None, **kwargs):
+        """
+        pd.read_csv of one shard (default: the first) with any resolved
+        column mapping applied at parse time; partition values encoded in
+        directory names are added as columns the file does not carry.
+        Compressed shards are decompressed on the fly, never to disk.
+        """
+        shard = shard or self._resolve_shards()[0]
+        if self.column_mapping:
+            kwargs.update(header=0, names=self._mapped_names)
+        with self._open(shard) as fh:
+            df = pd.read_csv(fh, **kwargs)
+        for key, value in shard.partitions.items():
+            if key not in df.columns:
+                df[key] = value
+        return df
+
+    def _stream_chunks(self, chunksize, columns=None, profile=None, campaigns=None):
+        """
+        Read every shard in `chunksize`-row chunks with the resolved column
+        mapping applied at parse time (as in _read_csv) and partition values
+        added as columns. Each chunk is cleaned and profiled into `profile`
+        before it is yielded. `columns` limits parsing to those (mapped)
+        names; `campaigns` keeps only those campaigns' rows (an isin filter
+        per chunk, before cleaning) and skips shards partitioned on other
+        campaigns without opening them.
+        """
+        keep = set(map(str, campaigns)) if campaigns is not None else None
+        if self._drift_mode() == "map" and self._mapped_names is None:
+            self._resolve_column_mapping()
+        kwargs = {"chunksize": int(chunksize)}
+        if self.column_mapping:
+            kwargs.update(header=0, names=self._mapped_names)
+        wanted = set(columns) if columns is not None else None
+        if wanted is not None:
+            kwargs["usecols"] = lambda c: c in wanted
+        profile = profile if profile is not None else DataProfile()
+        for shard in self._resolve_shards():
+            part = shard.partitions.get("campaign_name")
+            if keep is not None and part is not None and str(part) not in keep:
+                continue
+            with self._open(shard) as fh:
+                for chunk in pd.read_csv(fh, **kwargs):
+                    for key, value in shard.partitions.items():
+                        if (wanted is None or key in wanted) and key not in chunk.columns:
+                            chunk[key] = value
+                    if keep is not None:
+                        chunk = chunk[chunk["campaign_name"].astype(str).isin(keep)].reset_index(drop=True)
+                    self._profile_and_clean(chunk, profile)
+                    yield chunk
 
-        # Missing columns ALWAYS validated through drift detection
-        if missing:
-            self._detect_drift(df.columns)
-            # if drift detector didn’t raise, this is warn-mode
-            return
+    def _source_fingerprint(self, columns):
+        return hashlib.sha1("\x1f".join(map(str, columns)).encode("utf-8")).hexdigest()
+
+    def _mapping_cache_path(self):
+        return self.config.get("schema_mapping_cache", "cache/schema_mappings.json")
+
+    def _resolve_column_mapping(self):
+        """
+        Build {actual: expected} renames for near-miss columns. Mappings are
+        cached per source fingerprint (hash of the header), so later loads of
+        the same export layout skip drift detection. Returns True on a cache hit.
+        """
+        try:
+            with self._open(self._resolve_shards()[0]) as fh:
+                header = list(pd.read_csv(fh, nrows=0).columns)
+        except Exception as e:
+            raise SchemaError(f"Failed to load CSV: {e}")
+
+        fingerprint = self._source_fingerprint(header)
+        self._mapped_names = header
+        cache_path = self._mapping_cache_path()
+        cache = {}
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+
+        hit = cache.get(fingerprint)
+        if hit is not None:
+            self.column_mapping = hit["mapping"]
+            self._mapped_names = [self.column_mapping.get(c, c) for c in header]
+            if self.logger:
+                self.logger.info({
+                    "event": "schema_mapping_applied",
+                    "source": "cache",
+                    "fingerprint": fingerprint,
+                    "mapping": self.column_mapping,
+                    "time_saved_sec": hit.get("detect_sec"),
+                })
+            return True
 
-        # Extra columns are allowed (warn only)
-        if extra and self.logger:
-            self.logger.warning({"event": "extra_columns_detected", "columns": extra})
+        t0 = time.perf_counter()
+        self.column_mapping = {m["actual"]: m["expected"] for m in self._near_misses(set(header))}
+        self._mapped_names = [self.column_mapping.get(c, c) for c in header]
+        self._detect_drift(self._mapped_names)
+        detect_sec = round(time.perf_counter() - t0, 6)
+
+        # _detect_drift raised if anything is still missing, so this header resolves fully
+        cache[fingerprint] = {"mapping": self.column_mapping, "columns": header, "detect_sec": detect_sec}
+        # write-then-rename: concurrent loads and workers never see a partial file
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp, cache_path)
+
+        if self.logger:
+            self.logger.info({
+                "event": "schema_mapping_applied",
+                "source": "detected",
+                "fingerprint": fingerprint,
+                "mapping": self.column_mapping,
+                "detect_sec": detect_sec,
+            })
+        return False
+
+    def _validate_columns(self, columns):
+        """Missing / extra / near-miss column checks. Returns the missing columns."""
+        missing = [c for c in self.EXPECTED_SCHEMA if c not in columns]
+
+        # Missing columns ALWAYS validated through drift detection;
+        # extra columns are allowed (warn only)
+        self._detect_drift(columns)
+        # if drift detector didn’t raise with columns missing, this is warn-mode
+        return missing
+
+    def _validate_profile(self, profile):
+        """Null-pattern checks, driven by the profile from the fused pass."""
+        null_report = profile.null_ratios()
 
         # Severe nulls → always error
         severe_nulls = {c: r for c, r in null_report.items() if r > 0.5}
@@ -137,43 +652,207 @@ class DataAgent:
             raise SchemaError(f"Columns with >50% null values detected: {severe_nulls}")
 
         # All dates invalid
-        if "date" in df.columns and df["date"].isnull().all():
+        date = profile.columns.get("date")
+        if date is not None and date["nulls"] >= profile.rows:
             raise SchemaError("All values in 'date' parsed to null — bad date format")
 
-        # Now check for drift
-        self._detect_drift(df.columns)
-
         if self.logger:
             self.logger.info({
                 "event": "schema_validated",
-                "missing": missing,
-                "extra": extra,
+                "missing": [],
+                "extra": [c for c in profile.columns if c not in self.EXPECTED_SCHEMA],
                 "null_report": null_report,
             })
 
+    def _validate_sample(self):
+        """Validate the first `validation_sample_rows` rows only (fast fail)."""
+        n = int(self.config.get("validation_sample_rows", 10000))
+        try:
+            sample = self._read_csv(nrows=n)
+        except Exception as e:
+            raise SchemaError(f"Failed to load CSV: {e}")
+
+        if not self._validate_columns(sample.columns):
+            profile = self._profile_and_clean(sample)
+            self._validate_profile(profile)
+            if self.logger:
+                self.logger.info({"event": "data_quality_profile", "scope": "sample", **profile.to_dict()})
+
     # --------------------------------------------------------
-    # Type Cleaning
+    # Fused profiling + type cleaning
     # --------------------------------------------------------
-    def _clean_types(self, df):
-        for col, expected in self.EXPECTED_SCHEMA.items():
-            if col not in df.columns:
-                continue
+    def _profile_and_clean(self, df, profile=None):
+        """
+        Clean every expected column in place and, in the same sweep, record
+        null counts, parse failures, inf counts and value ranges. Pass the
+        same `profile` for successive chunks to profile a streamed file.
+        """
+        profile = profile if profile is not None else DataProfile()
+        profile.rows += len(df)
+        nulls = df.isna().sum()
+
+        for col in df.columns:
+            expected = self.EXPECTED_SCHEMA.get(col)
+            stats = {"nulls": int(nulls[col])}
 
             if expected == float:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-                df[col] = df[col].replace([np.inf, -np.inf], np.nan).fillna(0.0)
+                values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, copy=True)
+                nan = np.isnan(values)
+                bad = ~np.isfinite(values)
+                good = values[~bad]
+                stats["parse_failures"] = int(nan.sum()) - stats["nulls"]
+                stats["infs"] = int(bad.sum() - nan.sum())
+                if len(good):
+                    stats.update(vmin=float(good.min()), vmax=float(good.max()), total=float(good.sum()), count=len(good))
+                values[bad] = 0.0
+                df[col] = values
+
+            elif expected == "datetime":
+                parsed = df[col] if pd.api.types.is_datetime64_any_dtype(df[col]) \
+                    else pd.to_datetime(df[col], errors="coerce")
+                # dates count as null once parsed, as unparseable dates are unusable
+                invalid = int(parsed.isna().sum())
+                stats["parse_failures"] = invalid - stats["nulls"]
+                stats["nulls"] = invalid
+                if invalid < len(parsed):
+                    stats.update(vmin=parsed.min(), vmax=parsed.max())
+                df[col] = parsed
 
             elif expected == str:
                 df[col] = df[col].astype(str).replace("nan", "").fillna("")
 
+            profile.add(col, **stats)
+
+        return profile
+
+    # --------------------------------------------------------
+    # Metric stores (binary memmap / SQLite)
+    # --------------------------------------------------------
+    def persist_store(self, path):
+        """Write the loaded frame's daily campaign metrics to a MetricStore."""
+        if self.df is None:
+            raise ValueError("Dataset not loaded")
+        t0 = time.time()
+        self.store = MetricStore.create(path, self.df)
+        if self.logger:
+            self.logger.info({
+                "event": "metric_store_written",
+                "path": path,
+                "campaigns": len(self.store.campaigns),
+                "days": self.store.n_days,
+                "time_sec": round(time.time() - t0, 3),
+            })
+        return self.store
+
+    def persist_sql(self, path, frames=None):
+        """
+        Bulk-load daily campaign metrics into an SQLite SqlStore (reused
+        when it was built from the same input); summaries, daily totals and
+        per-campaign stats are then GROUP BY queries against it. `frames`
+        (e.g. streamed chunks) defaults to the loaded frame.
+        """
+        if frames is None:
+            if self.df is None:
+                raise ValueError("Dataset not loaded")
+            frames = self.df
+        t0 = time.time()
+        self.store = SqlStore.create(path, frames, source=self.fingerprint(),
+                                     batch_rows=int(self.config.get("sqlite_batch_rows", 100000)))
+        if self.logger:
+            self.logger.info({
+                "event": "sql_store_ready",
+                "path": path,
+                "campaigns": len(self.store.campaigns),
+                "days": self.store.n_days,
+                "time_sec": round(time.time() - t0, 3),
+            })
+        return self.store
+
+    def sqlite_path(self):
+        """sqlite_path when set, else one database per input under sqlite_dir (keyed by fingerprint())."""
+        if self.config.get("sqlite_path"):
+            return self.config["sqlite_path"]
+        return os.path.join(self.config.get("sqlite_dir", "cache/sqlite"), f"{self.fingerprint()}.sqlite")
+
+    def _load_sql(self, check_columns=True):
+        """
+        execution_backend "sqlite": stream the input in sqlite_batch_rows
+        chunks straight into the SqlStore (not parsed at all when the
+        database was built from the same input) without keeping the frame.
+        Returns the narrow per-row frame read back from the store
+        (SqlStore.ROW_COLUMNS) for the CTR trend, evaluation and creative
+        stages; summaries, daily totals and matrices read the store.
+        """
+        t0 = time.time()
+        profile = DataProfile()
+        missing = []
+        streamed = []
+
+        def chunks():
+            for chunk in self._stream_chunks(int(self.config.get("sqlite_batch_rows", 100000)), profile=profile):
+                if not streamed and check_columns:
+                    missing.extend(self._validate_columns(chunk.columns))
+                streamed.append(len(chunk))
+                yield chunk
+            # raised before the new database is moved into place, so a failed check leaves none behind
+            if streamed and not missing and self.config.get("validation_mode", "full") != "sample":
+                with self.tracer.span("data.validate_profile"):
+                    self._validate_profile(profile)
+
+        with self.tracer.span("data.persist_sql"):
+            try:
+                self.persist_sql(self.sqlite_path(), chunks())
+            except (OSError, ValueError) as e:
+                raise SchemaError(f"Failed to load CSV: {e}")
+
+        with self.tracer.span("data.read_rows"):
+            df = self.store.rows()
+        if self.logger:
+            if streamed:
+                self.logger.info({"event": "data_quality_profile", "scope": "full", **profile.to_dict()})
+            self.logger.info({
+                "event": "data_loaded",
+                "rows": sum(streamed),
+                "time_sec": round(time.time() - t0, 3),
+            })
+
+        self.df = None
+        self.profile = profile
+        self.daily_totals = self.store.daily_totals().set_index("date")
+        return df
+
+    def open_store(self, path):
+        """Attach an existing MetricStore; summary() then reads from it."""
+        self.store = MetricStore(path)
+        return self.store
+
+    def append_to_store(self, df):
+        """Append new rows (typically new days) to the attached store in place."""
+        if self.store is None:
+            raise ValueError("No metric store attached")
+        return self.store.append(df)
+
     # --------------------------------------------------------
     # Summary
     # --------------------------------------------------------
     def summary(self):
+        with self.tracer.span("data.summary"):
+            return self._summary()
+
+    def _summary(self):
+        if self.config.get("aggregation_mode", "exact") == "approx":
+            return self._approx_summary()
+
+        if self.store is not None:
+            return self._store_summary()
+
         if self.df is None:
             raise ValueError("Dataset not loaded")
 
         df = self.df
+        if self._partials is not None:
+            return self._merged_summary()
+
         ts = df.groupby("date").agg({
             "spend": "sum",
             "impressions": "sum",
@@ -201,3 +880,182 @@ class DataAgent:
             "campaign_summary": cs.reset_index().to_dict(orient="records"),
             "schema": df.dtypes.astype(str).to_dict(),
         }
+
+    def _merged_summary(self):
+        """summary() built by merging the per-shard partial aggregates."""
+        return merge_partial_summaries(self._partials, self.df.dtypes.astype(str).to_dict())
+
+    def campaign_series(self):
+        """
+        Yield (campaign, daily CTR array) per campaign, on a date axis shared
+        by all campaigns, read from the metric store when one is open.
+        """
+        if self.store is not None:
+            yield from self.store.campaign_series()
+            return
+        if self.df is None:
+            return
+
+        daily = self.df.groupby(["campaign_name", "date"])[["clicks", "impressions"]].sum()
+        dates = daily.index.get_level_values("date").unique().sort_values()
+        for campaign, g in daily.groupby(level="campaign_name"):
+            g = g.droplevel("campaign_name").reindex(dates)
+            imp = g["impressions"].to_numpy(dtype=np.float64)
+            clk = g["clicks"].to_numpy(dtype=np.float64)
+            yield campaign, np.divide(clk, imp, out=np.full(len(imp), np.nan), where=imp > 0)
+
+    def campaign_day_matrices(self, columns):
+        """
+        Sorted campaign names and dense [campaign x day] sums of `columns`,
+        from the metric store's matrices when one is open.
+        """
+        if self.store is not None:
+            names = np.asarray(self.store.campaigns, dtype=object)
+            order = np.argsort(names, kind="stable")
+            return list(names[order]), {c: np.asarray(self.store.matrix(c))[order] for c in columns}
+        from .peer_outliers import sum_matrices
+        return sum_matrices(self.df, columns)
+
+    def _store_summary(self):
+        schema = {"campaign_name": "object", "date": "datetime64[ns]"}
+        schema.update({m: np.dtype(MetricStore.DTYPE).name for m in MetricStore.METRICS})
+        if self.df is not None:
+            schema = self.df.dtypes.astype(str).to_dict()
+
+        return {
+            "timeseries": self.store.timeseries().to_dict(orient="records"),
+            "campaign_summary": self.store.campaign_summary().to_dict(orient="records"),
+            "schema": schema,
+        }
+
+    # --------------------------------------------------------
+    # Approximate aggregation (high-cardinality keys)
+    # --------------------------------------------------------
+    def build_sketches(self):
+        """
+        One streaming pass over the CSV in chunks, building per-level
+        sketches (count-min sums, Space-Saving heavy hitters, HyperLogLog
+        distinct counts) plus exact daily totals, which stay small.
+        """
+        cfg = self.config
+        levels = cfg.get("approx_levels", ["campaign_name", "adset_name", "creative_message"])
+        metrics = list(GroupSketch.METRICS)
+        sketches = {
+            lvl: GroupSketch(
+                lvl,
+                epsilon=cfg.get("approx_epsilon", 0.001),
+                delta=cfg.get("approx_delta", 0.01),
+                top_k=cfg.get("approx_top_k", 100),
+                hll_error=cfg.get("approx_hll_error", 0.01),
+            )
+            for lvl in levels
+        }
+
+        t0 = time.time()
+        daily = None
+        rows = 0
+        profile = DataProfile()
+        wanted = list(dict.fromkeys(levels + ["date"] + metrics))
+        try:
+            for chunk in self._stream_chunks(cfg.get("approx_chunksize", 200000), wanted, profile):
+                absent = [c for c in wanted if c not in chunk.columns]
+                if absent:
+                    raise SchemaError(f"Columns required for approximate aggregation are missing: {absent}")
+
+                for sketch in sketches.values():
+                    sketch.update(chunk)
+                part = chunk.groupby("date")[metrics].sum()
+                daily = part if daily is None else daily.add(part, fill_value=0.0)
+                rows += len(chunk)
+        except (OSError, ValueError) as e:
+            raise SchemaError(f"Failed to stream CSV for approximate aggregation: {e}")
+
+        self.sketches = sketches
+        self.daily_totals = daily.sort_index() if daily is not None else pd.DataFrame(columns=metrics)
+        if self.logger:
+            self.logger.info({"event": "data_quality_profile", "scope": "stream", **profile.to_dict()})
+            self.logger.info({
+                "event": "sketches_built",
+                "rows": rows,
+                "levels": levels,
+                "time_sec": round(time.time() - t0, 3),
+            })
+        return sketches
+
+    def heavy_hitters(self):
+        """Candidate keys per level (top spend + lowest CTR heavy hitters)."""
+        if self.sketches is None:
+            self.build_sketches()
+        return {lvl: sketch.candidates() for lvl, sketch in self.sketches.items()}
+
+    def load_focus(self):
+        """
+        Approx-mode load: the single sketch pass, then only the heavy-hitter
+        campaigns' rows for the exact per-row analysis. Falls back to the
+        full load when campaign_name is not a sketched level.
+        """
+        focus = self.heavy_hitters().get("campaign_name")
+        if focus is None:
+            return self.load()
+        return self.load_campaigns(focus)
+
+    def load_campaigns(self, campaigns):
+        """
+        Stream the source in chunks and keep only the given campaigns' rows,
+        so memory follows the selection rather than the file. The result is
+        validated and profiled like load(); nothing is persisted.
+        """
+        with self.tracer.span("data.load", path=str(self.csv_path), campaigns=len(campaigns)) as span:
+            t0 = time.time()
+            cfg = self.config
+            chunksize = cfg.get("load_chunksize") or cfg.get("approx_chunksize", 200000)
+            profile = DataProfile()
+            try:
+                chunks = list(self._stream_chunks(chunksize, profile=profile, campaigns=campaigns))
+            except (OSError, ValueError) as e:
+                raise SchemaError(f"Failed to load CSV: {e}")
+            df = (
+                pd.concat(chunks, ignore_index=True) if chunks
+                else pd.DataFrame(columns=list(self.EXPECTED_SCHEMA))
+            )
+            missing = [] if self.column_mapping else self._validate_columns(df.columns)
+            if cfg.get("compact_dtypes"):
+                self._compact(df)
+            if chunks and not missing and cfg.get("validation_mode", "full") != "sample":
+                self._validate_profile(profile)
+
+            if self.logger:
+                self.logger.info({"event": "data_quality_profile", "scope": "focus", **profile.to_dict()})
+                self.logger.info({
+                    "event": "data_loaded",
+                    "rows": len(df),
+                    "campaigns": len(campaigns),
+                    "time_sec": round(time.time() - t0, 3),
+                })
+            self.df = df
+            self.profile = profile
+            self._partials = None
+            span.set(rows=len(df))
+            return df
+
+    def _approx_summary(self):
+        if self.sketches is None:
+            self.build_sketches()
+
+        ts = self.daily_totals.copy()
+        ts["ctr"] = ts["clicks"] / ts["impressions"].replace(0, 1)
+        ts["roas"] = ts["revenue"] / ts["spend"].replace(0, 1)
+
+        campaigns = self.sketches.get("campaign_name")
+        cs = pd.DataFrame(campaigns.estimate(campaigns.candidates()) if campaigns else [])
+        if not cs.empty:
+            cs["ctr"] = cs["clicks"] / cs["impressions"].replace(0, 1)
+            cs["roas"] = cs["revenue"] / cs["spend"].replace(0, 1)
+
+        return {
+            "mode": "approx",
+            "timeseries": ts.reset_index().to_dict(orient="records"),
+            "campaign_summary": cs.to_dict(orient="records"),
+            "levels": {lvl: sketch.report() for lvl, sketch in self.sketches.items()},
+            "schema": self.df.dtypes.astype(str).to_dict() if self.df is not None else {},
+        }
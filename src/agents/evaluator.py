@@ -1,51 +1,200 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .hypotheses import TEMPLATES, HypothesisBatch
+from .tracing import NULL_TRACER
+
+_PEER_SUFFIX = "_vs_peers"
+_LAG_SUFFIX = "_lag"
+
+
+def _bootstrap_slopes(y, idx):
+    """
+    OLS slope of y against its position, for every row of a (B x n)
+    resample index matrix at once. Degenerate resamples yield NaN.
+    """
+    x = idx.astype(float)
+    ys = y[idx]
+    dx = x - x.mean(axis=1, keepdims=True)
+    dy = ys - ys.mean(axis=1, keepdims=True)
+    sxx = (dx * dx).sum(axis=1)
+    sxy = (dx * dy).sum(axis=1)
+    out = np.full(len(idx), np.nan)
+    np.divide(sxy, sxx, out=out, where=sxx > 0)
+    return out
+
+
+def _bootstrap_corr(a, b, idx):
+    """Pearson correlation of (a, b) for every row of a (B x n) index matrix."""
+    xa = a[idx]
+    xb = b[idx]
+    da = xa - xa.mean(axis=1, keepdims=True)
+    db = xb - xb.mean(axis=1, keepdims=True)
+    denom = np.sqrt((da * da).sum(axis=1) * (db * db).sum(axis=1))
+    out = np.full(len(idx), np.nan)
+    np.divide((da * db).sum(axis=1), denom, out=out, where=denom > 0)
+    return out
+
+
+def _summarize(samples, level):
+    samples = samples[~np.isnan(samples)]
+    if len(samples) == 0:
+        return None
+    tail = (1 - level) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail])
+    return {
+        "low": float(low),
+        "high": float(high),
+        "level": level,
+        "samples": int(len(samples)),
+        "support": float(np.mean(samples < 0)),
+    }
+
+
+def _campaign_slope_ci(job):
+    """Process-pool entry point: (campaign, y, B, seed, level) -> (campaign, ci)."""
+    campaign, y, n_boot, seed, level = job
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(y), size=(n_boot, len(y)))
+    return campaign, _summarize(_bootstrap_slopes(y, idx), level)
+
+
 class EvaluatorAgent:
     """
     Validates hypotheses using scoring rules.
     Produces a confidence score (0–1) and marks valid/invalid.
+
+    With confidence_mode = "bootstrap", CTR-trend and ROAS/spend hypotheses
+    are instead scored by the share of bootstrap resamples that agree with
+    the hypothesised (negative) direction, and carry a confidence interval.
+
+    `daily` (exact per-date totals, e.g. DataAgent.daily_totals) replaces
+    the frame for the account-level ROAS/spend interval when the frame
+    only holds some campaigns' rows.
+
+    A HypothesisBatch is scored column-wise and returned as a scored batch;
+    a list of dicts gets a list of dicts back.
     """
 
-    def __init__(self, df, config):
+    def __init__(self, df, config, rng=None, tracer=None, daily=None):
         self.df = df
+        self.daily = daily
+        self.tracer = tracer or NULL_TRACER
         self.min_conf = config.get("confidence_min", 0.6)
+        self.mode = config.get("confidence_mode", "heuristic")
+        self.n_boot = int(config.get("bootstrap_samples", 1000))
+        self.ci_level = float(config.get("bootstrap_ci", 0.95))
+        self.workers = int(config.get("bootstrap_workers", 0) or 0)
+        self.rng = rng if rng is not None else np.random.default_rng(config.get("random_seed", 42))
 
     def validate(self, hypotheses):
-        results = []
-
-        for h in hypotheses:
-            score = 0.5  # base
-
-            evidence = h.get("evidence", {})
-
-            # CTR-based hypotheses
-            if h.get("metric") == "ctr":
-                if evidence.get("trend", 0) < -0.01:
-                    score += 0.2
-                if evidence.get("mean", 1) < 0.02:
-                    score += 0.2
-
-            # ROAS vs spend correlation
-            if h.get("id") == "roas_spend_negative":
-                corr = h.get("value", 0)
-                if corr < -0.20:
-                    score += 0.25
-
-            # Fatigue
-            if h.get("metric") == "frequency":
-                if evidence.get("frequency", 0) > 3:
-                    score += 0.15
-                if evidence.get("ctr", 1) < 0.01:
-                    score += 0.15
-
-            # clamp between 0 and 1
-            score = max(0, min(1, score))
-
-            results.append({
-                "id": h["id"],
-                "hypothesis": h["hypothesis"],
-                "campaign": h.get("campaign"),
-                "confidence": score,
-                "valid": score >= self.min_conf,
-                "raw_evidence": evidence
-            })
-
-        return results
+        with self.tracer.span("evaluate", hypotheses=len(hypotheses), mode=self.mode):
+            if isinstance(hypotheses, HypothesisBatch):
+                return self._validate_batch(hypotheses)
+            # one set of rules: dicts are scored as a batch and converted back
+            return self._validate_batch(HypothesisBatch.from_dicts(hypotheses)).to_dicts()
+
+    def _validate_batch(self, batch):
+        """The scoring rules, applied per column of a HypothesisBatch."""
+        score = np.full(len(batch), 0.5)
+
+        ctr = batch.mask(metric="ctr")
+        score += np.where(ctr & (batch.field("trend") < -0.01), 0.2, 0.0)
+        score += np.where(ctr & (batch.field("mean") < 0.02), 0.2, 0.0)
+
+        roas = batch.mask(kind="roas_spend")
+        score += np.where(roas & (batch.field("correlation") < -0.20), 0.25, 0.0)
+
+        fatigue = batch.mask(metric="frequency")
+        score += np.where(fatigue & (batch.field("frequency") > 3), 0.15, 0.0)
+        score += np.where(fatigue & (batch.field("ctr") < 0.01), 0.15, 0.0)
+
+        sign = np.zeros(len(batch))
+        for t in TEMPLATES.values():
+            if t.metric.endswith(_PEER_SUFFIX):
+                sign[batch.mask(kind=t.kind)] = -1.0 if t.direction == "decrease" else 1.0
+        peer = sign != 0
+        score += np.where(peer & (batch.field("share") >= 0.5), 0.2, 0.0)
+        score += np.where(peer & (sign * batch.field("median_z") >= 2.0), 0.2, 0.0)
+
+        lagged = np.zeros(len(batch), dtype=bool)
+        for t in TEMPLATES.values():
+            if t.metric.endswith(_LAG_SUFFIX):
+                lagged |= batch.mask(kind=t.kind)
+        corr = batch.field("correlation")
+        score += np.where(lagged & (corr >= 0.5), 0.2, 0.0)
+        score += np.where(lagged & (corr - batch.field("same_day_correlation") >= 0.2), 0.2, 0.0)
+
+        ci = {}
+        if self.mode == "bootstrap":
+            ids = batch.ids()
+            intervals = self._bootstrap_intervals(
+                [(hid, batch.template(i).metric, batch.campaigns[i]) for i, hid in enumerate(ids)]
+            )
+            for i, hid in enumerate(ids):
+                if hid in intervals:
+                    ci[i] = intervals[hid]
+                    score[i] = intervals[hid]["support"]
+
+        score = np.clip(score, 0, 1)
+        return batch.scored(score, score >= self.min_conf, ci)
+
+    # --------------------------------------------------------
+    # Bootstrap confidence intervals
+    # --------------------------------------------------------
+    def _bootstrap_intervals(self, rows):
+        """
+        Map hypothesis id -> bootstrap CI summary for supported hypothesis
+        types, given (id, metric, campaign) per hypothesis.
+        """
+        with self.tracer.span("evaluate.bootstrap", hypotheses=len(rows), samples=self.n_boot):
+            intervals = {}
+
+            ctr_ids = {}
+            for hid, metric, campaign in rows:
+                if metric == "ctr" and campaign is not None:
+                    ctr_ids.setdefault(campaign, []).append(hid)
+
+            if ctr_ids:
+                for campaign, ci in self._campaign_slope_intervals(sorted(ctr_ids)).items():
+                    for hid in ctr_ids[campaign]:
+                        intervals[hid] = ci
+
+            if any(hid == "roas_spend_negative" for hid, _, _ in rows):
+                ci = self._roas_spend_interval()
+                if ci is not None:
+                    intervals["roas_spend_negative"] = ci
+
+            return {k: v for k, v in intervals.items() if v is not None}
+
+    def _campaign_slope_intervals(self, campaigns):
+        df = self.df[self.df["campaign_name"].isin(campaigns)].sort_values("date", kind="stable")
+        series = {c: g["ctr"].to_numpy(dtype=float) for c, g in df.groupby("campaign_name")}
+
+        # one child seed per campaign, drawn in sorted order, so results do
+        # not depend on whether (or how) the work is spread across processes
+        seeds = self.rng.integers(0, 2**32, size=len(campaigns))
+        jobs = [
+            (c, series[c], self.n_boot, int(seed), self.ci_level)
+            for c, seed in zip(campaigns, seeds)
+            if c in series and len(series[c]) >= 3
+        ]
+
+        if self.workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                return dict(pool.map(_campaign_slope_ci, jobs))
+        return dict(map(_campaign_slope_ci, jobs))
+
+    def _roas_spend_interval(self):
+        if self.daily is not None:
+            t = self.daily[["spend", "revenue"]]
+        else:
+            t = self.df.groupby("date").agg({"spend": "sum", "revenue": "sum"})
+        if len(t) < 3:
+            return None
+        spend = t["spend"].to_numpy(dtype=float)
+        safe_spend = np.where(spend == 0, 1.0, spend)
+        roas = t["revenue"].to_numpy(dtype=float) / safe_spend
+        idx = self.rng.integers(0, len(t), size=(self.n_boot, len(t)))
+        return _summarize(_bootstrap_corr(roas, spend, idx), self.ci_level)
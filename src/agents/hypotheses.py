@@ -0,0 +1,311 @@
+import sys
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class HypothesisTemplate:
+    """
+    Everything hypotheses of one kind have in common: id prefix, text,
+    metric, direction and the names of their numeric evidence fields.
+    Each template exists once, so a batch only stores a one-byte kind code
+    per hypothesis instead of repeating these strings.
+
+    `value_field` is also exposed as the top-level "value" of the dict
+    form; `per_campaign` templates put the campaign in both the id and the
+    evidence. A hypothesis text with {placeholders} is formatted from the
+    evidence of each hypothesis.
+    """
+
+    __slots__ = ("kind", "code", "id_prefix", "hypothesis", "metric", "direction",
+                 "fields", "int_fields", "value_field", "per_campaign", "formatted")
+
+    def __init__(self, kind, code, id_prefix, hypothesis, metric, fields, direction=None,
+                 int_fields=(), value_field=None, per_campaign=True):
+        self.kind = kind
+        self.code = code
+        self.id_prefix = sys.intern(id_prefix)
+        self.hypothesis = sys.intern(hypothesis)
+        self.metric = sys.intern(metric)
+        self.direction = direction
+        self.fields = tuple(fields)
+        self.int_fields = frozenset(int_fields)
+        self.value_field = value_field
+        self.per_campaign = per_campaign
+        self.formatted = "{" in hypothesis
+
+    def text(self, evidence):
+        return self.hypothesis.format(**evidence) if self.formatted else self.hypothesis
+
+
+TEMPLATES = {}
+_BY_CODE = []
+MAX_FIELDS = 4
+
+
+def register_template(kind, id_prefix, hypothesis, metric, fields, **kwargs):
+    """Register (or return the already registered) template for `kind`."""
+    if kind in TEMPLATES:
+        return TEMPLATES[kind]
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"{kind}: at most {MAX_FIELDS} evidence fields")
+    template = HypothesisTemplate(kind, len(_BY_CODE), id_prefix, hypothesis, metric, fields, **kwargs)
+    TEMPLATES[kind] = template
+    _BY_CODE.append(template)
+    return template
+
+
+register_template(
+    "ctr_drop", "ctr_drop_", "CTR is falling — creative fatigue or weak messaging", "ctr",
+    ("trend", "mean", "n"), direction="decrease", int_fields=("n",),
+)
+register_template(
+    "roas_spend", "roas_spend_negative", "Increasing spend correlates with decreasing ROAS", "roas_vs_spend",
+    ("correlation",), value_field="correlation", per_campaign=False,
+)
+register_template(
+    "fatigue", "fatigue_", "High frequency + low CTR indicates audience fatigue", "frequency",
+    ("frequency", "ctr"),
+)
+
+_PEER_FIELDS = ("median_z", "outlier_days", "days", "share")
+register_template(
+    "peer_ctr", "peer_ctr_low_",
+    "CTR is below peer campaigns on the same days — a campaign-specific problem, not a market-wide dip",
+    "ctr_vs_peers", _PEER_FIELDS, direction="decrease", int_fields=("outlier_days", "days"),
+)
+register_template(
+    "peer_roas", "peer_roas_low_",
+    "ROAS is below peer campaigns on the same days — a campaign-specific problem, not a market-wide dip",
+    "roas_vs_peers", _PEER_FIELDS, direction="decrease", int_fields=("outlier_days", "days"),
+)
+register_template(
+    "peer_cpc", "peer_cpc_high_",
+    "CPC is above peer campaigns on the same days — a campaign-specific problem, not a market-wide dip",
+    "cpc_vs_peers", _PEER_FIELDS, direction="increase", int_fields=("outlier_days", "days"),
+)
+
+_LAG_FIELDS = ("lag", "correlation", "same_day_correlation", "days")
+register_template(
+    "lag_revenue", "revenue_lags_spend_", "Revenue lags spend by {lag} day(s) — conversions arrive after the spend",
+    "spend_revenue_lag", _LAG_FIELDS, int_fields=("lag", "days"),
+)
+register_template(
+    "lag_purchases", "purchases_lag_spend_", "Purchases lag spend by {lag} day(s) — conversions arrive after the spend",
+    "spend_purchases_lag", _LAG_FIELDS, int_fields=("lag", "days"),
+)
+
+
+def _template_for(hypothesis_id, campaign):
+    for t in _BY_CODE:
+        if t.per_campaign:
+            if campaign is not None and hypothesis_id == t.id_prefix + str(campaign):
+                return t
+        elif hypothesis_id == t.id_prefix:
+            return t
+    raise ValueError(f"no hypothesis template matches {hypothesis_id!r}")
+
+
+class HypothesisBatch(Sequence):
+    """
+    Struct-of-arrays hypotheses: a kind code, an interned campaign name and
+    a row of float evidence per hypothesis, plus confidence / valid columns
+    once evaluated. Indexing or iterating yields the usual dicts (candidate
+    form, or the evaluator's form once scored), built on demand, so the
+    dict representation only exists while something is serialising it.
+    """
+
+    __slots__ = ("kinds", "campaigns", "evidence", "confidence", "valid", "ci")
+
+    def __init__(self, kinds, campaigns, evidence, confidence=None, valid=None, ci=None):
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.campaigns = campaigns
+        self.evidence = evidence
+        self.confidence = confidence
+        self.valid = valid
+        self.ci = ci or {}
+
+    # --------------------------------------------------------
+    # Construction
+    # --------------------------------------------------------
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, np.int8), np.empty(0, dtype=object), np.zeros((0, MAX_FIELDS)))
+
+    @classmethod
+    def of(cls, kind, campaigns=None, **fields):
+        """
+        Batch of one kind from column arrays, e.g.
+        HypothesisBatch.of("fatigue", campaigns=names, frequency=f, ctr=c).
+        """
+        template = TEMPLATES[kind]
+        n = len(campaigns) if campaigns is not None else len(next(iter(fields.values()), ()))
+        evidence = np.full((n, MAX_FIELDS), np.nan)
+        for j, name in enumerate(template.fields):
+            evidence[:, j] = np.asarray(fields[name], dtype=np.float64)
+        names = np.empty(n, dtype=object)
+        if campaigns is not None:
+            names[:] = [sys.intern(str(c)) for c in campaigns]
+        return cls(np.full(n, template.code, np.int8), names, evidence)
+
+    @classmethod
+    def concat(cls, batches):
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        return cls(
+            np.concatenate([b.kinds for b in batches]),
+            np.concatenate([b.campaigns for b in batches]),
+            np.concatenate([b.evidence for b in batches]),
+        )
+
+    @classmethod
+    def from_dicts(cls, items):
+        """
+        Inverse of to_dicts() for candidate or evaluated dicts (e.g. read
+        back from JSON). Raises ValueError for a hypothesis that matches no
+        registered template.
+        """
+        items = list(items)
+        n = len(items)
+        kinds = np.zeros(n, np.int8)
+        names = np.empty(n, dtype=object)
+        evidence = np.full((n, MAX_FIELDS), np.nan)
+        scored = n > 0 and "confidence" in items[0]
+        confidence, valid, ci = np.zeros(n), np.zeros(n, dtype=bool), {}
+
+        for i, h in enumerate(items):
+            campaign = h.get("campaign")
+            t = _template_for(h["id"], campaign)
+            kinds[i] = t.code
+            names[i] = sys.intern(str(campaign)) if t.per_campaign else None
+            ev = h.get("raw_evidence" if scored else "evidence") or {}
+            for j, name in enumerate(t.fields):
+                v = ev.get(name)
+                evidence[i, j] = np.nan if v is None else v
+            if scored:
+                confidence[i] = h["confidence"]
+                valid[i] = h["valid"]
+                if h.get("ci") is not None:
+                    ci[i] = h["ci"]
+
+        batch = cls(kinds, names, evidence)
+        return batch.scored(confidence, valid, ci) if scored else batch
+
+    @classmethod
+    def coerce(cls, value):
+        """`value` as a batch: batches pass through, lists of dicts are converted."""
+        return value if isinstance(value, cls) else cls.from_dicts(value)
+
+    def scored(self, confidence, valid, ci=None):
+        """Same hypotheses with evaluator columns attached (arrays are shared)."""
+        return HypothesisBatch(self.kinds, self.campaigns, self.evidence,
+                               np.asarray(confidence, dtype=np.float64), np.asarray(valid, dtype=bool), ci)
+
+    def take(self, idx):
+        idx = np.arange(len(self))[idx] if isinstance(idx, slice) else np.asarray(idx)
+        pos = {int(i): k for k, i in enumerate(idx)}
+        return HypothesisBatch(
+            self.kinds[idx], self.campaigns[idx], self.evidence[idx],
+            None if self.confidence is None else self.confidence[idx],
+            None if self.valid is None else self.valid[idx],
+            {pos[i]: v for i, v in self.ci.items() if i in pos},
+        )
+
+    # --------------------------------------------------------
+    # Columns
+    # --------------------------------------------------------
+    @property
+    def is_scored(self):
+        return self.confidence is not None
+
+    def template(self, i):
+        return _BY_CODE[self.kinds[i]]
+
+    def mask(self, kind=None, metric=None):
+        """Boolean mask of rows of a template kind and/or metric."""
+        codes = [t.code for t in _BY_CODE
+                 if (kind is None or t.kind == kind) and (metric is None or t.metric == metric)]
+        return np.isin(self.kinds, codes)
+
+    def field(self, name):
+        """Evidence column `name` (NaN for kinds without that field)."""
+        out = np.full(len(self), np.nan)
+        for t in _BY_CODE:
+            if name in t.fields:
+                rows = self.kinds == t.code
+                out[rows] = self.evidence[rows, t.fields.index(name)]
+        return out
+
+    def hypothesis_id(self, i):
+        t = self.template(i)
+        return t.id_prefix + self.campaigns[i] if t.per_campaign else t.id_prefix
+
+    def ids(self):
+        return [self.hypothesis_id(i) for i in range(len(self))]
+
+    # --------------------------------------------------------
+    # Dict views
+    # --------------------------------------------------------
+    def _evidence(self, i, t):
+        out = {"campaign": self.campaigns[i]} if t.per_campaign else {}
+        for j, name in enumerate(t.fields):
+            v = float(self.evidence[i, j])
+            # a count absent from the input dict (NaN) has no integer value
+            out[name] = (int(v) if v == v else None) if name in t.int_fields else v
+        return out
+
+    def candidate_dict(self, i):
+        t = self.template(i)
+        evidence = self._evidence(i, t)
+        out = {"id": self.hypothesis_id(i), "hypothesis": t.text(evidence)}
+        if t.per_campaign:
+            out["campaign"] = self.campaigns[i]
+        out["metric"] = t.metric
+        if t.value_field is not None:
+            out["value"] = evidence[t.value_field]
+        if t.direction is not None:
+            out["direction"] = t.direction
+        out["evidence"] = evidence
+        return out
+
+    def validated_dict(self, i):
+        t = self.template(i)
+        evidence = self._evidence(i, t)
+        out = {
+            "id": self.hypothesis_id(i),
+            "hypothesis": t.text(evidence),
+            "campaign": self.campaigns[i],
+            "confidence": float(self.confidence[i]),
+            "valid": bool(self.valid[i]),
+            "raw_evidence": evidence,
+        }
+        if i in self.ci:
+            out["ci"] = self.ci[i]
+        return out
+
+    def to_dicts(self):
+        return list(self)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.validated_dict(i) if self.is_scored else self.candidate_dict(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, (HypothesisBatch, list)):
+            return self.to_dicts() == list(other)
+        return NotImplemented
+
+    __hash__ = None
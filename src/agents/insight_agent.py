@@ -1,68 +1,195 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
+
+from . import lag_correlation, peer_outliers
+from .hypotheses import HypothesisBatch
+from .tracing import NULL_TRACER
+
+# Row layout of the shared numeric block used by parallel workers
+_SHARED_COLUMNS = ("date", "ctr", "impressions", "clicks")
+
+
+def _campaign_stats_worker(task):
+    """
+    Process-pool entry point. Attaches to the shared numeric block and
+    computes CTR trend + frequency stats for a contiguous range of
+    campaign groups (rows are pre-sorted by campaign, then date).
+    """
+    shm_name, shape, campaigns, starts, ends = task
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        dates, ctr, impressions, clicks = block
+        trends, freqs = [], []
+        for campaign, lo, hi in zip(campaigns, starts, ends):
+            y = ctr[lo:hi]
+            n = hi - lo
+            if n >= 3:
+                x = np.arange(n, dtype=np.float64)
+                dx = x - x.mean()
+                slope = float((dx * (y - y.mean())).sum() / (dx * dx).sum())
+                trends.append({"campaign": campaign, "trend": slope, "mean": float(np.mean(y)), "n": int(n)})
+
+            d = dates[lo:hi]
+            span = np.nanmax(d) - np.nanmin(d) if not np.isnan(d).all() else 0
+            days = max(1, int(span) + 1)
+            imp = np.nansum(impressions[lo:hi])
+            clk = np.nansum(clicks[lo:hi])
+            freqs.append({
+                "campaign": campaign,
+                "frequency": float(imp / days / 1000),
+                "ctr": float(clk / imp if imp > 0 else 0),
+            })
+        del block, dates, ctr, impressions, clicks
+        return trends, freqs
+    finally:
+        shm.close()
 
 
 class InsightAgent:
     """
     Produces hypotheses that explain CTR/ROAS changes.
     Uses heuristics + trend detection + correlations.
+
+    Per-campaign trend and frequency stats can be spread across worker
+    processes (insight_workers > 1) once the frame reaches
+    parallel_min_rows; smaller inputs always run serially.
+
+    When a MetricStore is given, daily totals and per-campaign frequency
+    stats are read from its memory-mapped matrices instead of the frame.
+
+    `focus` (e.g. the heavy-hitter campaigns from DataAgent's approximate
+    mode) restricts the per-campaign analyses to those campaigns; the
+    account-level correlation still covers every campaign, from `daily`
+    (exact per-date totals, e.g. DataAgent.daily_totals) when the frame
+    only holds the focus rows.
+
+    Peer outliers (peer_outlier_metrics) compare every campaign with the
+    other campaigns on the same days, using robust z-scores over dense
+    campaign x date matrices (see peer_outliers). Lagged spend ->
+    revenue / purchases responses are found per campaign with FFT
+    cross-correlation over the same matrices (see lag_correlation).
     """
 
-    def __init__(self, df):
+    def __init__(self, df, config=None, store=None, focus=None, tracer=None, daily=None):
+        self.tracer = tracer or NULL_TRACER
         self.df = df.copy()
         self.df["date"] = pd.to_datetime(self.df["date"])
+        self.store = store
+        self.focus = set(focus) if focus is not None else None
+        self.daily = daily
+        self.config = config or {}
+        self.workers = int(self.config.get("insight_workers", 1) or 1)
+        self.parallel_min_rows = int(self.config.get("parallel_min_rows", 50000))
+        self.peer_metrics = list(self.config.get("peer_outlier_metrics", peer_outliers.PEER_METRICS))
+        self.lag_targets = list(self.config.get("lag_targets", lag_correlation.LAG_TARGETS))
 
-    def generate_candidates(self):
-        candidates = []
-
-        # 1. CTR trend per campaign
-        ctr_trends = self._metric_trend("ctr", by="campaign_name")
-        for item in ctr_trends:
-            if item["trend"] < -0.01:    # falling CTR
-                candidates.append({
-                    "id": f"ctr_drop_{item['campaign']}",
-                    "hypothesis": "CTR is falling — creative fatigue or weak messaging",
-                    "campaign": item["campaign"],
-                    "metric": "ctr",
-                    "direction": "decrease",
-                    "evidence": item
-                })
+    def generate_candidates(self, account_level=True):
+        """
+        account_level=False skips the account-wide ROAS/spend correlation,
+        e.g. when this agent only sees one campaign shard.
+        """
+        return self.candidate_batch(account_level).to_dicts()
+
+    def candidate_batch(self, account_level=True):
+        """Same candidates as generate_candidates(), as a columnar HypothesisBatch."""
+        with self.tracer.span("insights", rows=len(self.df)) as span:
+            batch = self._candidate_batch(account_level)
+            span.set(hypotheses=len(batch))
+            return batch
+
+    def _candidate_batch(self, account_level):
+        tracer = self.tracer
+        if self.workers > 1 and len(self._campaign_rows()) >= self.parallel_min_rows:
+            with tracer.span("insights.parallel_stats", workers=self.workers):
+                ctr_trends, freq_info = self._parallel_campaign_stats()
+        else:
+            ctr_trends, freq_info = None, None
+
+        # 1. CTR trend per campaign (falling CTR)
+        if ctr_trends is None:
+            with tracer.span("insights.trend"):
+                ctr_trends = self._metric_trend("ctr", by="campaign_name")
+        falling = [item for item in ctr_trends if item["trend"] < -0.01]
+        parts = [HypothesisBatch.of(
+            "ctr_drop",
+            campaigns=[item["campaign"] for item in falling],
+            trend=[item["trend"] for item in falling],
+            mean=[item["mean"] for item in falling],
+            n=[item["n"] for item in falling],
+        )]
 
         # 2. ROAS vs Spend correlation
-        roas_corr = self._roas_spend_correlation()
-        if roas_corr is not None and roas_corr < -0.15:
-            candidates.append({
-                "id": "roas_spend_negative",
-                "hypothesis": "Increasing spend correlates with decreasing ROAS",
-                "metric": "roas_vs_spend",
-                "value": roas_corr,
-                "evidence": {"correlation": roas_corr}
-            })
+        with tracer.span("insights.roas_spend"):
+            roas_corr = self._roas_spend_correlation() if account_level else None
+        if self.roas_spend_candidate(roas_corr) is not None:
+            parts.append(HypothesisBatch.of("roas_spend", correlation=[roas_corr]))
 
         # 3. Frequency fatigue (approx)
-        freq_info = self._frequency_check()
-        for row in freq_info:
-            if row["frequency"] > 3 and row["ctr"] < 0.01:
-                candidates.append({
-                    "id": f"fatigue_{row['campaign']}",
-                    "hypothesis": "High frequency + low CTR indicates audience fatigue",
-                    "campaign": row["campaign"],
-                    "metric": "frequency",
-                    "evidence": row
-                })
-
-        return candidates
+        if freq_info is None:
+            with tracer.span("insights.frequency"):
+                freq_info = self._frequency_check()
+        fatigued = [row for row in freq_info if row["frequency"] > 3 and row["ctr"] < 0.01]
+        parts.append(HypothesisBatch.of(
+            "fatigue",
+            campaigns=[row["campaign"] for row in fatigued],
+            frequency=[row["frequency"] for row in fatigued],
+            ctr=[row["ctr"] for row in fatigued],
+        ))
+
+        # 4. Cross-sectional outliers vs same-day peers (needs every campaign)
+        if account_level and self.peer_metrics:
+            with tracer.span("insights.peer_outliers"):
+                campaigns, sums = self.campaign_day_matrices(peer_outliers.input_columns(self.peer_metrics))
+                parts.append(peer_outliers.detect(campaigns, sums, self.peer_metrics, **peer_outliers.config_params(self.config)))
+
+        # 5. Revenue / purchases responding to spend with a delay
+        if self.lag_targets:
+            with tracer.span("insights.lag_correlation"):
+                campaigns, sums = self.campaign_day_matrices(["spend"] + self.lag_targets, focus=True)
+                parts.append(lag_correlation.detect(campaigns, sums, self.lag_targets, **lag_correlation.config_params(self.config)))
+
+        return HypothesisBatch.concat(parts)
+
+    def campaign_day_matrices(self, columns, focus=False):
+        """
+        Sorted campaign names and dense [campaign x day] sums of `columns`
+        (from the MetricStore when there is one). focus=True keeps only
+        the focus campaigns.
+        """
+        if self.store is None:
+            df = self._campaign_rows() if focus else self.df
+            return peer_outliers.sum_matrices(df, columns)
+        names = np.asarray(self.store.campaigns, dtype=object)
+        order = np.argsort(names, kind="stable")
+        if focus and self.focus is not None:
+            order = order[np.isin(names[order], list(self.focus))]
+        return (
+            [self.store.campaigns[i] for i in order],
+            {col: np.asarray(self.store.matrix(col))[order] for col in columns},
+        )
+
+    def _campaign_rows(self):
+        if self.focus is None:
+            return self.df
+        return self.df[self.df["campaign_name"].isin(self.focus)]
 
     def _metric_trend(self, metric, by="campaign_name"):
+        # sklearn is heavy to import; defer it until a trend is actually fit
+        from sklearn.linear_model import LinearRegression
+
         results = []
-        for campaign, group in self.df.groupby(by):
-            group = group.sort_values("date")
+        for campaign, group in self._campaign_rows().groupby(by):
+            group = group.sort_values("date", kind="stable")
             y = group[metric].values
             if len(y) < 3:
                 continue
             X = np.arange(len(y)).reshape(-1, 1)
-            model = LinearRegression().fit(X, y)
+            with self.tracer.span("insights.fit", sampled=True, campaign=campaign, n=len(y)):
+                model = LinearRegression().fit(X, y)
             slope = float(model.coef_[0])
             results.append({
                 "campaign": campaign,
@@ -72,19 +199,44 @@ class InsightAgent:
             })
         return results
 
-    def _roas_spend_correlation(self):
-        t = self.df.groupby("date").agg({
-            "spend": "sum",
-            "revenue": "sum"
-        }).reset_index()
+    @staticmethod
+    def roas_spend_candidate(roas_corr):
+        if roas_corr is None or not roas_corr < -0.15:
+            return None
+        return {
+            "id": "roas_spend_negative",
+            "hypothesis": "Increasing spend correlates with decreasing ROAS",
+            "metric": "roas_vs_spend",
+            "value": roas_corr,
+            "evidence": {"correlation": roas_corr}
+        }
+
+    @staticmethod
+    def daily_roas_spend_correlation(t):
+        """Pearson(ROAS, spend) over a daily totals frame with spend/revenue columns."""
         if len(t) < 3:
             return None
-        t["roas"] = t["revenue"] / t["spend"].replace(0, 1)
+        t = t.assign(roas=t["revenue"] / t["spend"].replace(0, 1))
         return float(t["roas"].corr(t["spend"]))
 
+    def _roas_spend_correlation(self):
+        if self.store is not None:
+            t = self.store.daily_totals(("spend", "revenue"))
+        elif self.daily is not None:
+            t = self.daily[["spend", "revenue"]]
+        else:
+            t = self.df.groupby("date").agg({
+                "spend": "sum",
+                "revenue": "sum"
+            }).reset_index()
+        return self.daily_roas_spend_correlation(t)
+
     def _frequency_check(self):
+        if self.store is not None:
+            return self._store_frequency_check()
+
         results = []
-        for campaign, g in self.df.groupby("campaign_name"):
+        for campaign, g in self._campaign_rows().groupby("campaign_name"):
             days = max(1, (g["date"].max() - g["date"].min()).days + 1)
             impressions = g["impressions"].sum()
             clicks = g["clicks"].sum()
@@ -98,3 +250,62 @@ class InsightAgent:
                 "ctr": float(ctr)
             })
         return results
+
+    def _store_frequency_check(self):
+        t = self.store.campaign_totals(("impressions", "clicks"))
+        days = np.maximum(1, (t["last_date"] - t["first_date"]).dt.days.to_numpy() + 1)
+        impressions = t["impressions"].to_numpy()
+        clicks = t["clicks"].to_numpy()
+        frequency = impressions / days / 1000
+        ctr = np.divide(clicks, impressions, out=np.zeros(len(t)), where=impressions > 0)
+        return [
+            {"campaign": c, "frequency": float(f), "ctr": float(r)}
+            for c, f, r in zip(t["campaign_name"], frequency, ctr)
+            if self.focus is None or c in self.focus
+        ]
+
+    # --------------------------------------------------------
+    # Parallel per-campaign stats (shared memory)
+    # --------------------------------------------------------
+    def _parallel_campaign_stats(self):
+        """
+        Same results as _metric_trend("ctr") + _frequency_check(), computed
+        by worker processes that read the numeric columns from one shared
+        memory block instead of receiving pickled DataFrame slices.
+        """
+        df = self._campaign_rows().sort_values(["campaign_name", "date"], kind="stable")
+        n = len(df)
+
+        names = df["campaign_name"].to_numpy()
+        bounds = np.flatnonzero(names[1:] != names[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [n]))
+        campaigns = [names[i] for i in starts]
+
+        shape = (len(_SHARED_COLUMNS), n)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * shape[0] * shape[1]))
+        try:
+            block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            dates = df["date"].to_numpy().astype("datetime64[D]")
+            block[0] = np.where(np.isnat(dates), np.nan, dates.astype(np.int64))
+            for i, col in enumerate(_SHARED_COLUMNS[1:], start=1):
+                block[i] = df[col].to_numpy(dtype=np.float64)
+            del block
+
+            # contiguous, row-balanced partitions keep output in campaign order
+            cuts = np.searchsorted(ends, np.linspace(0, n, self.workers + 1)[1:-1], side="left")
+            parts = np.split(np.arange(len(campaigns)), cuts)
+            tasks = [
+                (shm.name, shape, [campaigns[i] for i in p], starts[p].tolist(), ends[p].tolist())
+                for p in parts if len(p)
+            ]
+
+            trends, freqs = [], []
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for t, f in pool.map(_campaign_stats_worker, tasks):
+                    trends.extend(t)
+                    freqs.extend(f)
+            return trends, freqs
+        finally:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,79 @@
+import numpy as np
+from scipy import fft
+
+from .hypotheses import HypothesisBatch
+
+# response column -> hypothesis kind
+LAG_TARGETS = {"revenue": "lag_revenue", "purchases": "lag_purchases"}
+
+
+def config_params(config):
+    """detect() keyword arguments from the lag_* config keys."""
+    return {
+        "max_lag": int(config.get("lag_max_days", 7)),
+        "min_corr": float(config.get("lag_min_corr", 0.3)),
+        "min_gain": float(config.get("lag_min_gain", 0.1)),
+        "min_days": int(config.get("lag_min_days", 14)),
+    }
+
+
+def _centered(M):
+    """Rows centered on their observed days; missing days become 0."""
+    observed = ~np.isnan(M)
+    n = observed.sum(axis=1)
+    mean = np.divide(np.nansum(M, axis=1), n, out=np.zeros(len(M)), where=n > 0)
+    return np.where(observed, M - mean[:, None], 0.0)
+
+
+def cross_correlation(x, y, max_lag):
+    """
+    Normalised cross-correlation r[c, L] = sum_t x[c, t] * y[c, t + L] /
+    sqrt(sum x^2 * sum y^2) for L = 0..max_lag and every row c at once:
+    both [campaign x day] matrices are zero-padded to an FFT-friendly
+    length (>= days + max_lag, so no circular wrap-around reaches these
+    lags) and correlated as irfft(conj(X) * Y). NaN days count as missing.
+    """
+    x, y = _centered(x), _centered(y)
+    n = fft.next_fast_len(x.shape[1] + max_lag, real=True)
+    X = fft.rfft(x, n=n, axis=1)
+    Y = fft.rfft(y, n=n, axis=1)
+    c = fft.irfft(np.conj(X) * Y, n=n, axis=1)[:, :max_lag + 1]
+    norm = np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+    r = np.full(c.shape, np.nan)
+    np.divide(c, norm[:, None], out=r, where=norm[:, None] > 0)
+    return r
+
+
+def detect(campaigns, sums, targets=tuple(LAG_TARGETS), max_lag=7, min_corr=0.3, min_gain=0.1, min_days=14):
+    """
+    Campaigns whose `targets` (revenue, purchases) follow spend with a
+    delay: the best lag in 1..max_lag correlates at least `min_corr` and
+    beats the same-day correlation by `min_gain`, over at least
+    `min_days` days with spend data.
+    """
+    campaigns = np.asarray(campaigns, dtype=object)
+    spend = sums["spend"]
+    days = np.count_nonzero(~np.isnan(spend), axis=1)
+    parts = []
+    for target in targets:
+        r = cross_correlation(spend, sums[target], max_lag)
+        if r.shape[1] < 2:
+            continue
+        filled = np.where(np.isnan(r), -np.inf, r)
+        best = filled.argmax(axis=1)
+        best_r = filled[np.arange(len(r)), best]
+        same_day = r[:, 0]
+        flagged = np.flatnonzero(
+            (best >= 1) & (best_r >= min_corr) & (best_r - np.nan_to_num(same_day) >= min_gain) & (days >= min_days)
+        )
+        if not len(flagged):
+            continue
+        parts.append(HypothesisBatch.of(
+            LAG_TARGETS[target],
+            campaigns=campaigns[flagged],
+            lag=best[flagged],
+            correlation=best_r[flagged],
+            same_day_correlation=same_day[flagged],
+            days=days[flagged],
+        ))
+    return HypothesisBatch.concat(parts)
@@ -0,0 +1,198 @@
+import os
+import tracemalloc
+import warnings
+import zlib
+
+from .sources import codec_of
+
+MB = 1 << 20
+
+# cheapest first; the first whose estimated peak fits the budget is chosen
+STRATEGIES = ("in_memory", "downcast", "chunked")
+
+
+class MemoryBudgetError(Exception):
+    pass
+
+
+def config_params(config):
+    """plan_execution() keyword arguments from the memory_plan_* config keys."""
+    return {
+        "sample_rows": int(config.get("memory_plan_sample_rows", 2000)),
+        "chunksize": int(config.get("memory_plan_chunksize", 100000)),
+        "strict": bool(config.get("memory_budget_strict", False)),
+    }
+
+
+class ExecutionPlan:
+    """
+    The strategy chosen for one load, the estimates behind it and the
+    DataAgent config overrides that carry it out.
+    """
+
+    def __init__(self, strategy, max_memory_mb, estimate, overrides):
+        self.strategy = strategy
+        self.max_memory_mb = max_memory_mb
+        self.estimate = estimate
+        self.overrides = overrides
+
+    @property
+    def estimated_peak_mb(self):
+        return self.estimate["peak_mb"][self.strategy]
+
+    @property
+    def fits_budget(self):
+        return self.estimated_peak_mb <= self.max_memory_mb
+
+    def apply(self, data_agent):
+        """Point `data_agent` at this plan (its config is copied, not mutated)."""
+        data_agent.config = {**data_agent.config, **self.overrides}
+        return data_agent
+
+    def to_dict(self, actual_peak_mb=None):
+        out = {
+            "strategy": self.strategy,
+            "max_memory_mb": self.max_memory_mb,
+            "estimated_peak_mb": round(self.estimated_peak_mb, 2),
+            "fits_budget": self.fits_budget,
+            "overrides": dict(self.overrides),
+            "estimate": self.estimate,
+        }
+        if actual_peak_mb is not None:
+            out["actual_peak_mb"] = round(actual_peak_mb, 2)
+            out["estimate_ratio"] = round(self.estimated_peak_mb / actual_peak_mb, 3) if actual_peak_mb > 0 else None
+        return out
+
+
+def _text_rows(text, rows):
+    """(header bytes, data bytes, data lines) over the complete lines of `text`."""
+    lines = text.split(b"\n")[:rows + 2]
+    complete = lines[1:-1] if len(lines) > 1 else []
+    return len(lines[0]) + 1, sum(len(line) + 1 for line in complete), len(complete)
+
+
+def _compression_ratio(path, sample):
+    """Uncompressed / on-disk size, estimated by deflating a text sample."""
+    if not codec_of(path) or not sample:
+        return 1.0
+    return len(sample) / max(1, len(zlib.compress(sample, 6)))
+
+
+def estimate_footprint(data_agent, sample_rows=2000, chunksize=100000):
+    """
+    Estimate the rows and in-memory bytes of the input from the on-disk
+    size of every shard and a parsed sample of the first one: bytes per
+    row as text, as parsed (`raw`), after type cleaning (`clean`) and after
+    downcasting (`compact`), each from DataFrame.memory_usage(deep=True).
+    Peak estimates (MB) per strategy:
+
+    - in_memory: whole file parsed, then cleaned: rows * (raw + clean)
+    - downcast:  the same, downcast in place:      rows * (raw + compact)
+    - chunked: cleaned compact chunks, concatenated at the end:
+      2 * rows * compact + chunksize * (raw + clean); every shard is
+      streamed, so the estimate holds for multi-file input too
+    """
+    shards = data_agent._resolve_shards()
+    first = shards[0]
+
+    with data_agent._open(first) as fh:
+        text = fh.read(1 << 20)
+    ratio = _compression_ratio(first.path, text)
+    header, body, n = _text_rows(text, sample_rows)
+    text_row = body / n if n else 1.0
+
+    sample = data_agent._read_csv(first, nrows=sample_rows)
+    rows_in_sample = max(1, len(sample))
+    raw_row = sample.memory_usage(deep=True, index=False).sum() / rows_in_sample
+    data_agent._profile_and_clean(sample)
+    clean_row = sample.memory_usage(deep=True, index=False).sum() / rows_in_sample
+    dtypes = {col: str(dtype) for col, dtype in sample.dtypes.items()}
+    data_agent._compact(sample)
+    compact_row = sample.memory_usage(deep=True, index=False).sum() / rows_in_sample
+
+    disk_bytes = sum(os.path.getsize(s.path) for s in shards)
+    text_bytes = sum(os.path.getsize(s.path) * (ratio if codec_of(s.path) else 1.0) for s in shards)
+    rows = max(0, int((text_bytes - header * len(shards)) / text_row)) if text_row else 0
+    chunk = min(rows, chunksize)
+
+    in_memory = rows * (raw_row + clean_row)
+    downcast = rows * (raw_row + compact_row)
+    chunked = 2 * rows * compact_row + chunk * (raw_row + clean_row)
+    return {
+        "shards": len(shards),
+        "disk_mb": round(disk_bytes / MB, 3),
+        "compression_ratio": round(ratio, 3),
+        "rows": rows,
+        "sample_rows": n,
+        "bytes_per_row": {
+            "text": round(text_row, 1),
+            "raw": round(float(raw_row), 1),
+            "clean": round(float(clean_row), 1),
+            "compact": round(float(compact_row), 1),
+        },
+        "dtypes": dtypes,
+        "peak_mb": {
+            "in_memory": float(in_memory / MB),
+            "downcast": float(downcast / MB),
+            "chunked": float(chunked / MB),
+        },
+    }
+
+
+def choose_strategy(peak_mb, max_memory_mb):
+    """Cheapest strategy whose estimated peak fits; the smallest peak when none does."""
+    for strategy in STRATEGIES:
+        if peak_mb[strategy] <= max_memory_mb:
+            return strategy
+    return min(STRATEGIES, key=lambda s: peak_mb[s])
+
+
+def plan_execution(data_agent, max_memory_mb, sample_rows=2000, chunksize=100000, strict=False):
+    """
+    Estimate the footprint of `data_agent`'s input and choose how to load it
+    within `max_memory_mb`: in memory, with float32 / categorical
+    downcasting, or streamed in chunks.
+
+    Every strategy ends with the whole compact frame in memory, so when
+    even the cheapest estimate is over budget the plan warns (or, with
+    `strict`, raises MemoryBudgetError before anything is loaded).
+    """
+    estimate = estimate_footprint(data_agent, sample_rows=sample_rows, chunksize=chunksize)
+    strategy = choose_strategy(estimate["peak_mb"], max_memory_mb)
+
+    overrides = {}
+    if strategy != "in_memory":
+        overrides["compact_dtypes"] = True
+    if strategy == "chunked":
+        overrides["load_chunksize"] = chunksize
+    plan = ExecutionPlan(strategy, float(max_memory_mb), estimate, overrides)
+
+    if not plan.fits_budget:
+        message = (
+            f"estimated peak {plan.estimated_peak_mb:.1f} MB exceeds max_memory_mb={max_memory_mb}: "
+            f"even the {strategy} strategy keeps the compact frame in memory "
+            f"(execution_backend: sqlite keeps the rows on disk)"
+        )
+        if strict:
+            raise MemoryBudgetError(message)
+        warnings.warn(message, RuntimeWarning, stacklevel=2)
+    return plan
+
+
+def measure_peak(fn, *args, **kwargs):
+    """
+    (result, peak MB) of `fn(*args, **kwargs)`: the traced allocation peak
+    above the level at the call (numpy and pandas buffers included).
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    try:
+        result = fn(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return result, max(0, peak - base) / MB
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .creative_variants import tokenize
+
+
+class MessageIndex:
+    """
+    Sparse TF-IDF index over every distinct creative_message.
+
+    - X: [message x term] TF-IDF matrix (unigrams + bigrams)
+    - C: [campaign x message] impression matrix
+
+    Term performance is a click/impression-weighted CTR lift,
+    log(ctr_term / ctr_base) with ctr_term = (X^T clicks) / (X^T impressions)
+    shrunk toward the baseline by `prior_impressions`. Phrase lookups for a
+    campaign are a handful of sparse matrix-vector products, O(nnz), so no
+    text is tokenized after the index is built.
+
+    `load_or_build` keys the saved index by a hash of the message /
+    campaign / click / impression columns, so unchanged data reuses it.
+    """
+
+    VERSION = 1
+
+    def __init__(self, X, C, terms, campaigns, clicks, impressions, prior_impressions=1000.0):
+        self.X = X.tocsr()
+        self.C = C.tocsr()
+        self.terms = np.asarray(terms)
+        self.campaigns = list(campaigns)
+        self.campaign_ids = {c: i for i, c in enumerate(self.campaigns)}
+        self.clicks = np.asarray(clicks, dtype=np.float64)
+        self.impressions = np.asarray(impressions, dtype=np.float64)
+        self.prior = float(prior_impressions)
+
+        total_imp = self.impressions.sum()
+        self.base_ctr = self.clicks.sum() / total_imp if total_imp > 0 else 0.0
+        term_clicks = self.X.T @ self.clicks
+        term_imp = self.X.T @ self.impressions
+        if self.base_ctr > 0:
+            smoothed = (term_clicks + self.prior * self.base_ctr) / (term_imp + self.prior)
+            self.lift = np.log(np.maximum(smoothed, 1e-12) / self.base_ctr)
+        else:
+            self.lift = np.zeros(len(self.terms))
+
+    # --------------------------------------------------------
+    # Build / persist
+    # --------------------------------------------------------
+    @staticmethod
+    def _messages(df):
+        rows = df.dropna(subset=["creative_message"])
+        rows = rows.assign(creative_message=rows["creative_message"].astype(str))
+        msgs = rows.groupby("creative_message")[["clicks", "impressions"]].sum()
+        per_campaign = rows.groupby(["campaign_name", "creative_message"])["impressions"].sum()
+        return msgs, per_campaign
+
+    @classmethod
+    def build(cls, df, prior_impressions=1000.0):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        msgs, per_campaign = cls._messages(df)
+        vectorizer = TfidfVectorizer(
+            tokenizer=tokenize, token_pattern=None, lowercase=False, ngram_range=(1, 2)
+        )
+        try:
+            X = vectorizer.fit_transform(msgs.index)
+        except ValueError:  # no messages, or none with a usable word
+            empty = sparse.csr_matrix((0, 0))
+            return cls(empty, empty, [], [], [], [], prior_impressions)
+
+        campaigns = per_campaign.index.get_level_values(0).unique().sort_values()
+        rows = campaigns.get_indexer(per_campaign.index.get_level_values(0))
+        cols = msgs.index.get_indexer(per_campaign.index.get_level_values(1))
+        C = sparse.csr_matrix(
+            (np.nan_to_num(per_campaign.to_numpy(dtype=np.float64)), (rows, cols)),
+            shape=(len(campaigns), len(msgs)),
+        )
+        return cls(
+            X, C, vectorizer.get_feature_names_out(), campaigns,
+            np.nan_to_num(msgs["clicks"].to_numpy(dtype=np.float64)),
+            np.nan_to_num(msgs["impressions"].to_numpy(dtype=np.float64)),
+            prior_impressions,
+        )
+
+    @staticmethod
+    def fingerprint(df):
+        cols = [c for c in ("campaign_name", "creative_message", "clicks", "impressions") if c in df.columns]
+        h = hashlib.sha1(f"v{MessageIndex.VERSION}".encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(df[cols], index=False).to_numpy().tobytes())
+        return h.hexdigest()
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # unique per writer: concurrent builds of the same index never share a tmp file
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp.npz"
+        np.savez_compressed(
+            tmp,
+            X_data=self.X.data, X_indices=self.X.indices, X_indptr=self.X.indptr, X_shape=self.X.shape,
+            C_data=self.C.data, C_indices=self.C.indices, C_indptr=self.C.indptr, C_shape=self.C.shape,
+            terms=self.terms.astype(str), campaigns=np.array(self.campaigns, dtype=str),
+            clicks=self.clicks, impressions=self.impressions,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, prior_impressions=1000.0):
+        with np.load(path, allow_pickle=False) as z:
+            X = sparse.csr_matrix((z["X_data"], z["X_indices"], z["X_indptr"]), shape=tuple(z["X_shape"]))
+            C = sparse.csr_matrix((z["C_data"], z["C_indices"], z["C_indptr"]), shape=tuple(z["C_shape"]))
+            return cls(X, C, z["terms"], z["campaigns"].tolist(), z["clicks"], z["impressions"], prior_impressions)
+
+    @classmethod
+    def load_or_build(cls, df, cache_dir=None, prior_impressions=1000.0):
+        """Index for `df`, read from `cache_dir` when an index of the same data was saved."""
+        if not cache_dir:
+            return cls.build(df, prior_impressions)
+        path = os.path.join(cache_dir, f"{cls.fingerprint(df)}.npz")
+        if os.path.exists(path):
+            try:
+                return cls.load(path, prior_impressions)
+            except (OSError, ValueError, KeyError):
+                pass
+        index = cls.build(df, prior_impressions)
+        index.save(path)
+        return index
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+    def term_scores(self, campaign, min_similarity=0.2):
+        """
+        Per-term score for `campaign`: positive CTR lift times the term's
+        weight in messages similar to the campaign's own (cosine in TF-IDF
+        space against the impression-weighted campaign profile, ignoring
+        messages below `min_similarity`), so phrases stay on-topic but come
+        from whichever messages perform best.
+        """
+        i = self.campaign_ids.get(campaign)
+        if i is None or self.X.shape[1] == 0:
+            return np.zeros(len(self.terms))
+        profile = self.C[i] @ self.X                    # 1 x terms
+        norm = float(np.sqrt(profile.multiply(profile).sum()))
+        if norm == 0:
+            return np.zeros(len(self.terms))
+        similarity = self.X @ (profile.T / norm)        # messages x 1
+        similarity.data[similarity.data < min_similarity] = 0.0
+        relevance = np.asarray((self.X.T @ similarity).todense()).ravel()
+        return np.where(self.lift > 0, self.lift, 0.0) * relevance
+
+    def top_phrases(self, campaign, k=20):
+        """Best-scoring terms, skipping any that share a word with an earlier pick."""
+        scores = self.term_scores(campaign)
+        nz = np.flatnonzero(scores > 0)
+        phrases, covered = [], set()
+        for t in self.terms[nz[np.argsort(-scores[nz], kind="stable")]]:
+            words = str(t).split()
+            if covered.intersection(words):
+                continue
+            phrases.append(str(t))
+            covered.update(words)
+            if len(phrases) == k:
+                break
+        return phrases
@@ -0,0 +1,205 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class MetricStore:
+    """
+    Append-only binary store of daily campaign metrics.
+
+    On-disk layout (one directory):
+    - meta.json          campaign dictionary (id -> name), start date,
+                         number of days written and the day capacity
+    - <metric>.f64       dense float64 matrix [campaign_id x day_capacity],
+                         row-major, NaN where a campaign has no data
+
+    Readers map the metric files with np.memmap, so nothing is parsed.
+    Rows are preallocated to `day_capacity` days: appending a new day
+    writes into existing columns in place, and a new campaign is a new row
+    appended at the end of each file. Only outgrowing the day capacity
+    rewrites the files (capacity doubles).
+    """
+
+    METRICS = ("spend", "impressions", "clicks", "purchases", "revenue")
+    DTYPE = np.float64
+    META_FILE = "meta.json"
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, self.META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.campaigns = list(meta["campaigns"])
+        self.campaign_ids = {c: i for i, c in enumerate(self.campaigns)}
+        self.start_date = pd.Timestamp(meta["start_date"])
+        self.n_days = int(meta["n_days"])
+        self.day_capacity = int(meta["day_capacity"])
+
+    # --------------------------------------------------------
+    # Create / append
+    # --------------------------------------------------------
+    @classmethod
+    def create(cls, path, df, day_capacity=None):
+        """Write a fresh store for `df` (replacing any store at `path`)."""
+        os.makedirs(path, exist_ok=True)
+        dates = pd.to_datetime(df["date"]).dropna()
+        if dates.empty:
+            raise ValueError("Cannot build a metric store without valid dates")
+
+        start = dates.min().normalize()
+        n_days = (dates.max().normalize() - start).days + 1
+        capacity = max(int(day_capacity or 0), n_days)
+
+        cls._write_meta(path, [], start, 0, capacity)
+        for m in cls.METRICS:
+            open(cls._metric_path(path, m), "wb").close()
+
+        store = cls(path)
+        store.append(df)
+        return store
+
+    def append(self, df):
+        """
+        Add rows to the store in place. Values for an existing
+        (campaign, day) cell are summed into it.
+        """
+        dates = pd.to_datetime(df["date"])
+        valid = dates.notna().to_numpy()
+        if not valid.any():
+            return self
+
+        days = (dates[valid].dt.normalize() - self.start_date).dt.days.to_numpy()
+        if days.min() < 0:
+            raise ValueError(
+                f"Store is append-only: rows before {self.start_date.date()} cannot be added"
+            )
+
+        names = df["campaign_name"].astype(str).to_numpy()[valid]
+        new_names = [c for c in pd.unique(names) if c not in self.campaign_ids]
+
+        needed_days = int(days.max()) + 1
+        if needed_days > self.day_capacity:
+            self._grow_days(max(2 * self.day_capacity, needed_days))
+
+        if new_names:
+            blank = np.full((len(new_names), self.day_capacity), np.nan, dtype=self.DTYPE).tobytes()
+            for m in self.METRICS:
+                with open(self._metric_path(self.path, m), "ab") as f:
+                    f.write(blank)
+            for c in new_names:
+                self.campaign_ids[c] = len(self.campaigns)
+                self.campaigns.append(c)
+
+        ids = np.fromiter((self.campaign_ids[c] for c in names), dtype=np.int64, count=len(names))
+        cells = pd.DataFrame({"cid": ids, "day": days})
+        for m in self.METRICS:
+            cells[m] = pd.to_numeric(df[m], errors="coerce").to_numpy(dtype=self.DTYPE)[valid]
+        cells = cells.groupby(["cid", "day"], sort=False).sum(min_count=1)
+        cid = cells.index.get_level_values("cid").to_numpy()
+        day = cells.index.get_level_values("day").to_numpy()
+
+        for m in self.METRICS:
+            arr = self._map(m, mode="r+")
+            current = arr[cid, day]
+            arr[cid, day] = np.where(np.isnan(current), 0.0, current) + np.nan_to_num(cells[m].to_numpy())
+            arr.flush()
+            del arr
+
+        self.n_days = max(self.n_days, needed_days)
+        self._write_meta(self.path, self.campaigns, self.start_date, self.n_days, self.day_capacity)
+        return self
+
+    def _grow_days(self, capacity):
+        for m in self.METRICS:
+            old = self._map(m, mode="r")
+            grown = np.full((len(self.campaigns), capacity), np.nan, dtype=self.DTYPE)
+            grown[:, :self.day_capacity] = old
+            del old
+            tmp = self._metric_path(self.path, m) + ".tmp"
+            grown.tofile(tmp)
+            os.replace(tmp, self._metric_path(self.path, m))
+        self.day_capacity = capacity
+
+    # --------------------------------------------------------
+    # Read
+    # --------------------------------------------------------
+    def matrix(self, metric):
+        """Read-only [campaign x day] view of one metric (NaN = no data)."""
+        return self._map(metric, mode="r")[:, :self.n_days]
+
+    def dates(self):
+        return pd.date_range(self.start_date, periods=self.n_days, freq="D")
+
+    def daily_totals(self, metrics=METRICS):
+        """Account-level totals per day, only for days that have data."""
+        present = ~np.isnan(self.matrix(metrics[0])).all(axis=0) if self.campaigns else np.zeros(0, bool)
+        out = pd.DataFrame({m: np.nansum(self.matrix(m), axis=0)[present] for m in metrics})
+        out.insert(0, "date", self.dates()[present])
+        return out
+
+    def campaign_totals(self, metrics=METRICS):
+        """Per-campaign totals plus first/last active day, sorted by campaign name."""
+        out = pd.DataFrame({m: np.nansum(self.matrix(m), axis=1) for m in metrics})
+        active = ~np.isnan(self.matrix(metrics[0]))
+        first = active.argmax(axis=1)
+        last = self.n_days - 1 - active[:, ::-1].argmax(axis=1)
+        out["first_date"] = self.start_date + pd.to_timedelta(first, unit="D")
+        out["last_date"] = self.start_date + pd.to_timedelta(last, unit="D")
+        out.insert(0, "campaign_name", self.campaigns)
+        return out.sort_values("campaign_name", kind="stable").reset_index(drop=True)
+
+    def campaign_series(self):
+        """
+        Yield (campaign, daily CTR array) in campaign-name order, one
+        memory-mapped row at a time; NaN marks days without impressions.
+        """
+        clicks, impressions = self.matrix("clicks"), self.matrix("impressions")
+        for name in sorted(self.campaigns):
+            i = self.campaign_ids[name]
+            imp = np.asarray(impressions[i], dtype=np.float64)
+            clk = np.asarray(clicks[i], dtype=np.float64)
+            yield name, np.divide(clk, imp, out=np.full(len(imp), np.nan), where=imp > 0)
+
+    def timeseries(self):
+        """Same columns as the DataAgent.summary() timeseries table."""
+        ts = self.daily_totals()
+        ts["ctr"] = ts["clicks"] / ts["impressions"].replace(0, 1)
+        ts["roas"] = ts["revenue"] / ts["spend"].replace(0, 1)
+        return ts
+
+    def campaign_summary(self):
+        """Same columns as the DataAgent.summary() campaign table."""
+        cs = self.campaign_totals().drop(columns=["first_date", "last_date"])
+        cs["ctr"] = cs["clicks"] / cs["impressions"].replace(0, 1)
+        cs["roas"] = cs["revenue"] / cs["spend"].replace(0, 1)
+        return cs
+
+    # --------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------
+    def _map(self, metric, mode):
+        shape = (len(self.campaigns), self.day_capacity)
+        if shape[0] == 0:
+            return np.empty(shape, dtype=self.DTYPE)
+        return np.memmap(self._metric_path(self.path, metric), dtype=self.DTYPE, mode=mode, shape=shape)
+
+    @staticmethod
+    def _metric_path(path, metric):
+        return os.path.join(path, f"{metric}.f64")
+
+    @classmethod
+    def _write_meta(cls, path, campaigns, start, n_days, capacity):
+        meta = {
+            "version": 1,
+            "dtype": np.dtype(cls.DTYPE).name,
+            "metrics": list(cls.METRICS),
+            "start_date": pd.Timestamp(start).date().isoformat(),
+            "n_days": int(n_days),
+            "day_capacity": int(capacity),
+            "campaigns": list(campaigns),
+        }
+        tmp = os.path.join(path, cls.META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, cls.META_FILE))
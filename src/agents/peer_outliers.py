@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from .hypotheses import HypothesisBatch
+
+# metric -> (numerator, denominator, direction that is bad)
+PEER_METRICS = {
+    "ctr": ("clicks", "impressions", "decrease"),
+    "roas": ("revenue", "spend", "decrease"),
+    "cpc": ("spend", "clicks", "increase"),
+}
+# MAD -> standard deviation for normal data (Iglewicz & Hoaglin modified z-score)
+MAD_SCALE = 0.6745
+
+
+def config_params(config):
+    """detect() keyword arguments from the peer_outlier_* config keys."""
+    return {
+        "z_threshold": float(config.get("peer_outlier_z", 3.5)),
+        "min_share": float(config.get("peer_outlier_min_share", 0.3)),
+        "min_days": int(config.get("peer_outlier_min_days", 3)),
+        "min_peers": int(config.get("peer_outlier_min_peers", 5)),
+    }
+
+
+def input_columns(metrics):
+    return sorted({col for m in metrics for col in PEER_METRICS[m][:2]})
+
+
+def sum_matrices(df, columns):
+    """
+    Pivot `df` into dense [campaign x day] sums of `columns` in one pass
+    (np.bincount over flattened cell codes). Campaigns are sorted and
+    columns are consecutive calendar days from the first date (the
+    MetricStore layout); cells without any row are NaN.
+    """
+    dates = pd.to_datetime(df["date"]).dt.normalize()
+    rows = df[dates.notna().to_numpy()]
+    dates = dates[dates.notna()]
+    c_codes, campaigns = pd.factorize(rows["campaign_name"].astype(str), sort=True)
+    if len(dates):
+        d_codes = (dates - dates.min()).dt.days.to_numpy()
+        n_days = int(d_codes.max()) + 1
+    else:
+        d_codes, n_days = np.zeros(0, dtype=np.int64), 0
+    shape = (len(campaigns), n_days)
+    cells = c_codes.astype(np.int64) * shape[1] + d_codes
+
+    present = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape) > 0
+    sums = {}
+    for col in columns:
+        values = np.nan_to_num(rows[col].to_numpy(dtype=np.float64))
+        m = np.bincount(cells, weights=values, minlength=shape[0] * shape[1]).reshape(shape)
+        m[~present] = np.nan
+        sums[col] = m
+    return list(campaigns), sums
+
+
+def row_medians(M):
+    """NaN-ignoring median of every row, via one sort (NaNs sort last)."""
+    S = np.sort(M, axis=1)
+    k = np.count_nonzero(~np.isnan(M), axis=1)
+    lo = np.maximum((k - 1) // 2, 0)[:, None]
+    hi = np.maximum(k // 2, 0)[:, None]
+    med = (np.take_along_axis(S, lo, 1)[:, 0] + np.take_along_axis(S, hi, 1)[:, 0]) / 2
+    med[k == 0] = np.nan
+    return med
+
+
+def column_medians(M):
+    return row_medians(np.ascontiguousarray(M.T))
+
+
+def robust_zscores(M, min_peers=5):
+    """
+    Per-column (per-day) modified z-scores across rows (campaigns):
+    0.6745 * (x - median) / MAD. Days with fewer than `min_peers`
+    campaigns or zero MAD are NaN. Works on a day-major copy so every
+    sort runs over contiguous memory.
+    """
+    dev = np.ascontiguousarray(M.T)
+    med = row_medians(dev)
+    dev -= med[:, None]
+    mad = row_medians(np.abs(dev))
+    peers = np.count_nonzero(~np.isnan(dev), axis=1)
+    scale = np.full(len(mad), np.nan)
+    np.divide(MAD_SCALE, mad, out=scale, where=(mad > 0) & (peers >= min_peers))
+    dev *= scale[:, None]
+    return dev.T
+
+
+def detect(campaigns, sums, metrics=tuple(PEER_METRICS), z_threshold=3.5, min_share=0.3, min_days=3,
+           min_peers=5):
+    """
+    Campaigns that underperform their peers on the same days. A day
+    counts against a campaign when its robust z-score is beyond
+    `z_threshold` in the metric's bad direction; a dip shared by the whole
+    account moves the daily median instead and flags nobody. Campaigns with
+    at least `min_days` such days making up `min_share` of their active
+    days become peer_<metric> hypotheses.
+    """
+    parts = []
+    campaigns = np.asarray(campaigns, dtype=object)
+    for metric in metrics:
+        num, den, direction = PEER_METRICS[metric]
+        ratio = np.full(sums[num].shape, np.nan)
+        np.divide(sums[num], sums[den], out=ratio, where=sums[den] > 0)
+        z = robust_zscores(ratio, min_peers=min_peers)
+
+        days = np.count_nonzero(~np.isnan(z), axis=1)
+        outlying = z < -z_threshold if direction == "decrease" else z > z_threshold
+        bad = np.count_nonzero(outlying, axis=1)
+        share = np.divide(bad, days, out=np.zeros(len(days)), where=days > 0)
+        flagged = np.flatnonzero((bad >= min_days) & (share >= min_share))
+        if not len(flagged):
+            continue
+
+        parts.append(HypothesisBatch.of(
+            f"peer_{metric}",
+            campaigns=campaigns[flagged],
+            median_z=row_medians(z[flagged]),
+            outlier_days=bad[flagged],
+            days=days[flagged],
+            share=share[flagged],
+        ))
+    return HypothesisBatch.concat(parts)
@@ -0,0 +1,214 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Odd multipliers for deriving independent row hashes from one 64-bit key
+# hash (multiply-shift hashing)
+_MULTIPLIERS = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9,
+], dtype=np.uint64)
+
+
+def hash_keys(values):
+    """Stable 64-bit hashes for an array of keys (strings or numbers)."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _bit_length(x):
+    """Vectorized int.bit_length() for a uint64 array."""
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        n[big] += shift
+        x[big] >>= np.uint64(shift)
+    return n + (x > 0)
+
+
+class CountMinSketch:
+    """
+    Count-min sketch over 64-bit key hashes.
+
+    Estimates never undercount; with probability 1 - delta the overcount
+    is at most epsilon * total weight added.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = min(len(_MULTIPLIERS), int(math.ceil(math.log(1 / delta))))
+        self.table = np.zeros((self.depth, self.width), dtype=np.float64)
+        self.total = 0.0
+
+    def _columns(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        return [((hashes * _MULTIPLIERS[i]) >> np.uint64(32)) % np.uint64(self.width) for i in range(self.depth)]
+
+    def add(self, hashes, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        for row, cols in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(cols.astype(np.int64), weights=weights, minlength=self.width)
+        self.total += float(weights.sum())
+
+    def query(self, hashes):
+        cols = self._columns(hashes)
+        return np.min([self.table[row, c.astype(np.int64)] for row, c in enumerate(cols)], axis=0)
+
+    @property
+    def error_bound(self):
+        return self.epsilon * self.total
+
+
+class SpaceSaving:
+    """
+    Weighted Space-Saving heavy-hitter summary with at most k counters.
+
+    Chunks are pre-aggregated and merged using the mergeable-summaries rule:
+    a key absent from one side is assumed to have that side's minimum
+    counter, which is also added to its error. Every key whose true weight
+    exceeds total / k is guaranteed to be kept, and counts never undercount
+    by more than the recorded error.
+    """
+
+    def __init__(self, k=100):
+        self.k = int(k)
+        self.counts = pd.Series(dtype=np.float64)
+        self.errors = pd.Series(dtype=np.float64)
+        self.total = 0.0
+
+    def _floor(self, counts):
+        return float(counts.min()) if len(counts) >= self.k else 0.0
+
+    def update(self, keys, weights):
+        chunk = pd.Series(np.asarray(weights, dtype=np.float64), index=keys).groupby(level=0, sort=False).sum()
+        self.total += float(chunk.sum())
+
+        chunk_floor = 0.0
+        if len(chunk) > self.k:
+            chunk = chunk.nlargest(self.k + 1)
+            chunk_floor = float(chunk.iloc[-1])
+            chunk = chunk.iloc[:-1]
+
+        own_floor = self._floor(self.counts)
+        keys = self.counts.index.union(chunk.index)
+        mine = self.counts.reindex(keys)
+        theirs = chunk.reindex(keys)
+        merged = mine.fillna(own_floor) + theirs.fillna(chunk_floor)
+        errors = (
+            self.errors.reindex(keys).fillna(own_floor)
+            + theirs.isna() * chunk_floor
+        )
+
+        top = merged.nlargest(self.k).index
+        self.counts = merged.loc[top]
+        self.errors = errors.loc[top]
+
+    def top(self, n=None):
+        """[(key, estimated_weight, max_overcount)] in descending weight order."""
+        order = self.counts.sort_values(ascending=False, kind="stable")
+        if n is not None:
+            order = order.head(n)
+        return [(k, float(v), float(self.errors[k])) for k, v in order.items()]
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter; `error` is the target relative standard error."""
+
+    def __init__(self, error=0.01):
+        m = (1.04 / error) ** 2
+        self.p = min(18, max(4, int(math.ceil(math.log2(m)))))
+        self.m = 1 << self.p
+        self.registers = np.zeros(self.m, dtype=np.int64)
+
+    @property
+    def error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return
+        rest_bits = 64 - self.p
+        idx = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        rank = rest_bits - _bit_length(rest) + 1
+        np.maximum.at(self.registers, idx, rank)
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class GroupSketch:
+    """
+    Streaming sketches for one grouping column (e.g. adset_name):
+    distinct count, approximate metric sums per key and heavy hitters by
+    spend and by impressions.
+    """
+
+    METRICS = ("spend", "impressions", "clicks", "purchases", "revenue")
+
+    def __init__(self, column, epsilon=0.001, delta=0.01, top_k=100, hll_error=0.01):
+        self.column = column
+        self.distinct = HyperLogLog(hll_error)
+        self.sums = {m: CountMinSketch(epsilon, delta) for m in self.METRICS}
+        self.top_spend = SpaceSaving(top_k)
+        self.top_impressions = SpaceSaving(top_k)
+
+    def update(self, chunk):
+        keys = chunk[self.column].astype(str).to_numpy()
+        hashes = hash_keys(keys)
+        self.distinct.add(hashes)
+        for metric, sketch in self.sums.items():
+            sketch.add(hashes, chunk[metric].to_numpy())
+        self.top_spend.update(keys, chunk["spend"].to_numpy())
+        self.top_impressions.update(keys, chunk["impressions"].to_numpy())
+
+    def lowest_ctr(self, n=None):
+        """
+        Lowest-CTR entities among the impression heavy hitters, with CTR
+        estimated from the count-min click and impression sketches.
+        """
+        keys = [k for k, _, _ in self.top_impressions.top()]
+        if not keys:
+            return []
+        hashes = hash_keys(keys)
+        clicks = self.sums["clicks"].query(hashes)
+        impressions = self.sums["impressions"].query(hashes)
+        ctr = np.divide(clicks, impressions, out=np.zeros(len(keys)), where=impressions > 0)
+        order = np.argsort(ctr, kind="stable")[:n]
+        return [(keys[i], float(ctr[i]), float(impressions[i])) for i in order]
+
+    def estimate(self, keys):
+        """Approximate metric sums for the given keys, one dict per key."""
+        hashes = hash_keys(keys)
+        sums = {m: sketch.query(hashes) for m, sketch in self.sums.items()}
+        return [{self.column: k, **{m: float(sums[m][i]) for m in self.METRICS}} for i, k in enumerate(keys)]
+
+    def candidates(self):
+        """Keys worth an exact look: top spenders plus lowest-CTR heavy hitters."""
+        keys = [k for k, _, _ in self.top_spend.top()]
+        seen = set(keys)
+        keys += [k for k, _, _ in self.lowest_ctr() if k not in seen]
+        return keys
+
+    def report(self, n=10):
+        return {
+            "distinct": self.distinct.count(),
+            "top_spend": [{"key": k, "spend": v, "max_overcount": e} for k, v, e in self.top_spend.top(n)],
+            "lowest_ctr": [{"key": k, "ctr": c, "impressions": i} for k, c, i in self.lowest_ctr(n)],
+            "error_bounds": {
+                "distinct_rel_error": round(self.distinct.error, 5),
+                "spend_abs_error": self.sums["spend"].error_bound,
+                "probability": 1 - self.sums["spend"].delta,
+                "heavy_hitter_threshold": self.top_spend.total / self.top_spend.k,
+            },
+        }
@@ -0,0 +1,236 @@
+import glob
+import gzip
+import io
+import json
+import os
+import re
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# hive-style partition directory, e.g. date=2025-01-01
+_PARTITION_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)=(.+)$")
+
+DATA_SUFFIXES = (".csv", ".csv.gz", ".csv.zst", ".csv.zstd")
+MANIFEST_SUFFIXES = (".txt", ".manifest", ".json")
+
+
+class Shard:
+    """One input file plus the partition values encoded in its directory names."""
+
+    __slots__ = ("path", "partitions")
+
+    def __init__(self, path, partitions=None):
+        self.path = path
+        self.partitions = partitions or {}
+
+    def __repr__(self):
+        return f"Shard({self.path!r}, {self.partitions!r})"
+
+
+def partition_values(path):
+    """{key: value} for every `key=value` directory component of `path`."""
+    parts = {}
+    for comp in os.path.normpath(os.path.dirname(path)).split(os.sep):
+        m = _PARTITION_RE.match(comp)
+        if m:
+            parts[m.group(1)] = m.group(2)
+    return parts
+
+
+def _is_data_file(name):
+    return name.lower().endswith(DATA_SUFFIXES)
+
+
+def _expand(path):
+    """Directory, glob pattern, manifest or plain file -> sorted list of file paths."""
+    if any(ch in path for ch in "*?["):
+        return sorted(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+
+    if os.path.isdir(path):
+        files = []
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(os.path.join(root, n) for n in sorted(names) if _is_data_file(n))
+        return files
+
+    if path.lower().endswith(MANIFEST_SUFFIXES):
+        base = os.path.dirname(path)
+        with open(path, "r", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                entries = json.load(f)
+                entries = entries.get("files", []) if isinstance(entries, dict) else entries
+            else:
+                entries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        return [e if os.path.isabs(e) else os.path.join(base, e) for e in entries]
+
+    return [path]
+
+
+def in_window(partitions, start=None, end=None):
+    """False when a `date` partition lies outside [start, end]; True otherwise."""
+    value = partitions.get("date")
+    if value is None or (start is None and end is None):
+        return True
+    day = pd.to_datetime(value, errors="coerce")
+    if pd.isna(day):
+        return True
+    if start is not None and day < pd.Timestamp(start):
+        return False
+    if end is not None and day > pd.Timestamp(end):
+        return False
+    return True
+
+
+def resolve_sources(path, date_window=None):
+    """
+    Expand `path` into shards, pruning date partitions outside
+    `date_window` ({"start": ..., "end": ...}) from directory names alone.
+    Returns (kept_shards, pruned_count).
+    """
+    window = date_window or {}
+    start, end = window.get("start"), window.get("end")
+
+    shards, pruned = [], 0
+    for p in _expand(path):
+        shard = Shard(p, partition_values(p))
+        if in_window(shard.partitions, start, end):
+            shards.append(shard)
+        else:
+            pruned += 1
+    return shards, pruned
+
+
+# --------------------------------------------------------
+# Compressed input
+# --------------------------------------------------------
+def codec_of(path):
+    name = str(path).lower()
+    if name.endswith(".gz"):
+        return "gzip"
+    if name.endswith((".zst", ".zstd")):
+        return "zstd"
+    return None
+
+
+def gzip_members(path):
+    """
+    [(offset, size)] of every gzip member when the file is block-gzipped
+    (each member carries its total size in a 'BC' extra subfield, as in
+    BGZF), else None. Only member headers are read, nothing is inflated.
+    """
+    members = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            head = f.read(12)
+            if len(head) < 12 or head[:2] != b"\x1f\x8b" or not head[3] & 0x04:
+                return None
+            xlen = struct.unpack("<H", head[10:12])[0]
+            extra = f.read(xlen)
+            block = None
+            pos = 0
+            while pos + 4 <= len(extra):
+                si, slen = extra[pos:pos + 2], struct.unpack("<H", extra[pos + 2:pos + 4])[0]
+                if si == b"BC" and slen == 2:
+                    block = struct.unpack("<H", extra[pos + 4:pos + 6])[0] + 1
+                pos += 4 + slen
+            if block is None:
+                return None
+            members.append((offset, block))
+            offset += block
+    return members
+
+
+def write_block_gzip(path, data, block_size=65280):
+    """
+    Write `data` as independently inflatable gzip members with their sizes
+    recorded in the header (BGZF layout), so readers can inflate in parallel.
+    """
+    with open(path, "wb") as out:
+        for start in range(0, len(data), block_size):
+            chunk = data[start:start + block_size]
+            comp = zlib.compressobj(6, zlib.DEFLATED, -15)
+            body = comp.compress(chunk) + comp.flush()
+            bsize = 18 + len(body) + 8 - 1
+            out.write(b"\x1f\x8b\x08\x04" + b"\x00" * 4 + b"\x00\xff")
+            out.write(struct.pack("<HBBHH", 6, ord("B"), ord("C"), 2, bsize))
+            out.write(body)
+            out.write(struct.pack("<II", zlib.crc32(chunk) & 0xFFFFFFFF, len(chunk) & 0xFFFFFFFF))
+
+
+class ParallelGzipReader(io.RawIOBase):
+    """
+    Read-only stream over a block-gzipped file. Members are inflated on a
+    thread pool (zlib releases the GIL), a bounded window ahead of the
+    reader, and handed out strictly in file order.
+    """
+
+    def __init__(self, path, members, workers=4):
+        self._file = open(path, "rb")
+        self._members = iter(members)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending = deque()
+        self._window = workers * 4
+        self._buf = memoryview(b"")
+        self._fill()
+
+    def _inflate(self, offset, size):
+        raw = os.pread(self._file.fileno(), size, offset)
+        return zlib.decompress(raw, 31)
+
+    def _fill(self):
+        while len(self._pending) < self._window:
+            nxt = next(self._members, None)
+            if nxt is None:
+                return
+            self._pending.append(self._pool.submit(self._inflate, *nxt))
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not len(self._buf):
+            if not self._pending:
+                return 0
+            self._buf = memoryview(self._pending.popleft().result())
+            self._fill()
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._file.close()
+        super().close()
+
+
+def open_source(path, workers=4):
+    """
+    Binary stream of a (possibly compressed) input file, decompressed on
+    the fly so it can feed the (chunked) CSV reader directly:
+    - .gz: block-gzipped files inflate in parallel, others stream through gzip
+    - .zst: streaming zstandard decompression (requires `zstandard`)
+    """
+    codec = codec_of(path)
+    if codec == "gzip":
+        members = gzip_members(path)
+        if members and len(members) > 1 and workers > 1:
+            return io.BufferedReader(ParallelGzipReader(path, members, workers), buffer_size=1 << 20)
+        return gzip.open(path, "rb")
+    if codec == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Reading .zst input requires the 'zstandard' package") from e
+        # the zstd reader has no readline / line iteration; the chunked loader needs both
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.BufferedReader(reader, buffer_size=1 << 16)
+    return open(path, "rb")
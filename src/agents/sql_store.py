@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .metric_store import MetricStore
+
+EPOCH = pd.Timestamp("1970-01-01")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS rows (
+    campaign_name TEXT NOT NULL,
+    day           INTEGER,
+    spend         REAL,
+    impressions   REAL,
+    clicks        REAL,
+    purchases     REAL,
+    revenue       REAL,
+    ctr           REAL,
+    creative_message TEXT
+);
+"""
+INDEX = "CREATE INDEX IF NOT EXISTS idx_rows_campaign_day ON rows(campaign_name, day)"
+
+
+class SqlStore:
+    """
+    Daily campaign metrics in an embedded SQLite database, with the same
+    read interface as MetricStore (campaigns, matrix, daily_totals,
+    campaign_totals, timeseries, campaign_summary, campaign_series).
+
+    Rows are bulk-loaded once per input -- campaign, day (days since the
+    epoch), the five metrics, the row's CTR and its creative message --
+    into a fresh file that replaces the
+    database when complete, and indexed on (campaign_name, day).
+    Every read is a GROUP BY pushed down to SQLite, so only aggregated
+    rows come back into pandas. A database built for the same source
+    fingerprint is reused instead of being reloaded.
+    """
+
+    METRICS = MetricStore.METRICS
+    # bump when the rows table changes; older databases are rebuilt
+    VERSION = 2
+    # per-row columns read back by rows(), in the pandas path's column order
+    ROW_COLUMNS = ("campaign_name", "date", "spend", "impressions", "clicks", "ctr", "purchases", "revenue",
+                   "creative_message")
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._cells = None
+        self._refresh()
+
+    @classmethod
+    def create(cls, path, frames, source=None, batch_rows=100000):
+        """
+        Bulk-load `frames` (a DataFrame or an iterable of DataFrames, e.g.
+        chunks) into the database at `path`. With `source` (an input
+        fingerprint) an existing database built from the same source is
+        opened as is, and `frames` is never consumed.
+
+        The database is built in a uniquely named file next to `path` and
+        moved into place only once complete, so a failed load (including
+        an exception raised while producing `frames`) leaves no database
+        behind and concurrent builds never see each other's partial file.
+        """
+        if path == ":memory:":
+            store = cls(path)
+            cls._bulk_load(store.conn, frames, source, batch_rows)
+            store._refresh()
+            return store
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if source is not None and os.path.exists(path):
+            store = cls(path)
+            if store.source == source and store.version == cls.VERSION:
+                return store
+            store.close()
+
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            store = cls(tmp)
+            try:
+                cls._bulk_load(store.conn, frames, source, batch_rows)
+            finally:
+                store.close()
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return cls(path)
+
+    @classmethod
+    def _bulk_load(cls, conn, frames, source, batch_rows):
+        # journaling buys nothing here: a failed build is thrown away whole
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("DROP INDEX IF EXISTS idx_rows_campaign_day")
+        conn.execute("DELETE FROM rows")
+        conn.execute("DELETE FROM meta")
+        for frame in ([frames] if isinstance(frames, pd.DataFrame) else frames):
+            for start in range(0, len(frame), batch_rows):
+                conn.executemany("INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 cls._records(frame.iloc[start:start + batch_rows]))
+        # building the index once after the load beats maintaining it per row
+        conn.execute(INDEX)
+        conn.execute("INSERT INTO meta VALUES ('source', ?)", (source or "",))
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(cls.VERSION),))
+        conn.commit()
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("ANALYZE")
+        conn.commit()
+
+    @classmethod
+    def _records(cls, frame):
+        dates = pd.to_datetime(frame["date"], errors="coerce").to_numpy().astype("datetime64[D]")
+        days = dates.astype(np.int64).astype(object)
+        days[np.isnat(dates)] = None
+        columns = [frame["campaign_name"].astype(str).tolist(), days.tolist()]
+        columns += [pd.to_numeric(frame[m], errors="coerce").astype(np.float64).tolist() for m in cls.METRICS]
+        # the per-row inputs of the CTR trend fits and the creative stages
+        ctr = frame["ctr"] if "ctr" in frame else pd.Series(np.nan, index=frame.index)
+        columns.append(pd.to_numeric(ctr, errors="coerce").astype(np.float64).tolist())
+        messages = frame["creative_message"] if "creative_message" in frame else pd.Series(None, index=frame.index)
+        columns.append(messages.astype(object).where(messages.notna(), None).tolist())
+        return zip(*columns)
+
+    def _refresh(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        self.source = row[0] if row else None
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        self.version = int(row[0]) if row else None
+        self.campaigns = [r[0] for r in self.conn.execute(
+            "SELECT DISTINCT campaign_name FROM rows ORDER BY campaign_name")]
+        first, last = self.conn.execute("SELECT MIN(day), MAX(day) FROM rows").fetchone()
+        self.start_day = first
+        self.start_date = EPOCH + pd.Timedelta(days=first) if first is not None else None
+        self.n_days = (last - first + 1) if first is not None else 0
+        self._cells = None
+
+    def close(self):
+        self.conn.close()
+
+    # --------------------------------------------------------
+    # Pushed-down aggregates
+    # --------------------------------------------------------
+    def query(self, sql, params=()):
+        """Run `sql` in the database and return the result as a DataFrame."""
+        cur = self.conn.execute(sql, params)
+        return pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+
+    @staticmethod
+    def _sums(metrics):
+        return ", ".join(f"TOTAL({m}) AS {m}" for m in metrics)
+
+    def daily_totals(self, metrics=METRICS):
+        """Account-level totals per day, only for days that have data."""
+        out = self.query(f"SELECT day, {self._sums(metrics)} FROM rows WHERE day IS NOT NULL "
+                         f"GROUP BY day ORDER BY day")
+        out.insert(0, "date", EPOCH + pd.to_timedelta(out.pop("day"), unit="D"))
+        return out
+
+    def campaign_totals(self, metrics=METRICS):
+        """Per-campaign totals plus first/last active day, sorted by campaign name."""
+        out = self.query(f"SELECT campaign_name, {self._sums(metrics)}, MIN(day) AS first_day, "
+                         f"MAX(day) AS last_day FROM rows WHERE day IS NOT NULL "
+                         f"GROUP BY campaign_name ORDER BY campaign_name")
+        for col in ("first", "last"):
+            out[f"{col}_date"] = EPOCH + pd.to_timedelta(out.pop(f"{col}_day"), unit="D")
+        return out
+
+    def rows(self):
+        """
+        The stored rows in input order (ROW_COLUMNS): the narrow per-row
+        frame that the CTR trend fits, the evaluator and the creative stages
+        read when the full frame is not kept.
+        """
+        cols = ["campaign_name", "day", *self.METRICS, "ctr", "creative_message"]
+        out = self.query(f"SELECT {', '.join(cols)} FROM rows ORDER BY rowid")
+        out.insert(1, "date", EPOCH + pd.to_timedelta(out.pop("day"), unit="D"))
+        return out[list(self.ROW_COLUMNS)]
+
+    def timeseries(self):
+        """Same columns as the DataAgent.summary() timeseries table."""
+        ts = self.daily_totals()
+        ts["ctr"] = ts["clicks"] / ts["impressions"].replace(0, 1)
+        ts["roas"] = ts["revenue"] / ts["spend"].replace(0, 1)
+        return ts
+
+    def campaign_summary(self):
+        """Same columns as the DataAgent.summary() campaign table."""
+        cs = self.campaign_totals().drop(columns=["first_date", "last_date"])
+        cs["ctr"] = cs["clicks"] / cs["impressions"].replace(0, 1)
+        cs["roas"] = cs["revenue"] / cs["spend"].replace(0, 1)
+        return cs
+
+    # --------------------------------------------------------
+    # Dense [campaign x day] views (MetricStore layout)
+    # --------------------------------------------------------
+    def dates(self):
+        return pd.date_range(self.start_date, periods=self.n_days, freq="D")
+
+    def matrix(self, metric):
+        """[campaign x day] sums of `metric` (NaN = no data), from one GROUP BY campaign, day."""
+        if self._cells is None:
+            self._cells = self._pivot()
+        return self._cells[metric]
+
+    def _pivot(self):
+        cells = self.query(f"SELECT campaign_name, day, {self._sums(self.METRICS)} FROM rows "
+                           f"WHERE day IS NOT NULL GROUP BY campaign_name, day")
+        shape = (len(self.campaigns), self.n_days)
+        rows = pd.Index(self.campaigns).get_indexer(cells["campaign_name"])
+        cols = cells["day"].to_numpy(dtype=np.int64) - (self.start_day or 0)
+        out = {}
+        for m in self.METRICS:
+            M = np.full(shape, np.nan)
+            M[rows, cols] = cells[m].to_numpy(dtype=np.float64)
+            out[m] = M
+        return out
+
+    def campaign_series(self):
+        """(campaign, daily CTR array) in campaign-name order; NaN marks days without impressions."""
+        clicks, impressions = self.matrix("clicks"), self.matrix("impressions")
+        for i, name in enumerate(self.campaigns):
+            imp, clk = impressions[i], clicks[i]
+            yield name, np.divide(clk, imp, out=np.full(len(imp), np.nan), where=imp > 0)
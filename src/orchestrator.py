@@ -7,51 +7,402 @@ This file exists to allow future extension of the pipeline
 Currently, run.py handles the end-to-end execution.
 This orchestrator simply exposes a reusable function
 that mirrors run.py’s workflow.
+
+With run_mode "coordinator" the campaign set is split into contiguous
+shards published on a file-based work queue (src/work_queue.py); local
+worker processes -- and workers on any other host that sees
+work_queue_dir -- claim shards, and the coordinator merges their partial
+results into the same output structure.
+
+run_analysis_async() runs the same steps on an asyncio event loop with
+per-step timeouts, cancellation and concurrent independent stages.
 """
 
-from src.utils import load_config, save_json, set_seeds
+import asyncio
+import functools
+import multiprocessing
+import os
+import random
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.utils import load_config, save_json, set_seeds, retry
+from src.stage_cache import StageCache
+from src.work_queue import FileWorkQueue, run_worker
 from src.agents.data_agent import DataAgent
 from src.agents.planner import PlannerAgent
 from src.agents.insight_agent import InsightAgent
 from src.agents.evaluator import EvaluatorAgent
+from src.agents.hypotheses import HypothesisBatch
+from src.agents import budget_optimizer, memory_planner, peer_outliers
 from src.agents.creative_generator import CreativeGenerator
 
 
-def run_analysis(user_query, config_path="config/config.yaml"):
+# Candidate kinds in the order a single-process run emits them
+_CANDIDATE_ORDER = ("ctr_drop_", "roas_spend_", "fatigue_", "peer_", "revenue_lags_spend_", "purchases_lag_spend_")
+
+
+def _candidate_rank(h):
+    for rank, prefix in enumerate(_CANDIDATE_ORDER):
+        if h["id"].startswith(prefix):
+            return rank
+    return len(_CANDIDATE_ORDER)
+
+
+def _stage_cache(config, use_cache, metrics):
+    return StageCache(
+        config.get("stage_cache_dir", "cache/stages"),
+        max_mb=config.get("stage_cache_max_mb", 256),
+        metrics=metrics,
+        enabled=use_cache and bool(config.get("stage_cache", True)),
+    )
+
+
+def _generate_insights(config, data_agent, df):
+    # approximate mode: focus on heavy-hitter campaigns
+    focus = None
+    if config.get("aggregation_mode", "exact") == "approx":
+        focus = data_agent.heavy_hitters().get("campaign_name")
+    return InsightAgent(
+        df, config, store=data_agent.store, focus=focus, tracer=data_agent.tracer, daily=data_agent.daily_totals,
+    ).candidate_batch()
+
+
+def _cached_batch(cache, stage, key, compute):
+    """cache.cached() for hypothesis stages: the value is a HypothesisBatch, hit or miss."""
+    value, hit = cache.cached(stage, key, compute)
+    return HypothesisBatch.coerce(value), hit
+
+
+def _optimize_budget(config, matrices):
+    """Budget optimizer result, or None when disabled. `matrices(columns)` -> (campaigns, sums)."""
+    if not config.get("budget_optimizer", True):
+        return None
+    campaigns, sums = matrices(budget_optimizer.INPUT_COLUMNS)
+    return budget_optimizer.optimize(campaigns, sums, **budget_optimizer.config_params(config))
+
+
+def _data_agent(config, tracer=None):
+    """
+    DataAgent for config["data_csv"] plus its ExecutionPlan: with
+    max_memory_mb set, the footprint is estimated and a load strategy
+    applied before anything is loaded; otherwise the plan is None.
+    """
+    data_agent = DataAgent(config["data_csv"], config=config, tracer=tracer)
+    if not config.get("max_memory_mb"):
+        return data_agent, None
+    plan = memory_planner.plan_execution(
+        data_agent, float(config["max_memory_mb"]), **memory_planner.config_params(config)
+    )
+    return plan.apply(data_agent), plan
+
+
+def _load(data_agent, plan):
+    """
+    (frame, plan record): data_agent.load() -- or, in approximate mode,
+    load_focus(): the sketch pass plus only the heavy hitters' rows --
+    with the traced peak logged against the plan's estimate when
+    memory_measure_peak is set.
+    """
+    approx = data_agent.config.get("aggregation_mode", "exact") == "approx"
+    load = data_agent.load_focus if approx else data_agent.load
+    if plan is None:
+        return load(), None
+    if not data_agent.config.get("memory_measure_peak", False):
+        return load(), plan.to_dict()
+    df, peak_mb = memory_planner.measure_peak(load)
+    return df, plan.to_dict(actual_peak_mb=peak_mb)
+
+
+def _low_ctr_campaigns(validated):
+    return [
+        h["campaign"]
+        for h in validated
+        if h["valid"] and h["campaign"] is not None and "ctr" in h["hypothesis"].lower()
+    ]
+
+
+def run_analysis(user_query, config_path="config/config.yaml", mode=None, use_cache=True, metrics=None,
+                 tracer=None):
     config = load_config(config_path)
-    set_seeds(config.get("random_seed", 42))
+    if (mode or config.get("run_mode", "local")) == "coordinator":
+        return run_coordinated(user_query, config)
+
+    rng = set_seeds(config.get("random_seed", 42))
 
     # Planner
     planner = PlannerAgent()
     plan = planner.plan(user_query)
 
     # Data
-    data_agent = DataAgent(config["data_csv"])
-    df = data_agent.load()
+    data_agent, execution_plan = _data_agent(config, tracer)
+    df, execution_plan = _load(data_agent, execution_plan)
     summary = data_agent.summary()
 
+    cache = _stage_cache(config, use_cache, metrics)
+
     # Insights
-    insight_agent = InsightAgent(df)
-    hypotheses = insight_agent.generate_candidates()
+    insights_key = cache.key("insights", config, fingerprint=data_agent.fingerprint())
+    hypotheses, _ = _cached_batch(cache, "insights", insights_key, lambda: _generate_insights(config, data_agent, df))
 
     # Evaluation
-    evaluator = EvaluatorAgent(df, config)
-    validated = evaluator.validate(hypotheses)
+    evaluation_key = cache.key("evaluation", config, upstream=insights_key)
+    validated, _ = _cached_batch(
+        cache, "evaluation", evaluation_key,
+        lambda: EvaluatorAgent(df, config, rng=rng, tracer=tracer, daily=data_agent.daily_totals).validate(hypotheses),
+    )
+
+    budget = _optimize_budget(config, data_agent.campaign_day_matrices)
 
     # Creative suggestions
-    low_ctr_campaigns = [
-        h["campaign"]
-        for h in validated
-        if h["valid"] and h["campaign"] is not None and "ctr" in h["hypothesis"].lower()
-    ]
+    low_ctr_campaigns = _low_ctr_campaigns(validated)
+    creatives_key = cache.key("creatives", config, upstream=evaluation_key)
+    creatives, _ = cache.cached(
+        "creatives", creatives_key,
+        lambda: CreativeGenerator(df, config=config, tracer=tracer).generate_for_campaigns(low_ctr_campaigns),
+    )
+
+    return {
+        "plan": plan,
+        "summary": summary,
+        "candidates": hypotheses,
+        "validated": validated,
+        "budget": budget,
+        "creatives": creatives,
+        "execution_plan": execution_plan,
+    }
 
-    creative_gen = CreativeGenerator(df)
-    creatives = creative_gen.generate_for_campaigns(low_ctr_campaigns)
+
+# --------------------------------------------------------
+# Asyncio orchestration
+# --------------------------------------------------------
+class StepTimeout(Exception):
+    def __init__(self, step, timeout):
+        super().__init__(f"Step '{step}' did not finish within {timeout}s")
+        self.step = step
+        self.timeout = timeout
+
+
+async def _run_step(name, fn, *args, timeouts=None, executor=None, retries=None, logger=None):
+    """
+    Run blocking `fn(*args)` in `executor`, retried per `retries` (retry()
+    keyword arguments; backoff waits on the event loop) and bounded by
+    timeouts[name] seconds across all attempts.
+
+    On timeout or cancellation the awaiting coroutine stops at once; a
+    thread already running the step is left to finish in the background
+    and its result is discarded.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def attempt():
+        return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+    if retries:
+        attempt = retry(logger=logger, **retries)(attempt)
+
+    timeout = (timeouts or {}).get(name)
+    try:
+        return await asyncio.wait_for(attempt(), timeout)
+    except asyncio.TimeoutError:
+        if logger:
+            logger.error({"event": "step_timeout", "step": name, "timeout_sec": timeout})
+        raise StepTimeout(name, timeout) from None
+
+
+async def _gather(*aws):
+    """asyncio.gather that cancels the sibling steps as soon as one fails."""
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def run_analysis_async(user_query, config_path="config/config.yaml", use_cache=True, metrics=None,
+                             executor=None, timeouts=None, logger=None, tracer=None):
+    """
+    Asyncio counterpart of run_analysis(). Every agent step runs in
+    `executor` (default: the loop's thread pool) so one process can serve
+    many analyses at once. Independent stages run concurrently: planning
+    alongside data loading, and the data summary alongside insight
+    generation. Per-step timeouts (seconds, keyed by step name:
+    memory_plan, plan, load, summary, insights, evaluation, budget,
+    creatives) come from `timeouts` or the step_timeouts config key.
+    Cancelling the returned coroutine cancels the steps in flight.
+
+    Results match run_analysis() for the same config; the run keeps its
+    own RNGs instead of seeding the process-wide ones.
+
+    A `tracer` (agents/tracing.py) is handed to every agent, so spans from
+    executor threads carry their own thread ids.
+    """
+    config = await asyncio.get_running_loop().run_in_executor(executor, load_config, config_path)
+    timeouts = dict(config.get("step_timeouts") or {}, **(timeouts or {}))
+    seed = config.get("random_seed", 42)
+    rng = np.random.default_rng(seed)
+    retries = {"attempts": 3, "initial_delay": 0.5, "backoff": 2.0}
+
+    def step(name, fn, *args, retry_step=False):
+        return _run_step(name, fn, *args, timeouts=timeouts, executor=executor,
+                         retries=retries if retry_step else None, logger=logger)
+
+    data_agent, execution_plan = await step("memory_plan", _data_agent, config, tracer)
+    plan, (df, execution_plan) = await _gather(
+        step("plan", PlannerAgent().plan, user_query),
+        step("load", _load, data_agent, execution_plan, retry_step=True),
+    )
+    if logger and execution_plan:
+        logger.info({"event": "execution_plan", **execution_plan})
+
+    cache = _stage_cache(config, use_cache, metrics)
+    insights_key = cache.key("insights", config, fingerprint=data_agent.fingerprint())
+    summary, (hypotheses, _) = await _gather(
+        step("summary", data_agent.summary),
+        step("insights", _cached_batch, cache, "insights", insights_key,
+             lambda: _generate_insights(config, data_agent, df), retry_step=True),
+    )
+
+    evaluation_key = cache.key("evaluation", config, upstream=insights_key)
+    (validated, _), budget = await _gather(
+        step("evaluation", _cached_batch, cache, "evaluation", evaluation_key,
+             lambda: EvaluatorAgent(df, config, rng=rng, tracer=tracer, daily=data_agent.daily_totals).validate(hypotheses)),
+        step("budget", _optimize_budget, config, data_agent.campaign_day_matrices),
+    )
+
+    low_ctr_campaigns = _low_ctr_campaigns(validated)
+    creatives_key = cache.key("creatives", config, upstream=evaluation_key)
+    creatives, _ = await step(
+        "creatives", cache.cached, "creatives", creatives_key,
+        lambda: CreativeGenerator(df, rng=random.Random(seed), config=config, tracer=tracer)
+        .generate_for_campaigns(low_ctr_campaigns),
+    )
 
     return {
         "plan": plan,
         "summary": summary,
         "candidates": hypotheses,
         "validated": validated,
-        "creatives": creatives
+        "budget": budget,
+        "creatives": creatives,
+        "execution_plan": execution_plan,
+    }
+
+
+def run_coordinated(user_query, config):
+    """
+    Sharded run: one task per contiguous range of (sorted) campaigns.
+    Shard assignment and per-shard seeds depend only on the data and the
+    config, so repeated runs give the same output however many workers
+    take part. Heuristic confidences match a local run exactly; bootstrap
+    intervals are reproducible but seeded per shard.
+    """
+    config = dict(config, data_csv=os.path.abspath(str(config["data_csv"])))
+    rng = set_seeds(config.get("random_seed", 42))
+    plan = PlannerAgent().plan(user_query)
+
+    campaigns = DataAgent(config["data_csv"], config=config).campaign_names()
+    n_shards = max(1, min(int(config.get("coordinator_shards", 4)), len(campaigns)))
+    lease_sec = float(config.get("lease_sec", 600))
+
+    run_dir = os.path.join(config.get("work_queue_dir", "cache/work_queue"), f"run-{uuid.uuid4().hex[:12]}")
+    queue = FileWorkQueue(run_dir, lease_sec=lease_sec, create=True)
+    for shard, names in enumerate(np.array_split(np.array(campaigns, dtype=object), n_shards)):
+        queue.put(f"shard-{shard:05d}", {"shard": shard, "campaigns": list(names), "config": config})
+
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        workers = [
+            ctx.Process(target=run_worker, args=(run_dir,), kwargs={"lease_sec": lease_sec})
+            for _ in range(int(config.get("coordinator_workers", 0) or 0))
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        # finish whatever is left (crashed workers' leases expire first)
+        while queue.pending():
+            if not run_worker(run_dir, worker_id=f"coordinator:{os.getpid()}", lease_sec=lease_sec):
+                time.sleep(min(1.0, lease_sec))
+        results = [queue.results()[t] for t in queue.task_ids()]
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    return _merge_shard_results(plan, config, rng, results)
+
+
+def _merge_shard_results(plan, config, rng, results):
+    from src.agents.data_agent import merge_partial_summaries
+
+    partials = []
+    for r in results:
+        daily = pd.DataFrame(r["daily"])
+        if not daily.empty:
+            daily["date"] = pd.to_datetime(daily["date"])
+        campaigns = pd.DataFrame(r["campaigns"])
+        partials.append((
+            daily.set_index("date") if not daily.empty else daily,
+            campaigns.set_index("campaign_name") if not campaigns.empty else campaigns,
+        ))
+    partials = [p for p in partials if not p[0].empty] or partials
+    summary = merge_partial_summaries(partials, results[0]["schema"] if results else {})
+
+    candidates = [h for r in results for h in r["candidates"]]
+    validated = [v for r in results for v in r["validated"]]
+
+    # the account-level hypothesis needs every campaign's daily totals
+    daily = pd.DataFrame(summary["timeseries"])
+    roas_candidate = InsightAgent.roas_spend_candidate(InsightAgent.daily_roas_spend_correlation(daily)) \
+        if not daily.empty else None
+    if roas_candidate is not None:
+        candidates.append(roas_candidate)
+        validated += EvaluatorAgent(daily, config, rng=rng).validate([roas_candidate])
+
+    # peer outliers need every campaign on the same days
+    peer_metrics = list(config.get("peer_outlier_metrics", peer_outliers.PEER_METRICS))
+    cells = pd.DataFrame([c for r in results for c in r.get("cells", [])])
+    if peer_metrics and not cells.empty:
+        campaigns, sums = peer_outliers.sum_matrices(cells, peer_outliers.input_columns(peer_metrics))
+        peers = peer_outliers.detect(campaigns, sums, peer_metrics, **peer_outliers.config_params(config))
+        candidates += peers.to_dicts()
+        validated += EvaluatorAgent(daily, config, rng=rng).validate(peers).to_dicts()
+
+    candidates.sort(key=_candidate_rank)
+    by_id = {v["id"]: v for v in validated}
+    validated = [by_id[h["id"]] for h in candidates]
+
+    budget = None
+    if not cells.empty:
+        budget = _optimize_budget(config, lambda columns: peer_outliers.sum_matrices(cells, columns))
+
+    creatives = {}
+    for r in results:
+        creatives.update(r["creatives"])
+
+    # creative fatigue curves need every campaign a message ran in
+    fatigue_cells = pd.DataFrame([c for r in results for c in r.get("fatigue_cells", [])])
+    if config.get("creative_fatigue", False) and not fatigue_cells.empty:
+        generator = CreativeGenerator(fatigue_cells, rng=random.Random(config.get("random_seed", 42)),
+                                      config=dict(config, creative_fatigue=False))
+        creatives.update(generator.generate_for_campaigns(generator.fatigue_campaigns(exclude=creatives)))
+        for campaign, worn in generator.fatigue_targets().items():
+            if campaign in creatives:
+                creatives[campaign]["fatigued_creatives"] = worn
+
+    return {
+        "plan": plan,
+        "summary": summary,
+        "candidates": HypothesisBatch.from_dicts(candidates),
+        "validated": HypothesisBatch.from_dicts(validated),
+        "budget": budget,
+        "creatives": creatives,
+        "execution_plan": None,
     }
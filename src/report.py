@@ -0,0 +1,289 @@
+"""
+Streaming report renderer (Markdown, optionally HTML).
+
+Each pipeline stage hands its results to ReportWriter as soon as it
+finishes; the section is rendered from templates compiled once at import
+and flushed to a temporary file next to the report, and campaign tables
+are written row by row instead of building the whole document in memory.
+Only a run that completes replaces the report (os.replace of the finished
+file); an interrupted run discards its partial output and leaves the
+previous report in place.
+"""
+
+import html
+import math
+import os
+from string import Template
+
+_BLOCKS = "▁▂▃▄▅▆▇█"
+
+# --------------------------------------------------------
+# Templates (compiled once)
+# --------------------------------------------------------
+_MD = {
+    "header": Template("# Facebook Ads Performance Analysis\n\nQuery: **$query**\n\n"),
+    "overview": Template(
+        "## Data Overview\n"
+        "- Days: $days ($start → $end)\n"
+        "- Campaigns: $campaigns\n"
+        "- Spend: $spend · Revenue: $revenue · ROAS: $roas · CTR: $ctr\n\n"
+    ),
+    "trends_head": Template("## Campaign Trends\n| Campaign | Daily CTR | Spend | ROAS | CTR |\n|---|---|---|---|---|\n"),
+    "trend_row": Template("| $campaign | $spark | $spend | $roas | $ctr |\n"),
+    "trends_foot": Template("\n"),
+    "insights_head": Template("## Key Insights\n"),
+    "insight": Template("- **$hypothesis** (Campaign: $campaign, Confidence: $confidence)\n"),
+    "budget_head": Template(
+        "\n## Budget Recommendations\n"
+        "Daily budget $total across $optimized campaigns · expected revenue $current → $recommended ($lift)\n\n"
+        "| Campaign | Current/day | Recommended/day | Change | Marginal ROAS |\n|---|---|---|---|---|\n"
+    ),
+    "budget_row": Template("| $campaign | $current | $recommended | $change | $marginal |\n"),
+    "creatives_head": Template("\n## Creative Recommendations\n"),
+    "campaign": Template("### $campaign\n"),
+    "suggestion": Template("- $text\n"),
+}
+
+_HTML = {
+    "header": Template(
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        "<title>Facebook Ads Performance Analysis</title>\n"
+        "<style>body{font-family:sans-serif;max-width:960px;margin:2em auto}"
+        "table{border-collapse:collapse}td,th{padding:2px 8px;border-bottom:1px solid #ddd;text-align:right}"
+        "td:first-child,th:first-child{text-align:left}svg{vertical-align:middle}</style>\n"
+        "</head><body>\n<h1>Facebook Ads Performance Analysis</h1>\n<p>Query: <b>$query</b></p>\n"
+    ),
+    "overview": Template(
+        "<h2>Data Overview</h2>\n<ul><li>Days: $days ($start → $end)</li>"
+        "<li>Campaigns: $campaigns</li>"
+        "<li>Spend: $spend · Revenue: $revenue · ROAS: $roas · CTR: $ctr</li></ul>\n"
+    ),
+    "trends_head": Template(
+        "<h2>Campaign Trends</h2>\n<table><tr><th>Campaign</th><th>Daily CTR</th>"
+        "<th>Spend</th><th>ROAS</th><th>CTR</th></tr>\n"
+    ),
+    "trend_row": Template("<tr><td>$campaign</td><td>$spark</td><td>$spend</td><td>$roas</td><td>$ctr</td></tr>\n"),
+    "trends_foot": Template("</table>\n"),
+    "insights_head": Template("<h2>Key Insights</h2>\n<ul>\n"),
+    "insight": Template("<li><b>$hypothesis</b> (Campaign: $campaign, Confidence: $confidence)</li>\n"),
+    "insights_foot": Template("</ul>\n"),
+    "budget_head": Template(
+        "<h2>Budget Recommendations</h2>\n"
+        "<p>Daily budget $total across $optimized campaigns · expected revenue $current → $recommended ($lift)</p>\n"
+        "<table><tr><th>Campaign</th><th>Current/day</th><th>Recommended/day</th>"
+        "<th>Change</th><th>Marginal ROAS</th></tr>\n"
+    ),
+    "budget_row": Template(
+        "<tr><td>$campaign</td><td>$current</td><td>$recommended</td><td>$change</td><td>$marginal</td></tr>\n"
+    ),
+    "budget_foot": Template("</table>\n"),
+    "creatives_head": Template("<h2>Creative Recommendations</h2>\n"),
+    "campaign": Template("<h3>$campaign</h3>\n<ul>\n"),
+    "suggestion": Template("<li>$text</li>\n"),
+    "campaign_foot": Template("</ul>\n"),
+    "footer": Template("</body></html>\n"),
+}
+
+
+# --------------------------------------------------------
+# Sparklines
+# --------------------------------------------------------
+def _finite(values):
+    return [v for v in values if v is not None and not math.isnan(v)]
+
+
+def text_sparkline(values):
+    """Unicode block sparkline over the days with data (gaps are dropped)."""
+    finite = _finite(values)
+    if not finite:
+        return ""
+    lo, hi = min(finite), max(finite)
+    span = (hi - lo) or 1.0
+    return "".join(_BLOCKS[int((v - lo) / span * (len(_BLOCKS) - 1))] for v in finite)
+
+
+def svg_sparkline(values, width=120, height=24):
+    """Inline SVG polyline; gaps (NaN) split the line."""
+    finite = _finite(values)
+    if not finite:
+        return ""
+    lo, hi = min(finite), max(finite)
+    span = (hi - lo) or 1.0
+    step = width / max(1, len(values) - 1)
+
+    lines, points = [], []
+    for i, v in enumerate(values):
+        if v is None or math.isnan(v):
+            if points:
+                lines.append(points)
+            points = []
+            continue
+        points.append(f"{i * step:.1f},{height - 1 - (v - lo) / span * (height - 2):.1f}")
+    if points:
+        lines.append(points)
+
+    body = "".join(
+        f'<polyline fill="none" stroke="#1f77b4" stroke-width="1" points="{" ".join(p)}"/>'
+        if len(p) > 1 else
+        f'<circle r="1" fill="#1f77b4" cx="{p[0].split(",")[0]}" cy="{p[0].split(",")[1]}"/>'
+        for p in lines
+    )
+    return f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">{body}</svg>'
+
+
+# --------------------------------------------------------
+# Writer
+# --------------------------------------------------------
+class ReportWriter:
+    """
+    Writes the run report section by section to `md_path` and, when given,
+    an HTML twin at `html_path`. Call the section methods as stages finish,
+    then close().
+
+    Sections are streamed to `<path>.tmp`; close() moves the finished files
+    into place, so a failed run (discard(), or leaving the `with` block on
+    an exception) keeps the previous report intact.
+    """
+
+    def __init__(self, md_path, html_path=None):
+        self._paths = [md_path] + ([html_path] if html_path else [])
+        self._outputs = [(open(f"{md_path}.tmp", "w", encoding="utf-8"), _MD, False)]
+        if html_path:
+            self._outputs.append((open(f"{html_path}.tmp", "w", encoding="utf-8"), _HTML, True))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
+
+    def _emit(self, name, table_cells=(), **fields):
+        """Render template `name`; `table_cells` fields get Markdown pipes escaped."""
+        for f, templates, is_html in self._outputs:
+            t = templates.get(name)
+            if t is None:
+                continue
+            if is_html:
+                values = {k: html.escape(str(v)) for k, v in fields.items()}
+            else:
+                values = {k: str(v).replace("|", "\\|") if k in table_cells else v for k, v in fields.items()}
+            f.write(t.substitute(values))
+
+    def _emit_row(self, values, spark):
+        for f, templates, is_html in self._outputs:
+            if is_html:
+                row = {k: html.escape(str(v)) for k, v in values.items()}
+            else:
+                row = dict(values, campaign=str(values["campaign"]).replace("|", "\\|"))
+            row["spark"] = svg_sparkline(spark) if is_html else text_sparkline(spark)
+            f.write(templates["trend_row"].substitute(row))
+
+    def _flush(self):
+        for f, _, _ in self._outputs:
+            f.flush()
+
+    def header(self, query):
+        self._emit("header", query=query)
+        self._flush()
+
+    def data_section(self, summary, series=()):
+        """
+        Account overview from the summary plus one table row per campaign.
+        `series` yields (campaign, daily CTR values) and is consumed lazily.
+        """
+        ts = summary.get("timeseries", [])
+        campaigns = {row["campaign_name"]: row for row in summary.get("campaign_summary", [])}
+        spend = sum(r.get("spend", 0) or 0 for r in ts)
+        revenue = sum(r.get("revenue", 0) or 0 for r in ts)
+        clicks = sum(r.get("clicks", 0) or 0 for r in ts)
+        impressions = sum(r.get("impressions", 0) or 0 for r in ts)
+        self._emit(
+            "overview",
+            days=len(ts),
+            start=str(ts[0]["date"])[:10] if ts else "-",
+            end=str(ts[-1]["date"])[:10] if ts else "-",
+            campaigns=len(campaigns),
+            spend=f"{spend:,.2f}",
+            revenue=f"{revenue:,.2f}",
+            roas=f"{revenue / spend if spend else 0:.2f}",
+            ctr=f"{clicks / impressions if impressions else 0:.4f}",
+        )
+
+        self._emit("trends_head")
+        for campaign, values in series:
+            row = campaigns.get(campaign, {})
+            self._emit_row({
+                "campaign": campaign,
+                "spend": f"{row['spend']:,.2f}" if "spend" in row else "-",
+                "roas": f"{row['roas']:.2f}" if "roas" in row else "-",
+                "ctr": f"{row['ctr']:.4f}" if "ctr" in row else "-",
+            }, [float(v) for v in values])
+        self._emit("trends_foot")
+        self._flush()
+
+    def insights_section(self, validated):
+        self._emit("insights_head")
+        for v in validated:
+            if v.get("valid"):
+                self._emit(
+                    "insight",
+                    hypothesis=v.get("hypothesis"),
+                    campaign=v.get("campaign"),
+                    confidence=f"{v.get('confidence'):.2f}",
+                )
+        self._emit("insights_foot")
+        self._flush()
+
+    def budget_section(self, budget, rows=15):
+        """Budget optimizer summary plus the `rows` largest recommended moves."""
+        expected = budget.get("expected_daily_revenue", {})
+        self._emit(
+            "budget_head",
+            total=f"{budget.get('total_daily_budget', 0):,.2f}",
+            optimized=budget.get("campaigns_optimized", 0),
+            current=f"{expected.get('current', 0):,.2f}",
+            recommended=f"{expected.get('recommended', 0):,.2f}",
+            lift=f"{expected.get('lift_pct', 0):+.1%}",
+        )
+        moves = [a for a in budget.get("allocations", []) if a.get("optimized")]
+        moves.sort(key=lambda a: -abs(a["recommended_daily_spend"] - a["current_daily_spend"]))
+        for a in moves[:rows]:
+            self._emit(
+                "budget_row",
+                table_cells=("campaign",),
+                campaign=a["campaign"],
+                current=f"{a['current_daily_spend']:,.2f}",
+                recommended=f"{a['recommended_daily_spend']:,.2f}",
+                change=f"{a['change_pct']:+.1%}",
+                marginal=f"{a['marginal_roas']:.2f}",
+            )
+        self._emit("budget_foot")
+        self._flush()
+
+    def creatives_section(self, creatives):
+        self._emit("creatives_head")
+        for camp, data in creatives.items():
+            self._emit("campaign", campaign=camp)
+            for s in data.get("suggestions", []):
+                self._emit("suggestion", text=s)
+            self._emit("campaign_foot")
+        self._flush()
+
+    def close(self):
+        if all(f.closed for f, _, _ in self._outputs):
+            return
+        self._emit("footer")
+        for (f, _, _), path in zip(self._outputs, self._paths):
+            f.close()
+            os.replace(f.name, path)
+
+    def discard(self):
+        """Drop the partial report; whatever was at the report paths stays."""
+        for f, _, _ in self._outputs:
+            if not f.closed:
+                f.close()
+                os.remove(f.name)
@@ -1,7 +1,9 @@
 import argparse
+import contextlib
 import os
 import sys
 import time
+import uuid
 from datetime import datetime
 from typing import Any, Dict
 
@@ -11,11 +13,9 @@ sys.path.insert(0, ROOT_DIR)
 
 from src.utils import load_config, save_json, set_seeds, retry, StructuredLogger, Metrics
 
-from src.agents.data_agent import DataAgent
-from src.agents.planner import PlannerAgent
-from src.agents.insight_agent import InsightAgent
-from src.agents.evaluator import EvaluatorAgent
-from src.agents.creative_generator import CreativeGenerator
+# Agent modules (and the pandas / numpy / sklearn stack behind them) are
+# imported inside main(), right before the step that needs them, so that
+# `--help` and early log output do not wait on heavy imports.
 
 
 def timed_step(name: str, func, *args, **kwargs):
@@ -26,14 +26,18 @@ def timed_step(name: str, func, *args, **kwargs):
     return result, round(end - start, 4)
 
 
-def main(user_query: str, config_path: str = "config/config.yaml"):
+def new_run_id() -> str:
+    """UTC start second plus a random suffix, so runs started in the same second stay distinct."""
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def main(user_query: str, config_path: str = "config/config.yaml", use_cache: bool = True):
     # ─────────────────────────────────────────────
     # Preload config and create run id & logger & metrics
     # ─────────────────────────────────────────────
     config = load_config(config_path)
-    set_seeds(config.get("random_seed", 42))
 
-    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    run_id = new_run_id()
     logs_dir = config.get("logs_dir", "logs")
     run_logger = StructuredLogger(name="kasparro_run", run_id=run_id, logs_dir=logs_dir)
     metrics = Metrics()
@@ -46,201 +50,348 @@ def main(user_query: str, config_path: str = "config/config.yaml"):
     }
 
     run_logger.info({"event": "run_start", "run_id": run_id, "query": user_query})
-    metrics.incr("run.start", 1)
-    metrics.start_timer("run.total")
-
-    data_path = config.get("data_csv", "data/sample_fb_ads.csv")
-
-    # ─────────────────────────────────────────────
-    # STEP 1 — Planner
-    # ─────────────────────────────────────────────
-    planner = PlannerAgent()
-    try:
-        plan, t = timed_step("planner", planner.plan, user_query)
-        run_log["steps"]["planner"] = {"duration_sec": t, "plan": plan}
-        run_logger.info({"event": "planner_done", "duration_sec": t, "plan_len": len(plan.get("tasks", [])) if isinstance(plan, dict) else None})
-        metrics.incr("planner.runs", 1)
-        metrics.start_timer("planner")
-        metrics.stop_timer("planner")
-    except Exception as e:
-        run_logger.error({"event": "planner_failed", "error": str(e)})
-        raise
-
-    # ─────────────────────────────────────────────
-    # STEP 2 — Data Agent (with config-driven drift behavior)
-    # ─────────────────────────────────────────────
-    data_agent = DataAgent(data_path, logger=run_logger, config=config)
-    load_with_retry = retry(attempts=3, initial_delay=0.5, backoff=2.0, logger=run_logger)(data_agent.load)
-
-    try:
-        metrics.start_timer("data_load")
-        df, t_load = timed_step("data_load", load_with_retry)
-        metrics.stop_timer("data_load")
-        metrics.incr("data.rows", len(df))
-        summary, t_summary = timed_step("data_summary", data_agent.summary)
-
-        run_log["steps"]["data_agent"] = {
-            "duration_load_sec": t_load,
-            "duration_summary_sec": t_summary,
-            "rows": len(df),
-            "columns": df.columns.tolist(),
-            "sample_head": df.head(3).to_dict(orient="records"),
-        }
-        run_logger.info({"event": "data_loaded", "rows": len(df), "duration_load_sec": t_load})
-    except Exception as e:
-        run_logger.error({"event": "data_failed", "error": str(e)})
-        raise
-
-    # ─────────────────────────────────────────────
-    # STEP 3 — Insight Agent (with retry)
-    # ─────────────────────────────────────────────
-    insight_agent = InsightAgent(df)
-    generate_insights_with_retry = retry(attempts=3, initial_delay=0.5, backoff=2.0, logger=run_logger)(insight_agent.generate_candidates)
-    try:
-        metrics.start_timer("insights")
-        hypotheses, t_h = timed_step("insight_generation", generate_insights_with_retry)
-        metrics.stop_timer("insights")
-        run_log["steps"]["insight_agent"] = {
-            "duration_sec": t_h,
-            "num_hypotheses": len(hypotheses),
-            "hypothesis_titles": [h.get("hypothesis") for h in hypotheses[:100]]  # sample first 100 titles
-        }
-        run_logger.info({"event": "insights_generated", "num_hypotheses": len(hypotheses), "duration_sec": t_h})
-        metrics.incr("insights.count", len(hypotheses))
-    except Exception as e:
-        run_logger.error({"event": "insight_generation_failed", "error": str(e)})
-        raise
 
-    # ─────────────────────────────────────────────
-    # STEP 4 — Evaluator Agent
-    # ─────────────────────────────────────────────
-    evaluator = EvaluatorAgent(df, config)
-    try:
-        metrics.start_timer("evaluation")
-        validated, t_eval = timed_step("evaluator", evaluator.validate, hypotheses)
-        metrics.stop_timer("evaluation")
-        run_log["steps"]["evaluator"] = {
-            "duration_sec": t_eval,
-            "num_valid": sum(1 for h in validated if h.get("valid")),
-            "decisions": [
-                {
-                    "hypothesis": h.get("hypothesis"),
-                    "valid": h.get("valid"),
-                    "confidence": round(float(h.get("confidence", 0)), 3),
-                    "campaign": h.get("campaign")
+    # Hierarchical spans (Chrome trace format) when trace_file is set
+    from src.agents.tracing import from_config as tracer_from_config
+
+    tracer = tracer_from_config(config)
+    trace_path = None
+
+    def export_trace():
+        nonlocal trace_path
+        if tracer.enabled:
+            trace_path = tracer.export(config["trace_file"].format(run_id=run_id))
+            run_logger.info({"event": "trace_saved", "path": trace_path, "spans": len(tracer.events)})
+
+    # stages run inside the root span; a failure discards the partial report
+    # but still exports the trace (callbacks run after the span has closed)
+    with contextlib.ExitStack() as stack:
+        stack.callback(export_trace)
+        stack.enter_context(tracer.span("run", run_id=run_id, query=user_query))
+        rng = set_seeds(config.get("random_seed", 42))
+        metrics.incr("run.start", 1)
+        metrics.start_timer("run.total")
+
+        data_path = config.get("data_csv", "data/sample_fb_ads.csv")
+
+        # Report sections are streamed to disk as each stage completes
+        from src.report import ReportWriter
+
+        report_path = config.get("report_file", "reports/report.md")
+        html_report_path = config.get("report_html_file")
+        for path in (report_path, html_report_path):
+            if path:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        report = stack.enter_context(ReportWriter(report_path, html_report_path))
+
+        # Insights, evaluation and creatives are cached by content (data + config + code)
+        from src.stage_cache import StageCache
+
+        cache = StageCache(
+            config.get("stage_cache_dir", "cache/stages"),
+            max_mb=config.get("stage_cache_max_mb", 256),
+            metrics=metrics,
+            enabled=use_cache and bool(config.get("stage_cache", True)),
+        )
+
+        # ─────────────────────────────────────────────
+        # STEP 1 — Planner
+        # ─────────────────────────────────────────────
+        from src.agents.planner import PlannerAgent
+
+        planner = PlannerAgent()
+        try:
+            plan, t = timed_step("planner", planner.plan, user_query)
+            run_log["steps"]["planner"] = {"duration_sec": t, "plan": plan}
+            run_logger.info({"event": "planner_done", "duration_sec": t, "plan_len": len(plan.get("tasks", [])) if isinstance(plan, dict) else None})
+            metrics.incr("planner.runs", 1)
+            metrics.start_timer("planner")
+            metrics.stop_timer("planner")
+            report.header(user_query)
+        except Exception as e:
+            run_logger.error({"event": "planner_failed", "error": str(e)})
+            raise
+
+        # ─────────────────────────────────────────────
+        # STEP 2 — Data Agent (with config-driven drift behavior)
+        # ─────────────────────────────────────────────
+        from src.agents.data_agent import DataAgent
+
+        data_agent = DataAgent(data_path, logger=run_logger, config=config, tracer=tracer)
+        # approximate mode: one sketch pass, then only the heavy hitters' rows
+        approx = config.get("aggregation_mode", "exact") == "approx"
+        load = data_agent.load_focus if approx else data_agent.load
+        load_with_retry = retry(attempts=3, initial_delay=0.5, backoff=2.0, logger=run_logger)(load)
+
+        try:
+            # memory budget: estimate the footprint and pick a load strategy first
+            execution_plan = None
+            if config.get("max_memory_mb"):
+                from src.agents import memory_planner
+
+                execution_plan = memory_planner.plan_execution(
+                    data_agent, float(config["max_memory_mb"]), **memory_planner.config_params(config)
+                )
+                execution_plan.apply(data_agent)
+                run_logger.info({"event": "execution_plan", **execution_plan.to_dict()})
+                if not execution_plan.fits_budget:
+                    run_logger.warning({
+                        "event": "memory_budget_exceeded",
+                        "strategy": execution_plan.strategy,
+                        "estimated_peak_mb": round(execution_plan.estimated_peak_mb, 2),
+                        "max_memory_mb": execution_plan.max_memory_mb,
+                    })
+
+            metrics.start_timer("data_load")
+            if execution_plan is None:
+                df, t_load = timed_step("data_load", load_with_retry)
+            elif not config.get("memory_measure_peak", False):
+                df, t_load = timed_step("data_load", load_with_retry)
+                run_log["steps"]["execution_plan"] = execution_plan.to_dict()
+            else:
+                # tracemalloc slows the load down considerably; only when asked for
+                (df, peak_mb), t_load = timed_step("data_load", memory_planner.measure_peak, load_with_retry)
+                run_log["steps"]["execution_plan"] = execution_plan.to_dict(actual_peak_mb=peak_mb)
+                run_logger.info({
+                    "event": "memory_peak",
+                    "strategy": execution_plan.strategy,
+                    "estimated_peak_mb": round(execution_plan.estimated_peak_mb, 2),
+                    "actual_peak_mb": round(peak_mb, 2),
+                })
+                metrics.incr("memory.estimated_peak_mb", round(execution_plan.estimated_peak_mb, 2))
+                metrics.incr("memory.actual_peak_mb", round(peak_mb, 2))
+            metrics.stop_timer("data_load")
+            metrics.incr("data.rows", len(df))
+            summary, t_summary = timed_step("data_summary", data_agent.summary)
+
+            run_log["steps"]["data_agent"] = {
+                "duration_load_sec": t_load,
+                "duration_summary_sec": t_summary,
+                "rows": len(df),
+                "columns": df.columns.tolist(),
+                "sample_head": df.head(3).to_dict(orient="records"),
+            }
+            run_logger.info({"event": "data_loaded", "rows": len(df), "duration_load_sec": t_load})
+            report.data_section(summary, data_agent.campaign_series())
+        except Exception as e:
+            run_logger.error({"event": "data_failed", "error": str(e)})
+            raise
+
+        # ─────────────────────────────────────────────
+        # STEP 3 — Insight Agent (with retry)
+        # ─────────────────────────────────────────────
+        from src.agents.insight_agent import InsightAgent
+        from src.agents.hypotheses import HypothesisBatch
+
+        def generate_insights():
+            # approximate mode: exact per-campaign analysis only for heavy hitters
+            focus = None
+            if approx:
+                focus = data_agent.heavy_hitters().get("campaign_name")
+                run_logger.info({"event": "insight_focus", "campaigns": len(focus or [])})
+
+            insight_agent = InsightAgent(
+                df, config, store=data_agent.store, focus=focus, tracer=tracer, daily=data_agent.daily_totals,
+            )
+            return retry(attempts=3, initial_delay=0.5, backoff=2.0, logger=run_logger)(insight_agent.candidate_batch)()
+
+        insights_key = cache.key("insights", config, fingerprint=data_agent.fingerprint())
+        try:
+            metrics.start_timer("insights")
+            (hypotheses, hit), t_h = timed_step("insight_generation", cache.cached, "insights", insights_key, generate_insights)
+            hypotheses = HypothesisBatch.coerce(hypotheses)
+            metrics.stop_timer("insights")
+            run_log["steps"]["insight_agent"] = {
+                "duration_sec": t_h,
+                "cache_hit": hit,
+                "num_hypotheses": len(hypotheses),
+                "hypothesis_titles": [h.get("hypothesis") for h in hypotheses[:100]]  # sample first 100 titles
+            }
+            run_logger.info({"event": "insights_generated", "num_hypotheses": len(hypotheses), "duration_sec": t_h})
+            metrics.incr("insights.count", len(hypotheses))
+        except Exception as e:
+            run_logger.error({"event": "insight_generation_failed", "error": str(e)})
+            raise
+
+        # ─────────────────────────────────────────────
+        # STEP 4 — Evaluator Agent
+        # ─────────────────────────────────────────────
+        from src.agents.evaluator import EvaluatorAgent
+
+        evaluation_key = cache.key("evaluation", config, upstream=insights_key)
+        try:
+            metrics.start_timer("evaluation")
+            (validated, hit), t_eval = timed_step(
+                "evaluator", cache.cached, "evaluation", evaluation_key,
+                lambda: EvaluatorAgent(df, config, rng=rng, tracer=tracer, daily=data_agent.daily_totals).validate(hypotheses),
+            )
+            validated = HypothesisBatch.coerce(validated)
+            metrics.stop_timer("evaluation")
+            run_log["steps"]["evaluator"] = {
+                "duration_sec": t_eval,
+                "cache_hit": hit,
+                "num_valid": int(validated.valid.sum()),
+                "decisions": [
+                    {
+                        "hypothesis": h.get("hypothesis"),
+                        "valid": h.get("valid"),
+                        "confidence": round(float(h.get("confidence", 0)), 3),
+                        "campaign": h.get("campaign")
+                    }
+                    for h in validated
+                ],
+            }
+            run_logger.info({"event": "evaluation_done", "num_valid": run_log["steps"]["evaluator"]["num_valid"], "duration_sec": t_eval})
+            metrics.incr("evaluation.valid", run_log["steps"]["evaluator"]["num_valid"])
+            report.insights_section(validated)
+        except Exception as e:
+            run_logger.error({"event": "evaluation_failed", "error": str(e)})
+            raise
+
+        # ─────────────────────────────────────────────
+        # STEP 4b — Budget optimizer
+        # ─────────────────────────────────────────────
+        budget = None
+        if config.get("budget_optimizer", True):
+            from src.agents import budget_optimizer
+
+            try:
+                metrics.start_timer("budget")
+                start = time.time()
+                with tracer.span("budget"):
+                    campaigns, sums = data_agent.campaign_day_matrices(budget_optimizer.INPUT_COLUMNS)
+                    budget = budget_optimizer.optimize(campaigns, sums, **budget_optimizer.config_params(config))
+                t_budget = round(time.time() - start, 4)
+                metrics.stop_timer("budget")
+                run_log["steps"]["budget_optimizer"] = {
+                    "duration_sec": t_budget,
+                    "campaigns_optimized": budget["campaigns_optimized"],
+                    "expected_daily_revenue": budget["expected_daily_revenue"],
                 }
-                for h in validated
-            ],
-        }
-        run_logger.info({"event": "evaluation_done", "num_valid": run_log["steps"]["evaluator"]["num_valid"], "duration_sec": t_eval})
-        metrics.incr("evaluation.valid", run_log["steps"]["evaluator"]["num_valid"])
-    except Exception as e:
-        run_logger.error({"event": "evaluation_failed", "error": str(e)})
-        raise
-
-    # ─────────────────────────────────────────────
-    # STEP 5 — Creative Generator
-    # ─────────────────────────────────────────────
-    low_ctr_campaigns = [
-        h.get("campaign")
-        for h in validated
-        if h.get("valid") and h.get("campaign") is not None and "ctr" in h.get("hypothesis", "").lower()
-    ]
-
-    if not low_ctr_campaigns:
-        dfc = df.groupby("campaign_name").agg({"clicks": "sum", "impressions": "sum"})
-        dfc["ctr"] = dfc["clicks"] / dfc["impressions"].replace(0, 1)
-        low_ctr_campaigns = dfc.sort_values("ctr").head(2).index.tolist()
-
-    creative_gen = CreativeGenerator(df)
-    try:
-        metrics.start_timer("creative_generation")
-        creatives, t_creative = timed_step("creative_generation", creative_gen.generate_for_campaigns, low_ctr_campaigns)
-        metrics.stop_timer("creative_generation")
-        run_log["steps"]["creative_generator"] = {
-            "duration_sec": t_creative,
-            "target_campaigns": low_ctr_campaigns,
-            "output_count": {camp: len(v.get("suggestions", [])) for camp, v in creatives.items()}
-        }
-        run_logger.info({"event": "creatives_generated", "target_count": len(low_ctr_campaigns), "duration_sec": t_creative})
-        metrics.incr("creatives.targeted", len(low_ctr_campaigns))
-    except Exception as e:
-        run_logger.error({"event": "creative_generation_failed", "error": str(e)})
-        raise
-
-    # ─────────────────────────────────────────────
-    # SAVE OUTPUT FILES
-    # ─────────────────────────────────────────────
-    os.makedirs(config.get("output_dir", "reports"), exist_ok=True)
-    os.makedirs(logs_dir, exist_ok=True)
-
-    insights_path = config.get("insights_file", "reports/insights.json")
-    creatives_path = config.get("creatives_file", "reports/creatives.json")
-    report_path = config.get("report_file", "reports/report.md")
-    log_file = os.path.join(logs_dir, f"log_{run_id}.json")
-
-    save_json(
-        {
-            "query": user_query,
-            "plan": plan,
-            "summary": summary,
-            "candidates": hypotheses,
-            "validated": validated
-        },
-        insights_path
-    )
-    run_logger.info({"event": "insights_saved", "path": insights_path})
-
-    save_json(creatives, creatives_path)
-    run_logger.info({"event": "creatives_saved", "path": creatives_path})
-
-    # Write log (structured run_log)
-    run_log["end_time"] = datetime.utcnow().isoformat()
-    # include raw logger events and metrics for observability
-    try:
-        run_log["_logger_events"] = run_logger.get_events()
-    except Exception:
-        run_log["_logger_events"] = []
-
-    run_log["_metrics"] = metrics.snapshot()
-    save_json(run_log, log_file)
-    run_logger.info({"event": "run_log_saved", "path": log_file})
-
-    # Generate Markdown Report
-    try:
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write("# Facebook Ads Performance Analysis\n\n")
-            f.write(f"Query: **{user_query}**\n\n")
-
-            f.write("## Key Insights\n")
-            for v in validated:
-                if v.get("valid"):
-                    f.write(f"- **{v.get('hypothesis')}** (Campaign: {v.get('campaign')}, Confidence: {v.get('confidence'):.2f})\n")
-
-            f.write("\n## Creative Recommendations\n")
-            for camp, data in creatives.items():
-                f.write(f"### {camp}\n")
-                for s in data.get("suggestions", []):
-                    f.write(f"- {s}\n")
-
-        run_logger.info({"event": "report_saved", "path": report_path})
-    except Exception as e:
-        run_logger.error({"event": "report_save_failed", "error": str(e)})
-        raise
-
-    metrics.stop_timer("run.total")
-    metrics.incr("run.completed", 1)
+                run_logger.info({"event": "budget_optimized", "campaigns": budget["campaigns_optimized"], "duration_sec": t_budget})
+                report.budget_section(budget, rows=int(config.get("budget_report_rows", 15)))
+            except Exception as e:
+                run_logger.error({"event": "budget_optimizer_failed", "error": str(e)})
+                raise
+
+        # ─────────────────────────────────────────────
+        # STEP 5 — Creative Generator
+        # ─────────────────────────────────────────────
+        low_ctr_campaigns = [
+            h.get("campaign")
+            for h in validated
+            if h.get("valid") and h.get("campaign") is not None and "ctr" in h.get("hypothesis", "").lower()
+        ]
+
+        if not low_ctr_campaigns:
+            dfc = df.groupby("campaign_name").agg({"clicks": "sum", "impressions": "sum"})
+            dfc["ctr"] = dfc["clicks"] / dfc["impressions"].replace(0, 1)
+            low_ctr_campaigns = dfc.sort_values("ctr").head(2).index.tolist()
+
+        from src.agents.creative_generator import CreativeGenerator
+
+        creatives_key = cache.key("creatives", config, upstream=evaluation_key)
+        try:
+            metrics.start_timer("creative_generation")
+            (creatives, hit), t_creative = timed_step(
+                "creative_generation", cache.cached, "creatives", creatives_key,
+                lambda: CreativeGenerator(df, config=config, tracer=tracer).generate_for_campaigns(low_ctr_campaigns),
+            )
+            metrics.stop_timer("creative_generation")
+            run_log["steps"]["creative_generator"] = {
+                "duration_sec": t_creative,
+                "cache_hit": hit,
+                "target_campaigns": low_ctr_campaigns,
+                "output_count": {camp: len(v.get("suggestions", [])) for camp, v in creatives.items()}
+            }
+            run_logger.info({"event": "creatives_generated", "target_count": len(low_ctr_campaigns), "duration_sec": t_creative})
+            metrics.incr("creatives.targeted", len(low_ctr_campaigns))
+            report.creatives_section(creatives)
+        except Exception as e:
+            run_logger.error({"event": "creative_generation_failed", "error": str(e)})
+            raise
+
+        # ─────────────────────────────────────────────
+        # SAVE OUTPUT FILES
+        # ─────────────────────────────────────────────
+        os.makedirs(config.get("output_dir", "reports"), exist_ok=True)
+        os.makedirs(logs_dir, exist_ok=True)
+
+        insights_path = config.get("insights_file", "reports/insights.json")
+        creatives_path = config.get("creatives_file", "reports/creatives.json")
+        log_file = os.path.join(logs_dir, f"log_{run_id}.json")
+
+        save_json(
+            {
+                "query": user_query,
+                "plan": plan,
+                "summary": summary,
+                "candidates": hypotheses,
+                "validated": validated,
+                "budget": budget,
+            },
+            insights_path,
+            tracer=tracer,
+        )
+        run_logger.info({"event": "insights_saved", "path": insights_path})
+
+        save_json(creatives, creatives_path, tracer=tracer)
+        run_logger.info({"event": "creatives_saved", "path": creatives_path})
+
+        # Write log (structured run_log)
+        run_log["end_time"] = datetime.utcnow().isoformat()
+        # include raw logger events and metrics for observability
+        try:
+            run_log["_logger_events"] = run_logger.get_events()
+        except Exception:
+            run_log["_logger_events"] = []
+
+        run_log["_metrics"] = metrics.snapshot()
+        if config.get("run_log_json", True):
+            save_json(run_log, log_file, tracer=tracer)
+            run_logger.info({"event": "run_log_saved", "path": log_file})
+
+        # Finish the streamed report
+        try:
+            report.close()
+            run_logger.info({"event": "report_saved", "path": report_path, "html_path": html_report_path})
+        except Exception as e:
+            run_logger.error({"event": "report_save_failed", "error": str(e)})
+            raise
+
+        metrics.stop_timer("run.total")
+        metrics.incr("run.completed", 1)
+
+    # Indexed run history (timings, hypotheses, creatives) for trend queries
+    history_path = config.get("run_history_db")
+    if history_path:
+        from src.run_history import RunHistory
+
+        try:
+            with RunHistory(history_path, blobs=bool(config.get("run_history_blobs", False))) as history:
+                history.record_run(run_log, metrics.snapshot(), validated, creatives)
+            run_logger.info({"event": "run_history_saved", "path": history_path})
+        except Exception as e:
+            run_logger.error({"event": "run_history_failed", "error": str(e)})
 
     print(f"[✓] Insights saved: {insights_path}")
     print(f"[✓] Creative ideas saved: {creatives_path}")
     print(f"[✓] Report saved: {report_path}")
-    print(f"[✓] Log saved: {log_file}")
+    if html_report_path:
+        print(f"[✓] HTML report saved: {html_report_path}")
+    if config.get("run_log_json", True):
+        print(f"[✓] Log saved: {log_file}")
+    if history_path:
+        print(f"[✓] Run history: {history_path}")
+    if trace_path:
+        print(f"[✓] Trace saved: {trace_path}")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("query", type=str, help="User query such as 'Analyze ROAS drop'")
     parser.add_argument("--config", type=str, default="config/config.yaml")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every stage instead of reusing cached results")
     args = parser.parse_args()
 
-    main(args.query, args.config)
+    main(args.query, args.config, use_cache=not args.no_cache)
@@ -0,0 +1,256 @@
+"""
+Embedded SQLite run history.
+
+Every run becomes one row in `runs` plus indexed rows for its step
+timings (from Metrics), counters, validated hypotheses and creatives, all
+written in a single transaction with executemany. Questions like "how has
+data_load latency moved over the last 500 runs" are then one indexed query
+instead of a scan over per-run JSON logs.
+
+With `blobs=True` the full run log is also kept, zlib-compressed, in
+`run_payloads` so nothing from the JSON log is lost.
+
+CLI:
+    python -m src.run_history trends [--db PATH] [--step data_load] [--last 500]
+    python -m src.run_history runs   [--db PATH] [--last 20]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import zlib
+
+from src.utils import _make_json_safe
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    query        TEXT,
+    start_time   TEXT,
+    end_time     TEXT,
+    duration_sec REAL,
+    rows         INTEGER,
+    num_candidates INTEGER,
+    num_valid    INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_start ON runs(start_time);
+
+CREATE TABLE IF NOT EXISTS step_timings (
+    run_id       TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    step         TEXT NOT NULL,
+    duration_sec REAL NOT NULL,
+    PRIMARY KEY (run_id, step)
+);
+CREATE INDEX IF NOT EXISTS idx_step_timings_step ON step_timings(step, run_id);
+
+CREATE TABLE IF NOT EXISTS counters (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name   TEXT NOT NULL,
+    value  REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS hypotheses (
+    run_id     TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    hyp_id     TEXT NOT NULL,
+    hypothesis TEXT,
+    confidence REAL,
+    valid      INTEGER,
+    PRIMARY KEY (run_id, hyp_id)
+);
+CREATE INDEX IF NOT EXISTS idx_hypotheses_hyp ON hypotheses(hyp_id);
+
+CREATE TABLE IF NOT EXISTS creatives (
+    run_id     TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    campaign   TEXT NOT NULL,
+    position   INTEGER NOT NULL,
+    suggestion TEXT,
+    PRIMARY KEY (run_id, campaign, position)
+);
+CREATE INDEX IF NOT EXISTS idx_creatives_campaign ON creatives(campaign);
+
+CREATE TABLE IF NOT EXISTS run_payloads (
+    run_id  TEXT PRIMARY KEY REFERENCES runs(run_id) ON DELETE CASCADE,
+    payload BLOB NOT NULL
+);
+"""
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class RunHistory:
+    def __init__(self, path="history/run_history.sqlite", blobs=False):
+        self.path = path
+        self.blobs = blobs
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --------------------------------------------------------
+    # Writes
+    # --------------------------------------------------------
+    def record_run(self, run_log, metrics=None, validated=None, creatives=None):
+        """
+        Store one run. `run_log` is run.py's structured log (run_id, query,
+        start/end time, steps); `metrics` a Metrics snapshot. Re-recording a
+        run_id replaces the earlier rows.
+        """
+        metrics = metrics or {}
+        validated = validated or []
+        creatives = creatives or {}
+        run_id = run_log["run_id"]
+        steps = run_log.get("steps", {})
+
+        timings = {k: v for k, v in metrics.get("timers", {}).items() if isinstance(v, (int, float))}
+        for step, info in steps.items():
+            if isinstance(info, dict) and isinstance(info.get("duration_sec"), (int, float)):
+                timings.setdefault(step, info["duration_sec"])
+
+        hyp_rows = [
+            (run_id, str(v.get("id")), v.get("hypothesis"), v.get("confidence"), int(bool(v.get("valid"))))
+            for v in validated
+        ]
+        creative_rows = [
+            (run_id, campaign, i, text)
+            for campaign, entry in creatives.items()
+            for i, text in enumerate(entry.get("suggestions", []))
+        ]
+
+        with self.conn:  # one transaction for the whole run
+            self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    run_log.get("query"),
+                    run_log.get("start_time"),
+                    run_log.get("end_time"),
+                    timings.get("run.total"),
+                    steps.get("data_agent", {}).get("rows"),
+                    steps.get("insight_agent", {}).get("num_hypotheses"),
+                    steps.get("evaluator", {}).get("num_valid"),
+                ),
+            )
+            self.conn.executemany(
+                "INSERT INTO step_timings VALUES (?, ?, ?)",
+                [(run_id, step, float(t)) for step, t in timings.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO counters VALUES (?, ?, ?)",
+                [(run_id, k, float(v)) for k, v in metrics.get("counters", {}).items()],
+            )
+            self.conn.executemany("INSERT INTO hypotheses VALUES (?, ?, ?, ?, ?)", hyp_rows)
+            self.conn.executemany("INSERT INTO creatives VALUES (?, ?, ?, ?)", creative_rows)
+            if self.blobs:
+                blob = zlib.compress(json.dumps(_make_json_safe(run_log)).encode("utf-8"))
+                self.conn.execute("INSERT INTO run_payloads VALUES (?, ?)", (run_id, blob))
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+    def payload(self, run_id):
+        """Decompressed run log stored for `run_id`, or None."""
+        row = self.conn.execute("SELECT payload FROM run_payloads WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(zlib.decompress(row[0]).decode("utf-8")) if row else None
+
+    def recent_runs(self, last=20):
+        cur = self.conn.execute(
+            "SELECT run_id, query, start_time, duration_sec, rows, num_candidates, num_valid "
+            "FROM runs ORDER BY start_time DESC, run_id DESC LIMIT ?",
+            (int(last),),
+        )
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    def step_series(self, step, last=500):
+        """(run_id, duration_sec) for `step` over the last `last` runs, oldest first."""
+        rows = self.conn.execute(
+            "SELECT t.run_id, t.duration_sec FROM step_timings t JOIN runs r USING (run_id) "
+            "WHERE t.step = ? ORDER BY r.start_time DESC, r.run_id DESC LIMIT ?",
+            (step, int(last)),
+        ).fetchall()
+        return rows[::-1]
+
+    def steps(self):
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT step FROM step_timings ORDER BY step")]
+
+    def latency_trends(self, step=None, last=500):
+        """
+        Per-step latency summary over the last `last` runs: count, mean,
+        p50, p95, the latest value and `change` (mean of the newer half
+        relative to the older half, e.g. 0.25 = 25% slower).
+        """
+        out = {}
+        for name in ([step] if step else self.steps()):
+            values = [t for _, t in self.step_series(name, last)]
+            if not values:
+                continue
+            s = sorted(values)
+            half = len(values) // 2
+            old, new = values[:half], values[half:]
+            old_mean = sum(old) / len(old) if old else None
+            out[name] = {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": _percentile(s, 0.5),
+                "p95": _percentile(s, 0.95),
+                "last": values[-1],
+                "change": (sum(new) / len(new) / old_mean - 1.0) if old_mean else None,
+            }
+        return out
+
+
+def _fmt(v):
+    if v is None:
+        return "-"
+    return f"{v:.4f}" if isinstance(v, float) else str(v)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the run history database")
+    parser.add_argument("command", choices=["trends", "runs"])
+    parser.add_argument("--db", default="history/run_history.sqlite")
+    parser.add_argument("--step", default=None, help="Only this step (trends)")
+    parser.add_argument("--last", type=int, default=None, help="Number of most recent runs")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No run history at {args.db}", file=sys.stderr)
+        return 1
+
+    with RunHistory(args.db) as history:
+        if args.command == "trends":
+            cols = ("count", "mean", "p50", "p95", "last", "change")
+            print("\t".join(("step",) + cols))
+            for step, stats in history.latency_trends(args.step, args.last or 500).items():
+                print("\t".join([step] + [_fmt(stats[c]) for c in cols]))
+        else:
+            cols = ("run_id", "start_time", "duration_sec", "rows", "num_candidates", "num_valid", "query")
+            print("\t".join(cols))
+            for run in history.recent_runs(args.last or 20):
+                print("\t".join(_fmt(run[c]) for c in cols))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
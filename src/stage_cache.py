@@ -0,0 +1,146 @@
+"""
+Content-addressed on-disk cache for whole pipeline stages.
+
+A stage result is stored under the hash of everything it depends on:
+the input data fingerprint, the config keys the stage reads, the code
+version of the agents and the key of the stage it consumes (so a change
+upstream invalidates everything downstream). Entries are JSON files; the
+directory is trimmed least-recently-used first once it outgrows its size
+limit.
+"""
+
+import functools
+import glob
+import hashlib
+import json
+import os
+import uuid
+
+from src.utils import _make_json_safe
+
+# Config keys each cached stage depends on (besides its upstream stage)
+STAGE_CONFIG_KEYS = {
+    "insights": (
+        "aggregation_mode", "approx_levels", "approx_epsilon", "approx_delta", "approx_top_k",
+        "approx_hll_error", "date_window", "schema_drift_mode", "validation_mode",
+        # how the data is loaded changes the frame every downstream stage sees
+        "execution_backend", "compact_dtypes", "max_memory_mb", "memory_plan_sample_rows", "memory_plan_chunksize",
+        "peer_outlier_metrics", "peer_outlier_z", "peer_outlier_min_share", "peer_outlier_min_days",
+        "peer_outlier_min_peers", "lag_targets", "lag_max_days", "lag_min_corr", "lag_min_gain", "lag_min_days",
+    ),
+    "evaluation": (
+        "confidence_min", "confidence_mode", "bootstrap_samples", "bootstrap_ci", "random_seed",
+    ),
+    "creatives": (
+        "random_seed", "creative_mode", "creative_variants", "creative_prior_impressions", "creative_phrase_source",
+        "creative_fatigue", "creative_fatigue_min_days", "creative_fatigue_min_impressions", "creative_fatigue_min_t",
+        "creative_fatigue_max_campaigns",
+    ),
+}
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+_AGENTS_DIR = os.path.join(_SRC_DIR, "agents")
+# modules outside agents/ that decide what goes into a stage (focus selection,
+# batching, shard merging)
+_STAGE_MODULES = ("orchestrator.py", "run.py", "work_queue.py")
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """
+    Hash of the agent sources and the modules that assemble the stages, so
+    editing any of them invalidates cached results.
+    """
+    h = hashlib.sha1()
+    paths = sorted(glob.glob(os.path.join(_AGENTS_DIR, "*.py")))
+    paths += [os.path.join(_SRC_DIR, name) for name in _STAGE_MODULES]
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(os.path.relpath(path, _SRC_DIR).encode("utf-8") + b"\0" + f.read())
+    return h.hexdigest()
+
+
+class StageCache:
+    def __init__(self, root="cache/stages", max_mb=256, metrics=None, enabled=True):
+        self.root = root
+        self.max_bytes = int(float(max_mb) * 1024 * 1024)
+        self.metrics = metrics
+        self.enabled = enabled
+
+    def key(self, stage, config, fingerprint=None, upstream=None):
+        payload = {
+            "stage": stage,
+            "data": fingerprint,
+            "upstream": upstream,
+            "config": {k: config.get(k) for k in STAGE_CONFIG_KEYS.get(stage, ())},
+            "code": code_version(),
+        }
+        return hashlib.sha256(json.dumps(_make_json_safe(payload), sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def _count(self, stage, outcome):
+        if self.metrics is not None:
+            self.metrics.incr(f"cache.{outcome}", 1)
+            self.metrics.incr(f"cache.{stage}.{outcome}", 1)
+
+    def get(self, stage, key):
+        """(True, value) on a hit, (False, None) on a miss."""
+        if not self.enabled:
+            return False, None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            self._count(stage, "miss")
+            return False, None
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        self._count(stage, "hit")
+        return True, value
+
+    def put(self, stage, key, value):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"stage": stage, "value": _make_json_safe(value)}, f)
+        os.replace(tmp, path)
+        self.evict()
+
+    def cached(self, stage, key, compute):
+        """(value, hit): the stored result for `key`, else `compute()` stored."""
+        hit, value = self.get(stage, key)
+        if hit:
+            return value, True
+        value = compute()
+        self.put(stage, key, value)
+        return value, False
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits max_mb."""
+        entries = []
+        for path in glob.glob(os.path.join(self.root, "*", "*.json")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                if self.metrics is not None:
+                    self.metrics.incr("cache.evicted", 1)
+            except OSError:
+                pass
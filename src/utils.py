@@ -1,16 +1,19 @@
 import json
-import yaml
 import os
+import sys
 import random
 import datetime
 import threading
-import numpy as np
-import pandas as pd
 import math
+import contextlib
 import functools
+import inspect
 import time as _time
 from typing import Callable, Tuple, Any
 
+# yaml, numpy and pandas are imported lazily so that `run.py --help` and
+# other light entry points do not pay their import cost.
+
 
 # -------------------------
 # Config loader
@@ -18,6 +21,7 @@ from typing import Callable, Tuple, Any
 def load_config(path="config/config.yaml"):
     if not os.path.exists(path):
         raise FileNotFoundError(f"Config file not found: {path}")
+    import yaml
     with open(path, "r", encoding="utf-8") as f:
         cfg = yaml.safe_load(f)
     return cfg
@@ -34,11 +38,20 @@ def _make_json_safe(obj: Any):
     - sets/tuples -> lists
     - datetimes -> ISO string
     - infinities / NaNs -> None
+    - columnar batches (anything with to_dicts()) -> list of dicts
     """
+    # numpy/pandas objects can only exist if the modules were imported
+    np = sys.modules.get("numpy")
+    pd = sys.modules.get("pandas")
+
     # dict
     if isinstance(obj, dict):
         return {str(k): _make_json_safe(v) for k, v in obj.items()}
 
+    # columnar containers (e.g. HypothesisBatch) serialise as their dict rows
+    if callable(getattr(obj, "to_dicts", None)):
+        return [_make_json_safe(v) for v in obj.to_dicts()]
+
     # list-like
     if isinstance(obj, list):
         return [_make_json_safe(v) for v in obj]
@@ -50,7 +63,7 @@ def _make_json_safe(obj: Any):
         return [_make_json_safe(v) for v in list(obj)]
 
     # pandas timestamp
-    if isinstance(obj, (pd.Timestamp,)):
+    if pd is not None and isinstance(obj, (pd.Timestamp,)):
         try:
             return obj.isoformat()
         except Exception:
@@ -61,18 +74,19 @@ def _make_json_safe(obj: Any):
         return obj.isoformat()
 
     # numpy numbers
-    if isinstance(obj, (np.integer,)):
-        return int(obj)
-    if isinstance(obj, (np.floating,)):
-        v = float(obj)
-        if math.isinf(v) or math.isnan(v):
-            return None
-        return v
-    if isinstance(obj, (np.ndarray,)):
-        try:
-            return obj.tolist()
-        except Exception:
-            return list(obj)
+    if np is not None:
+        if isinstance(obj, (np.integer,)):
+            return int(obj)
+        if isinstance(obj, (np.floating,)):
+            v = float(obj)
+            if math.isinf(v) or math.isnan(v):
+                return None
+            return v
+        if isinstance(obj, (np.ndarray,)):
+            try:
+                return obj.tolist()
+            except Exception:
+                return list(obj)
 
     # normal floats: handle inf / nan
     if isinstance(obj, float):
@@ -86,13 +100,22 @@ def _make_json_safe(obj: Any):
 # -------------------------
 # JSON saver (safe)
 # -------------------------
-def save_json(obj, path):
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+def _no_span(name, **args):
+    return contextlib.nullcontext()
+
+
+def save_json(obj, path, tracer=None):
+    """Write `obj` as JSON; with a `tracer`, serialise and write are traced as spans."""
+    span = tracer.span if tracer is not None else _no_span
+    with span("save_json", path=path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
 
-    safe_obj = _make_json_safe(obj)
+        with span("save_json.serialize"):
+            safe_obj = _make_json_safe(obj)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(safe_obj, f, indent=2, ensure_ascii=False)
+        with span("save_json.write"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(safe_obj, f, indent=2, ensure_ascii=False)
 
     return path
 
@@ -101,8 +124,11 @@ def save_json(obj, path):
 # Seed setter
 # -------------------------
 def set_seeds(seed=42):
+    """Seed the global RNGs and return a numpy Generator seeded the same way."""
+    import numpy as np
     random.seed(seed)
     np.random.seed(seed)
+    return np.random.default_rng(seed)
 
 
 # -------------------------
@@ -121,31 +147,51 @@ def retry(
     Usage:
     @retry(attempts=3, initial_delay=0.5, backoff=2.0)
     def fn(...): ...
+
+    Coroutine functions are retried with the same schedule, backing off
+    with asyncio.sleep so the event loop is never blocked.
     """
     def deco(fn: Callable):
-        @functools.wraps(fn)
-        def wrapped(*args, **kwargs):
+        name = getattr(fn, "__name__", str(fn))
+
+        def delays():
             delay = initial_delay
-            last_exc = None
             for attempt in range(1, attempts + 1):
+                if logger:
+                    logger.info({"event": "retry_attempt", "fn": name, "attempt": attempt})
+                yield attempt, delay
+                delay *= backoff
+
+        def on_failure(attempt, delay, e):
+            """Sleep time before the next attempt; re-raises after the last one."""
+            if attempt == attempts:
+                if logger:
+                    logger.error({"event": "retry_fail", "fn": name, "attempt": attempt, "error": str(e)})
+                raise e
+            # sleep with jitter
+            sleep_time = delay + (random.random() * jitter)
+            if logger:
+                logger.warning({"event": "retry_backoff", "fn": name, "attempt": attempt, "sleep_sec": round(sleep_time, 3)})
+            return sleep_time
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapped(*args, **kwargs):
+                import asyncio
+                for attempt, delay in delays():
+                    try:
+                        return await fn(*args, **kwargs)
+                    except exceptions as e:
+                        await asyncio.sleep(on_failure(attempt, delay, e))
+            return async_wrapped
+
+        @functools.wraps(fn)
+        def wrapped(*args, **kwargs):
+            for attempt, delay in delays():
                 try:
-                    if logger:
-                        logger.info({"event": "retry_attempt", "fn": getattr(fn, "__name__", str(fn)), "attempt": attempt})
                     return fn(*args, **kwargs)
                 except exceptions as e:
-                    last_exc = e
-                    if attempt == attempts:
-                        if logger:
-                            logger.error({"event": "retry_fail", "fn": getattr(fn, "__name__", str(fn)), "attempt": attempt, "error": str(e)})
-                        raise
-                    # sleep with jitter
-                    sleep_time = delay + (random.random() * jitter)
-                    if logger:
-                        logger.warning({"event": "retry_backoff", "fn": getattr(fn, "__name__", str(fn)), "attempt": attempt, "sleep_sec": round(sleep_time, 3)})
-                    _time.sleep(sleep_time)
-                    delay *= backoff
-            # if loop falls through
-            raise last_exc
+                    _time.sleep(on_failure(attempt, delay, e))
         return wrapped
     return deco
 
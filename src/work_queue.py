@@ -0,0 +1,287 @@
+"""
+File-based work queue for sharded (multi-process / multi-host) runs.
+
+Layout under a queue root shared by every participant:
+
+    <root>/<run_id>/tasks/<task_id>.json     task payload (written by the coordinator)
+    <root>/<run_id>/leases/<task_id>.lock    claim held by one worker until it expires
+    <root>/<run_id>/results/<task_id>.json   partial result (written once, atomically)
+
+Claims rely only on atomic filesystem operations (O_CREAT|O_EXCL to take
+a lease, rename to break an expired one, os.replace to publish a result),
+so no external broker is needed. While a task runs, the worker renews its
+lease every lease_sec / 3 seconds, so a long shard is not claimed twice;
+a worker that dies simply stops renewing, its lease expires and the task
+is claimed again. Tasks are deterministic, so a late
+duplicate result overwrites the first with identical content.
+
+Run a worker on any host that sees the queue root:
+
+    python -m src.work_queue <queue_root> [--poll SEC]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import save_json, set_seeds, _make_json_safe
+
+
+class FileWorkQueue:
+    def __init__(self, root, lease_sec=600, create=False):
+        self.root = root
+        self.lease_sec = lease_sec
+        if create:
+            for sub in ("tasks", "leases", "results"):
+                os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    def _path(self, sub, task_id, ext):
+        return os.path.join(self.root, sub, f"{task_id}{ext}")
+
+    # --------------------------------------------------------
+    # Coordinator side
+    # --------------------------------------------------------
+    def put(self, task_id, payload):
+        save_json(payload, self._path("tasks", task_id, ".json"))
+
+    def task_ids(self):
+        return sorted(f[:-5] for f in os.listdir(os.path.join(self.root, "tasks")) if f.endswith(".json"))
+
+    def pending(self):
+        return [t for t in self.task_ids() if not os.path.exists(self._path("results", t, ".json"))]
+
+    def results(self):
+        out = {}
+        for t in self.task_ids():
+            p = self._path("results", t, ".json")
+            if os.path.exists(p):
+                with open(p, "r", encoding="utf-8") as f:
+                    out[t] = json.load(f)
+        return out
+
+    # --------------------------------------------------------
+    # Worker side
+    # --------------------------------------------------------
+    def _try_lease(self, task_id, worker_id):
+        lock = self._path("leases", task_id, ".lock")
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"worker": worker_id, "expires": time.time() + self.lease_sec}, f)
+        return True
+
+    def renew(self, task_id, worker_id):
+        """Push the lease's expiry out by lease_sec; False if `worker_id` no longer holds it."""
+        lock = self._path("leases", task_id, ".lock")
+        try:
+            with open(lock, "r", encoding="utf-8") as f:
+                lease = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if lease.get("worker") != worker_id:
+            return False
+        tmp = f"{lock}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"worker": worker_id, "expires": time.time() + self.lease_sec}, f)
+        os.replace(tmp, lock)
+        return True
+
+    @contextmanager
+    def heartbeat(self, task_id, worker_id, interval=None):
+        """Renew the lease from a background thread while the block runs."""
+        stop = threading.Event()
+        interval = self.lease_sec / 3.0 if interval is None else interval
+
+        def beat():
+            while not stop.wait(interval) and self.renew(task_id, worker_id):
+                pass
+
+        thread = threading.Thread(target=beat, name=f"lease-{task_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def _break_if_expired(self, task_id):
+        lock = self._path("leases", task_id, ".lock")
+        try:
+            with open(lock, "r", encoding="utf-8") as f:
+                lease = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False  # gone already, or still being written
+        if time.time() <= lease.get("expires", 0):
+            return False
+        try:
+            # only one contender wins the rename
+            os.rename(lock, f"{lock}.expired.{uuid.uuid4().hex}")
+        except FileNotFoundError:
+            return False
+        return True
+
+    def claim(self, worker_id):
+        """(task_id, payload) of a free or expired task, or None."""
+        for task_id in self.pending():
+            if self._try_lease(task_id, worker_id) or (
+                self._break_if_expired(task_id) and self._try_lease(task_id, worker_id)
+            ):
+                if os.path.exists(self._path("results", task_id, ".json")):
+                    self.release(task_id)
+                    continue
+                with open(self._path("tasks", task_id, ".json"), "r", encoding="utf-8") as f:
+                    return task_id, json.load(f)
+        return None
+
+    def complete(self, task_id, result):
+        final = self._path("results", task_id, ".json")
+        tmp = f"{final}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_make_json_safe(result), f)
+        os.replace(tmp, final)
+        self.release(task_id)
+
+    def release(self, task_id):
+        try:
+            os.remove(self._path("leases", task_id, ".lock"))
+        except FileNotFoundError:
+            pass
+
+
+# --------------------------------------------------------
+# Shard processing (data + insight stages on one campaign slice)
+# --------------------------------------------------------
+def process_shard(task):
+    """
+    Stream the data in chunks keeping only this shard's campaigns (and
+    skipping campaign-partitioned files of other shards), then run the
+    per-campaign stages. Returns partial sufficient statistics (daily and per-campaign
+    sums) plus the shard's candidates, decisions and creatives. The
+    account-level ROAS/spend hypothesis is left to the coordinator, which
+    sees the merged daily totals, and so are peer outliers and the budget
+    allocation, computed from the shards' campaign x date sums, and
+    creative fatigue, from creative x campaign x date sums.
+    """
+    from src.agents.data_agent import DataAgent
+    from src.agents.metric_store import MetricStore
+    from src.agents.insight_agent import InsightAgent
+    from src.agents.evaluator import EvaluatorAgent
+    from src.agents.creative_generator import CreativeGenerator
+    from src.agents import budget_optimizer, peer_outliers
+
+    # shared side effects (metric store, sketches) stay with the coordinator
+    # so are creative fatigue curves: a message can run in campaigns of several shards
+    config = dict(task["config"], metric_store_dir=None, aggregation_mode="exact", creative_fatigue=False)
+    fatigue = bool(task["config"].get("creative_fatigue", False))
+    rng = set_seeds(int(config.get("random_seed", 42)) + int(task["shard"]))
+
+    data_agent = DataAgent(config["data_csv"], config=config)
+    df = data_agent.load_campaigns(task["campaigns"])
+
+    metrics = list(MetricStore.METRICS)
+    daily = df.groupby("date")[metrics].sum().reset_index()
+    campaigns = df.groupby("campaign_name")[metrics].sum().reset_index()
+
+    # campaign x date sums let the coordinator run the cross-campaign stages
+    # (peer outliers, budget allocation)
+    cell_columns = set(peer_outliers.input_columns(config.get("peer_outlier_metrics", peer_outliers.PEER_METRICS)))
+    if config.get("budget_optimizer", True):
+        cell_columns.update(budget_optimizer.INPUT_COLUMNS)
+    cells = df.groupby(["campaign_name", "date"])[sorted(cell_columns)].sum().reset_index() if cell_columns else None
+    fatigue_cells = (
+        df.groupby(["creative_message", "campaign_name", "date"])[["clicks", "impressions"]].sum().reset_index()
+        if fatigue else None
+    )
+
+    candidates = InsightAgent(df, config).candidate_batch(account_level=False)
+    validated = EvaluatorAgent(df, config, rng=rng).validate(candidates)
+
+    low_ctr_campaigns = [
+        h["campaign"]
+        for h in validated
+        if h["valid"] and h["campaign"] is not None and "ctr" in h["hypothesis"].lower()
+    ]
+    creatives = CreativeGenerator(df, config=config).generate_for_campaigns(low_ctr_campaigns)
+
+    return _make_json_safe({
+        "shard": task["shard"],
+        "rows": len(df),
+        "daily": daily.to_dict(orient="records"),
+        "campaigns": campaigns.to_dict(orient="records"),
+        "cells": cells.to_dict(orient="records") if cells is not None else [],
+        "fatigue_cells": fatigue_cells.to_dict(orient="records") if fatigue_cells is not None else [],
+        "schema": data_agent.df.dtypes.astype(str).to_dict(),
+        "candidates": candidates,
+        "validated": validated,
+        "creatives": creatives,
+    })
+
+
+def _run_dirs(root):
+    """`root` itself when it is one run's queue, else every run below it."""
+    if os.path.isdir(os.path.join(root, "tasks")):
+        return [root]
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        os.path.join(root, d) for d in os.listdir(root)
+        if os.path.isdir(os.path.join(root, d, "tasks"))
+    )
+
+
+def run_worker(root, worker_id=None, poll=None, lease_sec=600):
+    """
+    Claim and process tasks from every run under `root` (or from the one
+    run queue `root` points at) until none are claimable. With `poll`, keep waiting for new work instead of exiting.
+    Returns the number of tasks completed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+    while True:
+        claimed = None
+        for run_dir in _run_dirs(root):
+            try:
+                queue = FileWorkQueue(run_dir, lease_sec=lease_sec)
+                claimed = queue.claim(worker_id)
+            except FileNotFoundError:
+                continue  # run finished and was cleaned up meanwhile
+            if claimed:
+                break
+
+        if claimed is None:
+            if poll is None:
+                return done
+            time.sleep(poll)
+            continue
+
+        task_id, payload = claimed
+        try:
+            with queue.heartbeat(task_id, worker_id):
+                result = process_shard(payload)
+            queue.complete(task_id, result)
+            done += 1
+        except Exception:
+            queue.release(task_id)
+            raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process sharded analysis tasks from a file-based queue")
+    parser.add_argument("root", help="queue root shared with the coordinator")
+    parser.add_argument("--poll", type=float, default=None, help="keep polling every SEC seconds")
+    parser.add_argument("--lease-sec", type=float, default=600)
+    args = parser.parse_args()
+
+    n = run_worker(args.root, poll=args.poll, lease_sec=args.lease_sec)
+    print(f"[✓] Completed {n} task(s)")
@@ -0,0 +1,93 @@
+import sys
+import os
+import asyncio
+import time
+import yaml
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.orchestrator import run_analysis, run_analysis_async, StepTimeout, _run_step, _gather
+from src.utils import retry
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def _config(tmp_path):
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(data_csv=DATA, stage_cache=False)
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+
+def test_async_matches_sync_and_runs_concurrently(tmp_path):
+    config = _config(tmp_path)
+    expected = run_analysis("Why did ROAS drop?", config)
+
+    async def many():
+        return await asyncio.gather(*(run_analysis_async("Why did ROAS drop?", config) for _ in range(3)))
+
+    for result in asyncio.run(many()):
+        assert result["plan"] == expected["plan"]
+        assert result["candidates"] == expected["candidates"]
+        assert result["validated"] == expected["validated"]
+        assert result["creatives"] == expected["creatives"]
+        assert len(result["summary"]["timeseries"]) == len(expected["summary"]["timeseries"])
+
+
+def test_step_timeout():
+    async def main():
+        t0 = time.time()
+        with pytest.raises(StepTimeout) as err:
+            await _run_step("load", time.sleep, 1.0, timeouts={"load": 0.05})
+        return err.value, time.time() - t0
+
+    err, elapsed = asyncio.run(main())
+    assert err.step == "load" and elapsed < 0.5
+
+
+def test_failed_step_cancels_siblings():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def boom():
+        raise ValueError("bad input")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await _gather(slow(), boom())
+
+    asyncio.run(main())
+    assert cancelled == [True]
+
+
+def test_async_retry_does_not_block_loop():
+    calls, ticks = [], []
+
+    @retry(attempts=3, initial_delay=0.05, backoff=1.0, jitter=0.0)
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("transient")
+        return len(ticks)
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        return await asyncio.gather(flaky(), ticker())
+
+    ticks_during_backoff, _ = asyncio.run(main())
+    assert len(calls) == 3
+    assert ticks_during_backoff >= 5   # ~0.1s of backoff left the loop free
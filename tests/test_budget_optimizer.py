@@ -0,0 +1,86 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.agents import budget_optimizer
+from src.report import ReportWriter
+
+
+def _matrices(n_campaigns=50, n_days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    beta = rng.uniform(100, 2000, n_campaigns)
+    base = rng.uniform(100, 1000, n_campaigns)
+    spend = base[:, None] * rng.uniform(0.5, 1.5, (n_campaigns, n_days))
+    kappa = spend.mean(axis=1)
+    revenue = beta[:, None] * np.log1p(spend / kappa[:, None]) * rng.uniform(0.97, 1.03, spend.shape)
+    spend[0, :55] = np.nan            # too few days to fit
+    revenue[0, :55] = np.nan
+    return beta, spend, revenue
+
+
+def test_fit_recovers_curves():
+    beta, spend, revenue = _matrices()
+    fit_beta, kappa, r2, days = budget_optimizer.fit_log_curves(spend, revenue)
+    # beta and kappa trade off over a narrow spend range; the fitted response must match
+    mean_spend = np.nanmean(spend, axis=1)
+    for q in (0.6, 1.0, 1.4):
+        fitted = budget_optimizer.response(fit_beta, kappa, q * mean_spend)
+        true = budget_optimizer.response(beta, mean_spend, q * mean_spend)
+        np.testing.assert_allclose(fitted[1:], true[1:], rtol=0.02)
+    assert np.median(kappa[1:] / mean_spend[1:]) == 1.0
+    assert days[0] == 5 and (r2[1:] > 0.9).all()
+
+
+def test_fit_recovers_curvature():
+    rng = np.random.default_rng(3)
+    n_campaigns, n_days = 40, 90
+    base = rng.uniform(100, 1000, n_campaigns)
+    spend = base[:, None] * rng.uniform(0.1, 3.0, (n_campaigns, n_days))
+    multiple = np.geomspace(0.1, 5.0, n_campaigns)      # true kappa / mean spend
+    kappa = spend.mean(axis=1) * multiple
+    revenue = 500 * np.log1p(spend / kappa[:, None]) * rng.uniform(0.99, 1.01, spend.shape)
+
+    fit_beta, fit_kappa, r2, _ = budget_optimizer.fit_log_curves(spend, revenue)
+    # within one step of the kappa grid
+    step = budget_optimizer.KAPPA_GRID[1] / budget_optimizer.KAPPA_GRID[0]
+    ratio = fit_kappa / kappa
+    assert ((ratio > 1 / step ** 1.5) & (ratio < step ** 1.5)).all()
+    assert (r2 > 0.99).all()
+
+
+def test_allocation_equalises_marginal_roas_within_budget():
+    beta, spend, revenue = _matrices()
+    campaigns = [f"c{i}" for i in range(len(beta))]
+    result = budget_optimizer.optimize(campaigns, {"spend": spend, "revenue": revenue}, max_change=0.5)
+    rows = result["allocations"]
+
+    assert result["campaigns_optimized"] == len(beta) - 1
+    assert not rows[0]["optimized"] and rows[0]["recommended_daily_spend"] == rows[0]["current_daily_spend"]
+    total = sum(r["recommended_daily_spend"] for r in rows)
+    assert total == pytest.approx(result["total_daily_budget"], rel=1e-9)
+    assert result["expected_daily_revenue"]["recommended"] > result["expected_daily_revenue"]["current"]
+
+    free, clamped_low, clamped_high = [], [], []
+    for r in rows[1:]:
+        ratio = r["recommended_daily_spend"] / r["current_daily_spend"]
+        (clamped_low if ratio <= 0.5 + 1e-9 else clamped_high if ratio >= 1.5 - 1e-9 else free).append(r)
+    lam = np.median([r["marginal_roas"] for r in free])
+    assert all(r["marginal_roas"] == pytest.approx(lam, rel=1e-6) for r in free)
+    # clamped campaigns would have moved further if they could
+    assert all(r["marginal_roas"] <= lam + 1e-9 for r in clamped_low)
+    assert all(r["marginal_roas"] >= lam - 1e-9 for r in clamped_high)
+
+
+def test_report_lists_largest_moves(tmp_path):
+    beta, spend, revenue = _matrices()
+    result = budget_optimizer.optimize([f"c|{i}" for i in range(len(beta))], {"spend": spend, "revenue": revenue})
+    md = tmp_path / "report.md"
+    with ReportWriter(str(md)) as report:
+        report.budget_section(result, rows=3)
+    text = md.read_text(encoding="utf-8")
+    assert "## Budget Recommendations" in text
+    assert text.count("| c\\|") == 3
@@ -0,0 +1,83 @@
+import sys
+import os
+import gzip
+import io
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.data_agent import DataAgent
+from agents.sources import gzip_members, open_source, write_block_gzip
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def _raw():
+    with open(DATA, "rb") as f:
+        return f.read()
+
+
+def test_gzip_input_matches_plain(tmp_path):
+    p = tmp_path / "ads.csv.gz"
+    with gzip.open(p, "wb") as f:
+        f.write(_raw())
+
+    pd.testing.assert_frame_equal(DataAgent(str(p)).load(), DataAgent(DATA).load())
+
+
+def test_block_gzip_inflates_in_parallel(tmp_path):
+    p = tmp_path / "ads.csv.gz"
+    write_block_gzip(str(p), _raw(), block_size=4096)
+
+    members = gzip_members(str(p))
+    assert members is not None and len(members) > 10
+    with open_source(str(p), workers=4) as fh:
+        assert fh.read() == _raw()
+
+    agent = DataAgent(str(p), config={"decompress_workers": 4, "aggregation_mode": "approx", "approx_chunksize": 1000})
+    df = agent.load()
+    pd.testing.assert_frame_equal(df, DataAgent(DATA).load())
+    assert agent.summary()["levels"]["campaign_name"]["distinct"] > 0
+
+
+def test_zstd_input(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    p = tmp_path / "ads.csv.zst"
+    p.write_bytes(zstandard.ZstdCompressor().compress(_raw()))
+
+    pd.testing.assert_frame_equal(DataAgent(str(p)).load(), DataAgent(DATA).load())
+
+
+def test_compressed_shards_in_directory(tmp_path):
+    df = pd.read_csv(DATA)
+    for i, part in enumerate((df.iloc[:2000], df.iloc[2000:])):
+        with gzip.open(tmp_path / f"part-{i}.csv.gz", "wt", encoding="utf-8") as f:
+            part.to_csv(f, index=False)
+
+    assert len(DataAgent(str(tmp_path)).load()) == len(df)
+
+
+def test_zstd_chunked_load_resumes(tmp_path, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+    from agents import sources
+    from test_resumable_load import FlakyFile, ListLogger
+    from src.utils import retry
+
+    p = tmp_path / "ads.csv.zst"
+    p.write_bytes(zstandard.ZstdCompressor().compress(_raw()))
+    expected = DataAgent(DATA).load()
+    pd.testing.assert_frame_equal(DataAgent(str(p), config={"load_chunksize": 500}).load(), expected)
+
+    # the compressed stream drops once, on its last read; the retry resumes after the last good chunk
+    state = {"fail_at": int(p.stat().st_size * 0.9), "failed": False, "bytes_read": 0}
+    monkeypatch.setattr(sources, "open", lambda path, mode="rb": io.BufferedReader(FlakyFile(path, state)),
+                        raising=False)
+    logger = ListLogger()
+    agent = DataAgent(str(p), logger=logger, config={"load_chunksize": 500})
+    df = retry(attempts=2, initial_delay=0.0, jitter=0.0)(agent.load)()
+
+    pd.testing.assert_frame_equal(df, expected)
+    assert state["failed"]
+    assert [e for e in logger.events if e.get("event") == "load_resumed"]
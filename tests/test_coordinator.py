@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+import yaml
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.orchestrator import run_analysis
+from src.work_queue import FileWorkQueue
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def _config(tmp_path, **overrides):
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(data_csv=DATA, work_queue_dir=str(tmp_path / "queue"), stage_cache=False, **overrides)
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+
+def _assert_same(a, b):
+    assert [h["id"] for h in a["candidates"]] == [h["id"] for h in b["candidates"]]
+    assert [(v["id"], v["valid"]) for v in a["validated"]] == [(v["id"], v["valid"]) for v in b["validated"]]
+    for v, w in zip(a["validated"], b["validated"]):
+        assert v["confidence"] == pytest.approx(w["confidence"])
+    for key in ("timeseries", "campaign_summary"):
+        assert len(a["summary"][key]) == len(b["summary"][key])
+        for ra, rb in zip(a["summary"][key], b["summary"][key]):
+            for k, v in ra.items():
+                assert v == (pytest.approx(rb[k]) if isinstance(v, float) else rb[k])
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_coordinator_matches_local_run(tmp_path, workers):
+    config = _config(tmp_path, coordinator_shards=3, coordinator_workers=workers)
+    local = run_analysis("Why did ROAS drop?", config, mode="local")
+    sharded = run_analysis("Why did ROAS drop?", config, mode="coordinator")
+
+    _assert_same(sharded, local)
+    assert set(sharded["creatives"]) == set(local["creatives"])
+    # the run's queue directory is cleaned up afterwards
+    assert os.listdir(tmp_path / "queue") == []
+
+
+def test_coordinator_is_deterministic_across_shard_layouts(tmp_path):
+    a = run_analysis("q", _config(tmp_path, coordinator_shards=2, coordinator_workers=0), mode="coordinator")
+    b = run_analysis("q", _config(tmp_path, coordinator_shards=5, coordinator_workers=0), mode="coordinator")
+    _assert_same(a, b)
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = FileWorkQueue(str(tmp_path / "run"), lease_sec=0.2, create=True)
+    queue.put("shard-00000", {"shard": 0})
+
+    task_id, payload = queue.claim("w1")
+    assert payload == {"shard": 0}
+    assert queue.claim("w2") is None  # lease still held by w1
+
+    time.sleep(0.3)                   # w1 "crashed"; its lease runs out
+    assert queue.claim("w2")[0] == task_id
+
+    queue.complete(task_id, {"rows": 1})
+    assert queue.pending() == []
+    assert queue.results() == {task_id: {"rows": 1}}
+    assert queue.claim("w3") is None
+
+
+def test_heartbeat_keeps_a_long_task_leased(tmp_path):
+    queue = FileWorkQueue(str(tmp_path / "run"), lease_sec=0.3, create=True)
+    queue.put("shard-00000", {"shard": 0})
+
+    task_id, _ = queue.claim("w1")
+    with queue.heartbeat(task_id, "w1"):
+        time.sleep(0.8)               # well past the original expiry
+        assert queue.claim("w2") is None
+    assert not queue.renew(task_id, "w2")
+
+    time.sleep(0.4)                   # no more heartbeats; the lease runs out
+    assert queue.claim("w2")[0] == task_id
+    assert not queue.renew(task_id, "w1")
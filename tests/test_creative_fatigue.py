@@ -0,0 +1,83 @@
+import sys
+import os
+import random
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.agents import creative_fatigue
+from src.agents.creative_generator import CreativeGenerator
+
+
+def _frame(n_days=40, seed=0):
+    """'Worn Out' loses 8% CTR a day from day 10; 'Evergreen' and 'Steady' hold their CTR."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-01")
+    rows = []
+    for campaign, message, first_day, decay in [
+        ("Tired", "Worn Out", 10, 0.08),
+        ("Healthy", "Evergreen", 0, 0.0),
+        ("Healthy", "Steady", 5, 0.0),
+    ]:
+        for d in range(first_day, n_days):
+            impressions = 20000.0
+            ctr = 0.03 * np.exp(-decay * (d - first_day)) * rng.uniform(0.95, 1.05)
+            rows.append({
+                "campaign_name": campaign, "date": start + pd.Timedelta(days=d),
+                "creative_message": message, "impressions": impressions, "clicks": round(impressions * ctr),
+                "spend": 100.0, "revenue": 300.0, "purchases": 10.0,
+            })
+    # the worn-out message also ran briefly in another campaign: its age counts from its first day anywhere
+    rows.append(dict(rows[0], campaign_name="Healthy", date=start + pd.Timedelta(days=12), impressions=100.0, clicks=3.0))
+    return pd.DataFrame(rows)
+
+
+def test_exposure_age_counts_from_first_day_anywhere():
+    df = _frame()
+    creative, age, clicks, impressions, creatives, campaigns = creative_fatigue.exposure_days(df)
+    worn = creatives.index("Worn Out")
+    assert campaigns[worn] == "Tired"
+    assert age[creative == worn].tolist() == list(range(30))
+    assert impressions[creative == worn][2] == 20100.0
+
+
+def test_batched_fit_matches_per_group_polyfit():
+    rng = np.random.default_rng(1)
+    group = np.repeat(np.arange(50), 20)
+    x = np.tile(np.arange(20.0), 50)
+    y = rng.normal(size=len(x)) - 0.1 * x
+    w = rng.uniform(1, 10, len(x))
+    intercept, decay, se, n = creative_fatigue.fit_decay(group, x, y, w, 50)
+    for g in range(0, 50, 7):
+        sel = group == g
+        slope, a = np.polyfit(x[sel], y[sel], 1, w=np.sqrt(w[sel]))
+        assert decay[g] == pytest.approx(-slope) and intercept[g] == pytest.approx(a)
+    assert (n == 20).all() and (se > 0).all()
+
+
+def test_flags_only_creatives_past_half_life():
+    curves = creative_fatigue.detect(_frame()).set_index("creative_message")
+    assert curves.loc["Worn Out", "decay_per_day"] == pytest.approx(0.08, abs=0.01)
+    assert curves.loc["Worn Out", "half_life_days"] == pytest.approx(np.log(2) / 0.08, rel=0.15)
+    assert curves["fatigued"].to_dict() == {"Worn Out": True, "Evergreen": False, "Steady": False}
+
+    # too young to be past its half-life
+    young = _frame(n_days=15)
+    assert not creative_fatigue.detect(young, min_days=3)["fatigued"].any()
+
+
+def test_generator_targets_fatigued_creatives():
+    df = _frame()
+    config = {"creative_fatigue": True, "creative_phrase_source": "frequency"}
+    out = CreativeGenerator(df, rng=random.Random(0), config=config).generate_for_campaigns(["Healthy"])
+
+    assert list(out) == ["Healthy", "Tired"]
+    worn = out["Tired"]["fatigued_creatives"]
+    assert [w["creative"] for w in worn] == ["Worn Out"] and worn[0]["ctr_now"] < worn[0]["ctr_start"]
+    assert "fatigued_creatives" not in out["Healthy"]
+
+    plain = CreativeGenerator(df, rng=random.Random(0), config={}).generate_for_campaigns(["Healthy"])
+    assert list(plain) == ["Healthy"]
@@ -0,0 +1,61 @@
+import sys
+import os
+import random
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.creative_variants import VariantEngine, tokenize
+from agents.creative_generator import CreativeGenerator
+
+
+def _df():
+    # "cooling mesh" messages convert far better than "basic cotton" ones
+    rows = []
+    for day in range(5):
+        rows += [
+            ("Winner", "Cooling mesh panels for workouts", 1000, 40),
+            ("Winner", "Cooling mesh boxers for summer", 1000, 35),
+            ("Loser", "Basic cotton briefs for everyday", 1000, 5),
+            ("Loser", "Basic cotton boxers value pack", 1000, 6),
+        ]
+    return pd.DataFrame(rows, columns=["campaign_name", "creative_message", "impressions", "clicks"])
+
+
+def test_lift_model_prefers_high_ctr_terms():
+    engine = VariantEngine(_df())
+    lift = dict(zip(engine.words, engine.unigram_lift))
+    assert lift["cooling"] > 0 > lift["basic"]
+    assert tokenize("No ride-up, ever!") == ["ride-up", "ever"]
+
+    ids = np.array([[engine.vocab[w] for w in ("cooling", "mesh", "panels")],
+                    [engine.vocab[w] for w in ("basic", "cotton", "briefs")]])
+    good, bad = engine.score(ids)
+    assert good > bad
+
+
+def test_top_variants_are_distinct_and_ranked():
+    engine = VariantEngine(_df())
+    top, considered = engine.top_variants("Loser", n=2000, k=10, rng=np.random.default_rng(1))
+
+    assert len(top) == 10 and considered >= 10
+    scores = [v["score"] for v in top]
+    assert scores == sorted(scores, reverse=True)
+    # deduplication is order-insensitive: no two variants share a token set
+    headlines = [frozenset(v["text"].split(".")[0].lower().split()) for v in top]
+    assert len(set(headlines)) == len(headlines)
+    # the loser campaign borrows vocabulary from the high-CTR campaign
+    assert any("cooling" in h or "mesh" in h for h in headlines)
+
+
+def test_ranked_mode_is_deterministic():
+    config = {"creative_mode": "ranked", "creative_variants": 300}
+    a = CreativeGenerator(_df(), rng=random.Random(7), config=config).generate_for_campaigns(["Loser", "Missing"])
+    b = CreativeGenerator(_df(), rng=random.Random(7), config=config).generate_for_campaigns(["Loser", "Missing"])
+
+    assert a == b
+    assert len(a["Loser"]["suggestions"]) == 5
+    assert a["Loser"]["variants_considered"] >= 5
+    assert a["Missing"]["source_examples"] == []   # unknown campaign keeps the fallback
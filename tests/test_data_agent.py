@@ -71,3 +71,49 @@ def test_date_parsing_issue(tmp_path):
     agent = DataAgent(str(p))
     with pytest.raises(SchemaError):
         agent.load()
+
+
+def _row(**over):
+    row = {
+        "campaign_name": "A", "adset_name": "a", "date": "2025-01-01",
+        "spend": 10, "impressions": 100, "clicks": 1, "ctr": 0.01,
+        "purchases": 1, "revenue": 100, "roas": 10,
+        "creative_type": "img", "creative_message": "x",
+        "audience_type": "broad", "platform": "fb", "country": "IN",
+    }
+    row.update(over)
+    return row
+
+
+def test_data_quality_profile(tmp_path):
+    p = tmp_path / "profile.csv"
+    pd.DataFrame([
+        _row(spend="abc"),
+        _row(spend="inf", date="2025-01-03"),
+        _row(spend=5, date="not a date"),
+        _row(spend=None, date="2025-01-02"),
+    ]).to_csv(p, index=False)
+
+    agent = DataAgent(str(p))
+    df = agent.load()
+    spend = agent.profile.to_dict()["columns"]["spend"]
+
+    assert spend["parse_failures"] == 1
+    assert spend["infs"] == 1
+    assert spend["null_ratio"] == 0.25
+    assert spend["min"] == spend["max"] == 5
+    assert agent.profile.columns["date"]["parse_failures"] == 1
+    assert df["spend"].tolist() == [0.0, 0.0, 5.0, 0.0]
+
+
+def test_sample_validation_fails_fast(tmp_path):
+    p = tmp_path / "head_bad.csv"
+    pd.DataFrame([_row(date="bad")] * 5 + [_row()] * 20).to_csv(p, index=False)
+
+    # the full frame passes (dates mostly valid) ...
+    DataAgent(str(p)).load()
+
+    # ... but a sample-only check sees nothing but bad dates in the head
+    agent = DataAgent(str(p), config={"validation_mode": "sample", "validation_sample_rows": 5})
+    with pytest.raises(SchemaError):
+        agent.load()
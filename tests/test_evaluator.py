@@ -39,3 +39,50 @@ def test_evaluator_confidence_scoring():
 
     assert result["confidence"] > 0.5
     assert result["valid"] is True
+
+
+def _ctr_frame():
+    return pd.DataFrame({
+        "date": list(pd.date_range("2025-01-01", periods=8)) * 2,
+        "spend": [100, 120, 150, 200, 250, 300, 350, 400] * 2,
+        "revenue": [200, 190, 170, 160, 140, 130, 120, 100] * 2,
+        "ctr": [0.030, 0.028, 0.025, 0.022, 0.020, 0.017, 0.015, 0.012]
+               + [0.010, 0.012, 0.011, 0.013, 0.012, 0.014, 0.013, 0.015],
+        "campaign_name": ["Falling"] * 8 + ["Rising"] * 8,
+    })
+
+
+def _ctr_candidates():
+    return [
+        {"id": f"ctr_drop_{c}", "hypothesis": "CTR is falling", "campaign": c,
+         "metric": "ctr", "evidence": {"trend": -0.02, "mean": 0.01}}
+        for c in ("Falling", "Rising")
+    ] + [{
+        "id": "roas_spend_negative",
+        "hypothesis": "ROAS falling when spend increases",
+        "metric": "roas_vs_spend",
+        "value": -0.5,
+        "evidence": {"correlation": -0.5}
+    }]
+
+
+def test_evaluator_bootstrap_confidence():
+    config = {"confidence_min": 0.6, "confidence_mode": "bootstrap", "bootstrap_samples": 500}
+    results = {r["id"]: r for r in EvaluatorAgent(_ctr_frame(), config).validate(_ctr_candidates())}
+
+    falling = results["ctr_drop_Falling"]
+    assert falling["valid"] is True
+    assert falling["ci"]["high"] < 0
+    assert falling["ci"]["samples"] > 0
+
+    # heuristic scoring would accept this one; the resampled slopes do not
+    assert results["ctr_drop_Rising"]["valid"] is False
+    assert results["roas_spend_negative"]["ci"]["support"] > 0.9
+
+
+def test_evaluator_bootstrap_deterministic_with_pool():
+    base = {"confidence_mode": "bootstrap", "bootstrap_samples": 200, "random_seed": 7}
+    serial = EvaluatorAgent(_ctr_frame(), base).validate(_ctr_candidates())
+    pooled = EvaluatorAgent(_ctr_frame(), {**base, "bootstrap_workers": 2}).validate(_ctr_candidates())
+
+    assert [r["ci"] for r in serial] == [r["ci"] for r in pooled]
@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.data_agent import DataAgent
+from agents.insight_agent import InsightAgent
+from agents.evaluator import EvaluatorAgent
+from agents.hypotheses import HypothesisBatch
+from utils import _make_json_safe
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+@pytest.fixture(scope="module")
+def df():
+    # real data plus a campaign with steeply falling CTR and rising spend
+    real = DataAgent(DATA).load()
+    days = pd.date_range(real["date"].min(), periods=10)
+    ctr = pd.Series(range(10, 0, -1), dtype=float) / 50
+    falling = pd.DataFrame({
+        "campaign_name": "Falling", "date": days, "impressions": 1000.0, "clicks": ctr * 1000,
+        "ctr": ctr, "spend": pd.Series(range(1, 11), dtype=float) * 1e5, "revenue": 1.0,
+        "creative_message": "Falling",
+    })
+    return pd.concat([real, falling], ignore_index=True)
+
+
+@pytest.mark.parametrize("mode", ["heuristic", "bootstrap"])
+def test_batch_matches_dict_pipeline(df, mode):
+    config = {"confidence_mode": mode, "bootstrap_samples": 200}
+    batch = InsightAgent(df).candidate_batch()
+    dicts = InsightAgent(df).generate_candidates()
+
+    assert isinstance(batch, HypothesisBatch)
+    assert batch.to_dicts() == dicts
+    assert {h["metric"] for h in dicts} >= {"ctr", "roas_vs_spend", "frequency"}
+
+    scored = EvaluatorAgent(df, config).validate(batch)
+    expected = EvaluatorAgent(df, config).validate(dicts)
+    assert isinstance(scored, HypothesisBatch)
+    assert [(v["id"], v["valid"], v.get("ci")) for v in scored] == \
+        [(v["id"], v["valid"], v.get("ci")) for v in expected]
+    assert [v["confidence"] for v in scored] == pytest.approx([v["confidence"] for v in expected])
+    assert [v["raw_evidence"] for v in scored] == [v["raw_evidence"] for v in expected]
+
+
+def test_templates_are_shared_and_json_round_trips(df):
+    batch = InsightAgent(df).candidate_batch()
+    i = [k for k, h in enumerate(batch) if h["metric"] == "frequency"][0]
+    a, b = batch[i], batch[i + 1]
+    assert a["hypothesis"] is b["hypothesis"]
+
+    pair = batch[i:i + 2]
+    assert isinstance(pair, HypothesisBatch) and pair.to_dicts() == [a, b]
+
+    scored = EvaluatorAgent(df, {}).validate(batch)
+    for value in (batch, scored):
+        loaded = json.loads(json.dumps(_make_json_safe(value)))
+        assert HypothesisBatch.from_dicts(loaded) == value
+
+    with pytest.raises(ValueError):
+        HypothesisBatch.from_dicts([{"id": "unknown", "campaign": None}])
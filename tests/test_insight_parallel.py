@@ -0,0 +1,46 @@
+import sys
+import os
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.insight_agent import InsightAgent
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def test_parallel_matches_serial():
+    df = pd.read_csv(DATA, parse_dates=["date"])
+
+    serial = InsightAgent(df)
+    trends = serial._metric_trend("ctr")
+    freqs = serial._frequency_check()
+
+    parallel = InsightAgent(df, {"insight_workers": 3, "parallel_min_rows": 0})
+    p_trends, p_freqs = parallel._parallel_campaign_stats()
+
+    assert [t["campaign"] for t in p_trends] == [t["campaign"] for t in trends]
+    for a, b in zip(p_trends, trends):
+        assert a["n"] == b["n"]
+        assert a["trend"] == pytest.approx(b["trend"], abs=1e-12)
+        assert a["mean"] == pytest.approx(b["mean"])
+    assert len(p_freqs) == len(freqs)
+    for a, b in zip(p_freqs, freqs):
+        assert a["campaign"] == b["campaign"]
+        assert a["frequency"] == pytest.approx(b["frequency"])
+        assert a["ctr"] == pytest.approx(b["ctr"])
+
+    assert [c["id"] for c in parallel.generate_candidates()] == [c["id"] for c in serial.generate_candidates()]
+
+
+def test_small_input_falls_back_to_serial(monkeypatch):
+    df = pd.read_csv(os.path.join(ROOT, "data", "sample_fb_ads.csv"), parse_dates=["date"])
+    agent = InsightAgent(df, {"insight_workers": 4, "parallel_min_rows": 1000})
+
+    def boom():
+        raise AssertionError("parallel path used for a small frame")
+
+    monkeypatch.setattr(agent, "_parallel_campaign_stats", boom)
+    assert isinstance(agent.generate_candidates(), list)
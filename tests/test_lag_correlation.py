@@ -0,0 +1,70 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.agents import lag_correlation
+from src.agents.evaluator import EvaluatorAgent
+from src.agents.insight_agent import InsightAgent
+
+
+def _direct(x, y, max_lag):
+    out = np.zeros((len(x), max_lag + 1))
+    for c in range(len(x)):
+        ok_x, ok_y = ~np.isnan(x[c]), ~np.isnan(y[c])
+        a = np.where(ok_x, x[c] - np.nanmean(x[c]), 0.0)
+        b = np.where(ok_y, y[c] - np.nanmean(y[c]), 0.0)
+        for lag in range(max_lag + 1):
+            out[c, lag] = (a[:len(a) - lag] * b[lag:]).sum() / np.sqrt((a * a).sum() * (b * b).sum())
+    return out
+
+
+def test_fft_matches_direct_sum():
+    rng = np.random.default_rng(0)
+    x, y = rng.random((5, 40)), rng.random((5, 40))
+    x[rng.random(x.shape) < 0.1] = np.nan
+    np.testing.assert_allclose(lag_correlation.cross_correlation(x, y, 6), _direct(x, y, 6), atol=1e-12)
+
+
+def _frame(n_days=60, seed=0):
+    """'Delayed' converts 3 days after spending, 'Instant' the same day, the rest at random."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name in ["Delayed", "Instant", "Noise A", "Noise B"]:
+        spend = rng.uniform(50, 500, n_days)
+        if name == "Delayed":
+            revenue = 3 * np.roll(spend, 3) + rng.normal(0, 20, n_days)
+        elif name == "Instant":
+            revenue = 3 * spend + rng.normal(0, 20, n_days)
+        else:
+            revenue = rng.uniform(150, 1500, n_days)
+        for d in range(n_days):
+            rows.append({
+                "campaign_name": name, "date": pd.Timestamp("2025-01-01") + pd.Timedelta(days=d),
+                "spend": spend[d], "revenue": revenue[d], "purchases": revenue[d] / 30,
+                "impressions": 10000.0, "clicks": 200.0, "ctr": 0.02,
+            })
+    return pd.DataFrame(rows)
+
+
+def test_detects_delayed_response_only():
+    df = _frame()
+    batch = InsightAgent(df, {"peer_outlier_metrics": []}).candidate_batch()
+    lagged = [h for h in batch if h["metric"].endswith("_lag")]
+
+    assert [h["id"] for h in lagged] == ["revenue_lags_spend_Delayed", "purchases_lag_spend_Delayed"]
+    evidence = lagged[0]["evidence"]
+    assert evidence["lag"] == 3 and evidence["correlation"] > 0.8
+    assert lagged[0]["hypothesis"].startswith("Revenue lags spend by 3 day(s)")
+
+    validated = EvaluatorAgent(df, {}).validate(batch)
+    assert all(v["valid"] for v in validated if v["id"].endswith("_Delayed"))
+    assert EvaluatorAgent(df, {}).validate(batch.to_dicts()) == validated.to_dicts()
+
+
+def test_disabled_by_empty_target_list():
+    batch = InsightAgent(_frame(), {"lag_targets": [], "peer_outlier_metrics": []}).candidate_batch()
+    assert not any(h["metric"].endswith("_lag") for h in batch)
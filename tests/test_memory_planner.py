@@ -0,0 +1,112 @@
+import sys
+import os
+import gzip
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.data_agent import DataAgent
+from agents.evaluator import EvaluatorAgent
+from agents.insight_agent import InsightAgent
+from agents import memory_planner
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def test_strategy_ladder_picks_cheapest_fit():
+    peak = {"in_memory": 100.0, "downcast": 60.0, "chunked": 30.0}
+    assert memory_planner.choose_strategy(peak, 500) == "in_memory"
+    assert memory_planner.choose_strategy(peak, 80) == "downcast"
+    assert memory_planner.choose_strategy(peak, 30) == "chunked"
+    # nothing fits: the smallest estimate, flagged by fits_budget
+    assert memory_planner.choose_strategy(peak, 10) == "chunked"
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_estimate_tracks_the_real_frame(tmp_path, compressed):
+    path = DATA
+    if compressed:
+        path = str(tmp_path / "data.csv.gz")
+        with open(DATA, "rb") as src, gzip.open(path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+
+    estimate = memory_planner.estimate_footprint(DataAgent(path), sample_rows=500, chunksize=500)
+    rows = len(pd.read_csv(DATA))
+    assert estimate["rows"] == pytest.approx(rows, rel=0.2)
+    assert estimate["dtypes"]["spend"] == "float64"
+
+    bpr = estimate["bytes_per_row"]
+    assert bpr["compact"] < bpr["clean"]
+    peak = estimate["peak_mb"]
+    assert peak["chunked"] < peak["downcast"] < peak["in_memory"]
+
+
+@pytest.mark.filterwarnings("ignore:estimated peak:RuntimeWarning")
+def test_plans_load_the_same_data(tmp_path):
+    baseline = DataAgent(DATA)
+    df = baseline.load()
+    expected = baseline.summary()
+
+    for budget, strategy in [(1e6, "in_memory"), (1e-3, "chunked")]:
+        agent = DataAgent(DATA)
+        plan = memory_planner.plan_execution(agent, budget, chunksize=1000)
+        assert plan.strategy == strategy
+        plan.apply(agent)
+
+        loaded, peak_mb = memory_planner.measure_peak(agent.load)
+        record = plan.to_dict(actual_peak_mb=peak_mb)
+        assert record["actual_peak_mb"] > 0 and record["estimate_ratio"] > 0
+        assert len(loaded) == len(df)
+
+        summary = agent.summary()
+        for a, b in zip(summary["campaign_summary"], expected["campaign_summary"]):
+            assert a["campaign_name"] == b["campaign_name"]
+            assert a["spend"] == pytest.approx(b["spend"], rel=1e-5)
+
+    # the streamed, compact frame still feeds the analysis stages
+    assert plan.overrides["load_chunksize"] == 1000
+    assert loaded["spend"].dtype == np.float32 and loaded["platform"].dtype == "category"
+    config = {"confidence_mode": "heuristic"}
+    candidates = InsightAgent(loaded, config).candidate_batch()
+    validated = EvaluatorAgent(loaded, config).validate(candidates)
+    assert len(validated) == len(candidates)
+
+
+def test_chunked_load_matches_single_read():
+    whole = DataAgent(DATA)
+    chunked = DataAgent(DATA, config={"load_chunksize": 700})
+    pd.testing.assert_frame_equal(chunked.load(), whole.load())
+    assert chunked.profile.rows == whole.profile.rows
+    assert chunked.profile.null_ratios() == whole.profile.null_ratios()
+
+
+def test_over_budget_plan_warns_or_fails_fast():
+    with pytest.warns(RuntimeWarning, match="exceeds max_memory_mb"):
+        plan = memory_planner.plan_execution(DataAgent(DATA), 1e-3)
+    assert plan.estimated_peak_mb == min(plan.estimate["peak_mb"].values()) and not plan.fits_budget
+    assert plan.to_dict()["fits_budget"] is False
+
+    with pytest.raises(memory_planner.MemoryBudgetError):
+        memory_planner.plan_execution(DataAgent(DATA), 1e-3, strict=True)
+
+
+def test_chunked_plan_streams_every_shard(tmp_path):
+    full = pd.read_csv(DATA)
+    for i, part in enumerate(np.array_split(np.arange(len(full)), 3)):
+        full.iloc[part].to_csv(tmp_path / f"part-{i}.csv", index=False)
+
+    agent = DataAgent(str(tmp_path))
+    with pytest.warns(RuntimeWarning):
+        plan = memory_planner.plan_execution(agent, 1e-3, chunksize=300)
+    assert plan.strategy == "chunked" and plan.overrides["load_chunksize"] == 300
+
+    chunked = plan.apply(agent).load()
+    whole = DataAgent(str(tmp_path))
+    pd.testing.assert_frame_equal(chunked, whole.load(), check_dtype=False, check_categorical=False, rtol=1e-5)
+    assert agent._partials is not None and len(agent._partials) > 3
+    for a, b in zip(agent.summary()["campaign_summary"], whole.summary()["campaign_summary"]):
+        assert a["spend"] == pytest.approx(b["spend"], rel=1e-5)
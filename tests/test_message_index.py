@@ -0,0 +1,80 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.message_index import MessageIndex
+from agents.creative_generator import CreativeGenerator
+
+
+def _df():
+    rows = []
+    for _ in range(4):
+        rows += [
+            ("Men Winner", "Cooling mesh boxers for men", 1000, 40),
+            ("Men Loser", "Plain cotton boxers for men", 1000, 4),
+            ("Women Winner", "Seamless lace bralette for women", 1000, 30),
+            ("Women Loser", "Basic cotton bralette for women", 1000, 3),
+        ]
+    return pd.DataFrame(rows, columns=["campaign_name", "creative_message", "impressions", "clicks"])
+
+
+def test_sparse_lift_matches_dense_computation():
+    index = MessageIndex.build(_df(), prior_impressions=500)
+    X = index.X.toarray()
+    term_ctr = (X.T @ index.clicks + 500 * index.base_ctr) / (X.T @ index.impressions + 500)
+    np.testing.assert_allclose(index.lift, np.log(term_ctr / index.base_ctr))
+
+
+def test_phrases_are_high_lift_and_on_topic():
+    index = MessageIndex.build(_df())
+    men = index.top_phrases("Men Loser")
+    women = index.top_phrases("Women Loser")
+
+    # the losing campaign is steered to the winning men's language, not its own
+    assert "cooling" in " ".join(men) and "plain" not in " ".join(men)
+    assert "seamless" in " ".join(women) and "cooling" not in " ".join(women)
+    assert index.top_phrases("Unknown") == []
+
+
+def test_index_is_cached_across_runs(tmp_path, monkeypatch):
+    first = MessageIndex.load_or_build(_df(), cache_dir=str(tmp_path))
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("index should have been loaded from cache")
+
+    monkeypatch.setattr(MessageIndex, "build", classmethod(no_rebuild))
+    second = MessageIndex.load_or_build(_df(), cache_dir=str(tmp_path))
+    assert second.top_phrases("Men Loser") == first.top_phrases("Men Loser")
+
+    # different data, different key
+    changed = _df().assign(clicks=1)
+    with pytest.raises(AssertionError):
+        MessageIndex.load_or_build(changed, cache_dir=str(tmp_path))
+
+
+def test_generator_uses_lift_phrases():
+    out = CreativeGenerator(_df()).generate_for_campaigns(["Men Loser"])
+    text = " ".join(out["Men Loser"]["suggestions"]).lower()
+    assert "plain" not in text
+
+    freq = CreativeGenerator(_df(), config={"creative_phrase_source": "frequency"})
+    text = " ".join(freq.generate_for_campaigns(["Men Loser"])["Men Loser"]["suggestions"]).lower()
+    assert "plain" in text
+
+
+def test_concurrent_saves_use_separate_tmp_files(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    index = MessageIndex.build(_df())
+    path = str(tmp_path / "index.npz")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: index.save(path), range(8)))
+
+    assert [p.name for p in tmp_path.iterdir()] == ["index.npz"]
+    assert MessageIndex.load(path).top_phrases("Men Loser") == index.top_phrases("Men Loser")
@@ -0,0 +1,76 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.data_agent import DataAgent
+from agents.insight_agent import InsightAgent
+from agents.metric_store import MetricStore
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def _records_close(a, b):
+    assert len(a) == len(b)
+    for ra, rb in zip(a, b):
+        assert ra.keys() == rb.keys()
+        for k in ra:
+            if isinstance(ra[k], float):
+                assert ra[k] == pytest.approx(rb[k])
+            else:
+                assert ra[k] == rb[k]
+
+
+def test_store_summary_matches_frame(tmp_path):
+    agent = DataAgent(DATA, config={"metric_store_dir": str(tmp_path / "store")})
+    agent.load()
+    from_store = agent.summary()
+
+    agent.store = None
+    from_frame = agent.summary()
+
+    _records_close(from_store["timeseries"], from_frame["timeseries"])
+    _records_close(from_store["campaign_summary"], from_frame["campaign_summary"])
+
+    # a fresh agent can serve the summary from the store alone
+    reader = DataAgent(None)
+    reader.open_store(str(tmp_path / "store"))
+    _records_close(reader.summary()["timeseries"], from_frame["timeseries"])
+
+
+def test_store_append_in_place(tmp_path):
+    df = pd.read_csv(os.path.join(ROOT, "data", "sample_fb_ads.csv"), parse_dates=["date"])
+    path = str(tmp_path / "store")
+    store = MetricStore.create(path, df, day_capacity=30)
+    size_before = os.path.getsize(os.path.join(path, "spend.f64"))
+
+    new_day = df[df["campaign_name"] == df["campaign_name"].iloc[0]].head(1).copy()
+    new_day["date"] = df["date"].max() + pd.Timedelta(days=1)
+    new_day["spend"] = 99.0
+    store.append(new_day)
+
+    assert os.path.getsize(os.path.join(path, "spend.f64")) == size_before
+    reopened = MetricStore(path)
+    spend = reopened.matrix("spend")
+    assert isinstance(spend, np.memmap)
+    assert spend[reopened.campaign_ids[new_day["campaign_name"].iloc[0]], -1] == 99.0
+
+    with pytest.raises(ValueError):
+        before_start = new_day.copy()
+        before_start["date"] = df["date"].min() - pd.Timedelta(days=1)
+        store.append(before_start)
+
+
+def test_insight_agent_reads_store(tmp_path):
+    agent = DataAgent(DATA, config={"metric_store_dir": str(tmp_path / "store")})
+    df = agent.load()
+
+    with_store = InsightAgent(df, store=agent.store)
+    plain = InsightAgent(df)
+
+    assert with_store._roas_spend_correlation() == pytest.approx(plain._roas_spend_correlation())
+    _records_close(with_store._frequency_check(), plain._frequency_check())
@@ -0,0 +1,86 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.agents import peer_outliers
+from src.agents.evaluator import EvaluatorAgent
+from src.agents.insight_agent import InsightAgent
+from src.orchestrator import run_analysis
+
+
+def _frame(n_campaigns=40, n_days=30, seed=0):
+    """Peers with noise and an account-wide dip on days 10-14; 'Laggard' has low CTR from day 15."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for c in range(n_campaigns):
+        name = "Laggard" if c == 0 else f"Campaign {c:02d}"
+        for d in range(n_days):
+            ctr = 0.02 * rng.uniform(0.9, 1.1)
+            if 10 <= d < 15:
+                ctr *= 0.4                  # market-wide: every campaign dips
+            if name == "Laggard" and d >= 15:
+                ctr *= 0.3
+            impressions = 10000.0
+            spend = 100.0 * rng.uniform(0.9, 1.1)
+            clicks = impressions * ctr
+            rows.append({
+                "campaign_name": name, "adset_name": "a", "date": pd.Timestamp("2025-01-01") + pd.Timedelta(days=d),
+                "spend": spend, "impressions": impressions, "clicks": clicks, "ctr": ctr,
+                "purchases": 1, "revenue": spend * 2 * rng.uniform(0.9, 1.1), "roas": 2.0,
+                "creative_type": "Image", "creative_message": "Soft cotton comfort", "audience_type": "Broad",
+                "platform": "Facebook", "country": "US",
+            })
+    return pd.DataFrame(rows)
+
+
+def test_column_medians_match_numpy():
+    rng = np.random.default_rng(1)
+    M = rng.normal(size=(101, 7))
+    M[rng.random(M.shape) < 0.3] = np.nan
+    M[:, 3] = np.nan
+    with np.errstate(all="ignore"), pytest.warns(RuntimeWarning):
+        expected = np.nanmedian(M, axis=0)
+    np.testing.assert_allclose(peer_outliers.column_medians(M), expected)
+
+
+def test_flags_campaign_specific_drop_not_market_dip():
+    batch = InsightAgent(_frame()).candidate_batch()
+    peers = [h for h in batch if h["metric"].endswith("_vs_peers")]
+
+    assert {h["id"] for h in peers} == {"peer_ctr_low_Laggard", "peer_cpc_high_Laggard"}
+    ctr = next(h for h in peers if h["metric"] == "ctr_vs_peers")
+    assert ctr["evidence"]["outlier_days"] == 15 and ctr["evidence"]["days"] == 30
+    assert ctr["evidence"]["median_z"] < -3.5
+
+    validated = EvaluatorAgent(_frame(), {}).validate(batch)
+    by_id = {v["id"]: v for v in validated}
+    assert by_id["peer_ctr_low_Laggard"]["valid"]
+    # the dict path scores the same
+    assert EvaluatorAgent(_frame(), {}).validate(batch.to_dicts()) == validated.to_dicts()
+
+
+def test_disabled_by_empty_metric_list():
+    batch = InsightAgent(_frame(), {"peer_outlier_metrics": []}).candidate_batch()
+    assert not any(h["metric"].endswith("_vs_peers") for h in batch)
+
+
+def test_coordinator_finds_the_same_peer_outliers(tmp_path):
+    data = tmp_path / "ads.csv"
+    _frame().to_csv(data, index=False)
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(data_csv=str(data), work_queue_dir=str(tmp_path / "queue"), stage_cache=False,
+                  coordinator_shards=3, coordinator_workers=0)
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+
+    local = run_analysis("q", str(path), mode="local")
+    sharded = run_analysis("q", str(path), mode="coordinator")
+    peer_ids = lambda r: [h["id"] for h in r["candidates"] if h["id"].startswith("peer_")]
+    assert peer_ids(sharded) == peer_ids(local) == ["peer_ctr_low_Laggard", "peer_cpc_high_Laggard"]
@@ -0,0 +1,117 @@
+import sys
+import os
+import pandas as pd
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.report import ReportWriter, text_sparkline, svg_sparkline
+from src.agents.data_agent import DataAgent
+from src.agents.insight_agent import InsightAgent
+from src.agents.metric_store import MetricStore
+from src.run import main as run_main
+
+
+def _df():
+    return pd.DataFrame({
+        "campaign_name": ["A", "A", "A", "B|x", "B|x"],
+        "date": pd.to_datetime(["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-01", "2025-01-03"]),
+        "spend": [10.0, 20.0, 30.0, 5.0, 5.0],
+        "impressions": [1000.0, 1000.0, 1000.0, 500.0, 0.0],
+        "clicks": [30.0, 20.0, 10.0, 5.0, 0.0],
+        "purchases": [1.0, 1.0, 1.0, 0.0, 0.0],
+        "revenue": [20.0, 20.0, 20.0, 0.0, 0.0],
+    })
+
+
+def test_sparklines_handle_gaps():
+    assert text_sparkline([0.1, float("nan"), 0.3]) == "▁█"
+    assert text_sparkline([float("nan")]) == ""
+    svg = svg_sparkline([0.1, float("nan"), 0.3, 0.2])
+    assert svg.startswith("<svg") and "<circle" in svg and svg.count("<polyline") == 1
+
+
+def test_sections_are_streamed_before_close(tmp_path):
+    md, page = tmp_path / "report.md", tmp_path / "report.html"
+    agent = DataAgent(csv_path=None)
+    agent.df = _df()
+
+    report = ReportWriter(str(md), str(page))
+    report.header("Why <did> ROAS drop?")
+    report.data_section(agent.summary(), agent.campaign_series())
+
+    # data section is on disk while later stages are still running
+    text = (tmp_path / "report.md.tmp").read_text(encoding="utf-8")
+    assert not md.exists()
+    assert "## Campaign Trends" in text and "| B\\|x |" in text
+    assert "## Key Insights" not in text
+
+    report.insights_section([
+        {"hypothesis": "CTR is falling", "campaign": "A", "confidence": 0.8, "valid": True},
+        {"hypothesis": "ignored", "campaign": "B|x", "confidence": 0.1, "valid": False},
+    ])
+    report.creatives_section({"A": {"suggestions": ["Try <b>bold</b>"]}})
+    report.close()
+
+    text = md.read_text(encoding="utf-8")
+    assert "- **CTR is falling** (Campaign: A, Confidence: 0.80)" in text
+    assert "ignored" not in text
+    assert text.index("## Key Insights") < text.index("## Creative Recommendations")
+
+    page = page.read_text(encoding="utf-8")
+    assert page.count("<svg") == 2
+    assert "Why &lt;did&gt; ROAS drop?" in page and "Try &lt;b&gt;bold&lt;/b&gt;" in page
+    assert page.rstrip().endswith("</html>")
+    assert sorted(os.listdir(tmp_path)) == ["report.html", "report.md"]
+
+
+def test_failed_run_keeps_previous_report(tmp_path):
+    md = tmp_path / "report.md"
+    md.write_text("previous good report", encoding="utf-8")
+    try:
+        with ReportWriter(str(md)) as report:
+            report.header("Why did ROAS drop?")
+            raise RuntimeError("insights failed")
+    except RuntimeError:
+        pass
+    assert md.read_text(encoding="utf-8") == "previous good report"
+    assert os.listdir(tmp_path) == ["report.md"]
+
+
+def test_store_series_matches_frame_series(tmp_path):
+    agent = DataAgent(csv_path=None)
+    agent.df = _df()
+    from_frame = dict(agent.campaign_series())
+
+    agent.store = MetricStore.create(str(tmp_path / "store"), _df())
+    from_store = dict(agent.campaign_series())
+
+    assert from_frame.keys() == from_store.keys()
+    for k in from_frame:
+        pd.testing.assert_series_equal(pd.Series(from_frame[k]), pd.Series(from_store[k]))
+
+
+def test_run_failure_leaves_previous_report(tmp_path, monkeypatch):
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    md = tmp_path / "report.md"
+    config.update(
+        data_csv=os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv"),
+        stage_cache=False, run_log_json=False, logs_dir=str(tmp_path / "logs"),
+        report_file=str(md), output_dir=str(tmp_path),
+    )
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    md.write_text("previous good report", encoding="utf-8")
+
+    def fail(self, account_level=True):
+        raise RuntimeError("insights failed")
+
+    monkeypatch.setattr(InsightAgent, "candidate_batch", fail)
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    with pytest.raises(RuntimeError):
+        run_main("Why did ROAS drop?", str(path))
+    assert md.read_text(encoding="utf-8") == "previous good report"
+    assert not (tmp_path / "report.md.tmp").exists()
@@ -0,0 +1,120 @@
+import sys
+import os
+import io
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+
+from agents.data_agent import DataAgent, SchemaError
+from src.utils import retry
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+class FlakyFile(io.RawIOBase):
+    """Local file that raises OSError once, when a read first reaches byte `fail_at`."""
+
+    def __init__(self, path, state, seekable=True):
+        self.f = open(path, "rb")
+        self.state = state
+        self._seekable = seekable
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._seekable
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.f.seek(offset, whence)
+
+    def tell(self):
+        return self.f.tell()
+
+    def readinto(self, b):
+        pos = self.f.tell()
+        if not self.state["failed"] and pos + len(b) > self.state["fail_at"]:
+            self.state["failed"] = True
+            raise OSError("connection reset")
+        n = self.f.readinto(b)
+        self.state["bytes_read"] += n
+        return n
+
+    def close(self):
+        self.f.close()
+        super().close()
+
+
+class ListLogger:
+    def __init__(self):
+        self.events = []
+
+    def info(self, payload):
+        self.events.append(payload)
+
+    warning = error = info
+
+
+def _load(fail_at, seekable=True, chunksize=500):
+    size = os.path.getsize(DATA)
+    state = {"fail_at": fail_at, "failed": False, "bytes_read": 0}
+    logger = ListLogger()
+    agent = DataAgent(
+        DATA,
+        logger=logger,
+        config={"load_chunksize": chunksize},
+        opener=lambda path: io.BufferedReader(FlakyFile(path, state, seekable)),
+    )
+    df = retry(attempts=2, initial_delay=0.0, jitter=0.0)(agent.load)()
+    resumed = [e for e in logger.events if e.get("event") == "load_resumed"]
+    return df, state, resumed, size
+
+
+@pytest.mark.parametrize("seekable", [True, False])
+def test_retry_resumes_from_last_good_chunk(seekable):
+    expected = DataAgent(DATA).load()
+    df, state, resumed, size = _load(fail_at=int(os.path.getsize(DATA) * 0.7), seekable=seekable)
+
+    pd.testing.assert_frame_equal(df, expected)
+    assert state["failed"] and len(resumed) == 1
+    event = resumed[0]
+    assert event["rows_kept"] > 0 and event["rows_kept"] % 500 == 0
+    assert 0 < event["rows_reread"] < 500
+    assert event["offset"] + event["bytes_reread"] <= size
+    if seekable:
+        # the retry only reads the header and what follows the checkpoint
+        assert state["bytes_read"] < size + (size - event["offset"]) + 2 * io.DEFAULT_BUFFER_SIZE
+        assert state["bytes_read"] < 1.5 * size
+
+
+def test_failure_before_first_chunk_restarts_from_header():
+    df, state, resumed, _ = _load(fail_at=100)
+    assert state["failed"] and not resumed
+    assert len(df) == len(DataAgent(DATA).load())
+
+
+def test_summary_comes_from_chunk_partials():
+    chunked = DataAgent(DATA, config={"load_chunksize": 700})
+    chunked.load()
+    whole = DataAgent(DATA)
+    whole.load()
+    a, b = chunked.summary(), whole.summary()
+    assert chunked._partials is not None
+    for ra, rb in zip(a["campaign_summary"], b["campaign_summary"]):
+        assert ra["campaign_name"] == rb["campaign_name"]
+        assert ra["revenue"] == pytest.approx(rb["revenue"])
+
+
+def test_persistent_failure_still_raises():
+    state = {"fail_at": 0, "failed": False, "bytes_read": 0}
+
+    def opener(path):
+        state["failed"] = False  # fails on every attempt
+        return io.BufferedReader(FlakyFile(path, state))
+
+    agent = DataAgent(DATA, config={"load_chunksize": 500}, opener=opener)
+    with pytest.raises(SchemaError):
+        retry(attempts=2, initial_delay=0.0, jitter=0.0)(agent.load)()
@@ -0,0 +1,94 @@
+import sys
+import os
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.run_history import RunHistory, main as history_cli
+from src.run import main as run_main, new_run_id
+
+
+def _run_log(run_id, load_sec):
+    return {
+        "run_id": run_id,
+        "query": "q",
+        "start_time": f"2025-01-01T00:00:{run_id[-2:]}",
+        "end_time": f"2025-01-01T00:01:{run_id[-2:]}",
+        "steps": {
+            "data_agent": {"rows": 10},
+            "insight_agent": {"duration_sec": 0.5, "num_hypotheses": 2},
+            "evaluator": {"num_valid": 1},
+        },
+    }, {"timers": {"data_load": load_sec, "run.total": 2.0}, "counters": {"data.rows": 10}}
+
+
+def test_records_and_trends(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    validated = [
+        {"id": "h1", "hypothesis": "CTR dropped", "confidence": 0.8, "valid": True},
+        {"id": "h2", "hypothesis": "ROAS fell", "confidence": 0.2, "valid": False},
+    ]
+    creatives = {"A": {"suggestions": ["one", "two"]}}
+    with RunHistory(db, blobs=True) as history:
+        for i, t in enumerate([1.0, 1.0, 2.0, 2.0]):
+            run_log, metrics = _run_log(f"run-0{i}", t)
+            history.record_run(run_log, metrics, validated, creatives)
+        # re-recording a run replaces its rows
+        history.record_run(*_run_log("run-03", 2.0), validated, creatives)
+
+        trends = history.latency_trends()
+        assert trends["data_load"]["count"] == 4
+        assert trends["data_load"]["last"] == 2.0
+        assert trends["data_load"]["change"] == 1.0       # newer half twice as slow
+        assert trends["insight_agent"]["mean"] == 0.5     # falls back to run_log step durations
+
+        runs = history.recent_runs(2)
+        assert [r["run_id"] for r in runs] == ["run-03", "run-02"]
+        assert runs[0]["num_valid"] == 1
+
+        n = history.conn.execute("SELECT COUNT(*) FROM creatives WHERE run_id = 'run-03'").fetchone()[0]
+        assert n == 2
+        assert history.payload("run-01")["steps"]["evaluator"]["num_valid"] == 1
+
+    assert history_cli(["trends", "--db", db, "--step", "data_load"]) == 0
+    assert history_cli(["runs", "--db", str(tmp_path / "missing.sqlite")]) == 1
+
+
+def test_run_writes_history(tmp_path, monkeypatch):
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    out = tmp_path / "out"
+    config.update(
+        data_csv=os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv"),
+        run_history_db=str(tmp_path / "history.sqlite"),
+        run_log_json=False,
+        stage_cache=False,
+        logs_dir=str(tmp_path / "logs"),
+        insights_file=str(out / "insights.json"),
+        creatives_file=str(out / "creatives.json"),
+        report_file=str(out / "report.md"),
+        output_dir=str(out),
+    )
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+
+    run_main("Analyze ROAS drop", str(path))
+
+    assert os.listdir(tmp_path / "logs") == []
+    with RunHistory(str(tmp_path / "history.sqlite")) as history:
+        (run,) = history.recent_runs()
+        assert run["rows"] > 0
+        assert "data_load" in history.steps()
+        n = history.conn.execute("SELECT COUNT(*) FROM hypotheses").fetchone()[0]
+        assert n == run["num_candidates"]
+
+
+def test_runs_in_the_same_second_are_kept_apart(tmp_path):
+    ids = [new_run_id() for _ in range(2)]
+    assert ids[0] != ids[1]
+    with RunHistory(str(tmp_path / "history.sqlite")) as history:
+        for run_id in ids:
+            run_log, metrics = _run_log(run_id, 1.0)
+            history.record_run(run_log, metrics)
+        assert {r["run_id"] for r in history.recent_runs()} == set(ids)
@@ -53,3 +53,79 @@ def test_schema_extra_columns(tmp_path):
     # expect NO failure — only logging
     df_out = agent.load()
     assert "extra_column_123" in df_out.columns
+
+
+class _ListLogger:
+    def __init__(self):
+        self.events = []
+
+    def info(self, payload):
+        self.events.append(payload)
+
+    warning = error = info
+
+
+def _write_renamed(p):
+    pd.DataFrame({
+        "Campaign Name": ["A", "A"],
+        "Adset-Name": ["x", "x"],
+        "date": ["2025-01-01", "2025-01-02"],
+        "spend": [10, 20],
+        "impressions": [100, 200],
+        "clicks": [1, 2],
+        "CTR": [0.01, 0.01],
+        "purchases": [1, 1],
+        "revenue": [100, 150],
+        "roas": [10, 7.5],
+        "creative_type": ["img", "img"],
+        "creative_message": ["x", "y"],
+        "audience_type": ["broad", "broad"],
+        "platform": ["fb", "fb"],
+        "country": ["IN", "IN"],
+    }).to_csv(p, index=False)
+
+
+def test_schema_drift_map_renames_and_caches(tmp_path):
+    p = tmp_path / "renamed.csv"
+    _write_renamed(p)
+    config = {"schema_drift_mode": "map", "schema_mapping_cache": str(tmp_path / "mappings.json")}
+
+    first_log = _ListLogger()
+    df = DataAgent(str(p), logger=first_log, config=config).load()
+    assert {"campaign_name", "adset_name", "ctr"} <= set(df.columns)
+    assert "Campaign Name" not in df.columns
+    applied = [e for e in first_log.events if e.get("event") == "schema_mapping_applied"]
+    assert applied[0]["source"] == "detected"
+    assert applied[0]["mapping"]["Campaign Name"] == "campaign_name"
+
+    second_log = _ListLogger()
+    agent = DataAgent(str(p), logger=second_log, config=config)
+    agent._detect_drift = lambda cols: pytest.fail("drift detection should be skipped on a cache hit")
+    df2 = agent.load()
+    assert list(df2.columns) == list(df.columns)
+    applied = [e for e in second_log.events if e.get("event") == "schema_mapping_applied"]
+    assert applied[0]["source"] == "cache"
+    assert "time_saved_sec" in applied[0]
+    # the cache is published by rename; no temp files are left behind
+    assert sorted(os.listdir(tmp_path)) == ["mappings.json", "renamed.csv"]
+
+
+def test_schema_drift_map_applies_to_streaming_sketches(tmp_path):
+    p = tmp_path / "renamed.csv"
+    _write_renamed(p)
+    config = {"schema_drift_mode": "map", "schema_mapping_cache": str(tmp_path / "mappings.json"),
+              "aggregation_mode": "approx"}
+    agent = DataAgent(str(p), config=config)
+    assert agent.heavy_hitters()["campaign_name"] == ["A"]
+    assert agent.summary()["campaign_summary"][0]["spend"] == 30
+
+
+def test_schema_drift_map_still_fails_on_missing(tmp_path):
+    p = tmp_path / "missing.csv"
+    pd.DataFrame({"Campaign Name": ["A"], "adset_name": ["x"]}).to_csv(p, index=False)
+
+    agent = DataAgent(str(p), config={"schema_drift_mode": "map",
+                                      "schema_mapping_cache": str(tmp_path / "mappings.json")})
+    with pytest.raises(SchemaError):
+        agent.load()
+    assert not (tmp_path / "mappings.json").exists()
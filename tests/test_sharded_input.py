@@ -0,0 +1,69 @@
+import sys
+import os
+import json
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.data_agent import DataAgent
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+@pytest.fixture
+def partitioned(tmp_path):
+    """date=YYYY-MM-DD/part-N.csv layout; the date lives only in the directory name."""
+    df = pd.read_csv(DATA)
+    root = tmp_path / "export"
+    for day, g in df.groupby("date"):
+        d = root / f"date={day}"
+        d.mkdir(parents=True)
+        half = len(g) // 2
+        g.iloc[:half].drop(columns=["date"]).to_csv(d / "part-0.csv", index=False)
+        g.iloc[half:].drop(columns=["date"]).to_csv(d / "part-1.csv", index=False)
+    return root
+
+
+def _sorted(df):
+    cols = sorted(df.columns)
+    return df[cols].sort_values(["date", "campaign_name", "adset_name", "spend"]).reset_index(drop=True)
+
+
+def test_directory_matches_single_file(partitioned):
+    single = DataAgent(DATA)
+    sharded = DataAgent(str(partitioned), config={"read_workers": 4})
+
+    pd.testing.assert_frame_equal(_sorted(sharded.load()), _sorted(single.load()))
+
+    a, b = sharded.summary(), single.summary()
+    assert len(a["timeseries"]) == len(b["timeseries"])
+    for ra, rb in zip(a["timeseries"] + a["campaign_summary"], b["timeseries"] + b["campaign_summary"]):
+        assert ra.keys() == rb.keys()
+        for k, v in ra.items():
+            assert v == (pytest.approx(rb[k]) if isinstance(v, float) else rb[k])
+
+
+def test_date_window_prunes_without_opening(partitioned):
+    # a corrupt shard outside the window must never be opened
+    bad = partitioned / "date=2024-12-31"
+    bad.mkdir()
+    (bad / "part-0.csv").write_bytes(b"\x00\xff not a csv")
+
+    agent = DataAgent(str(partitioned), config={"date_window": {"start": "2025-01-01", "end": "2025-01-07"}})
+    df = agent.load()
+    assert df["date"].min() == pd.Timestamp("2025-01-01")
+    assert df["date"].max() == pd.Timestamp("2025-01-07")
+
+
+def test_glob_and_manifest(partitioned, tmp_path):
+    by_glob = DataAgent(str(partitioned / "date=2025-01-0*" / "part-*.csv")).load()
+
+    files = sorted(str(p.relative_to(tmp_path)) for p in partitioned.glob("date=2025-01-0*/part-*.csv"))
+    manifest = tmp_path / "files.json"
+    manifest.write_text(json.dumps(files))
+    by_manifest = DataAgent(str(manifest)).load()
+
+    pd.testing.assert_frame_equal(_sorted(by_glob), _sorted(by_manifest))
+    assert by_glob["date"].nunique() == 9
@@ -0,0 +1,93 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from agents.sketches import CountMinSketch, HyperLogLog, SpaceSaving, hash_keys
+from agents.data_agent import DataAgent
+from agents.insight_agent import InsightAgent
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def test_count_min_never_undercounts():
+    rng = np.random.default_rng(0)
+    keys = rng.integers(0, 5000, size=50000)
+    weights = rng.random(50000)
+    cms = CountMinSketch(epsilon=0.01, delta=0.01)
+    cms.add(hash_keys(keys), weights)
+
+    exact = pd.Series(weights).groupby(keys).sum()
+    est = cms.query(hash_keys(exact.index.to_numpy()))
+    assert (est >= exact.to_numpy() - 1e-9).all()
+    assert np.mean(est - exact.to_numpy() <= cms.error_bound) > 0.99
+
+
+def test_space_saving_keeps_heavy_hitters_across_chunks():
+    rng = np.random.default_rng(1)
+    heavy = np.repeat(["h1", "h2", "h3"], 2000)
+    tail = np.array([f"k{i}" for i in rng.integers(0, 20000, size=20000)])
+    keys = rng.permutation(np.concatenate([heavy, tail]))
+
+    ss = SpaceSaving(k=50)
+    for chunk in np.array_split(keys, 10):
+        ss.update(chunk, np.ones(len(chunk)))
+
+    top = [k for k, _, _ in ss.top(3)]
+    assert sorted(top) == ["h1", "h2", "h3"]
+    for key, count, err in ss.top(3):
+        assert count - err <= 2000 <= count
+
+
+def test_hyperloglog_within_error():
+    hll = HyperLogLog(error=0.02)
+    keys = np.array([f"creative-{i}" for i in range(100000)])
+    for chunk in np.array_split(keys, 7):
+        hll.add(hash_keys(chunk))
+        hll.add(hash_keys(chunk[:100]))  # duplicates must not count
+    assert abs(hll.count() - 100000) / 100000 < 4 * hll.error
+
+
+def test_approx_mode_summary_and_focus():
+    agent = DataAgent(DATA, config={"aggregation_mode": "approx", "approx_top_k": 20, "approx_chunksize": 500})
+    df = agent.load()
+    summary = agent.summary()
+
+    exact = df.groupby("date")["spend"].sum()
+    assert [r["spend"] for r in summary["timeseries"]] == pytest.approx(list(exact.to_numpy()))
+    assert abs(summary["levels"]["campaign_name"]["distinct"] - df["campaign_name"].nunique()) <= 10
+    top_exact = df.groupby("adset_name")["spend"].sum().nlargest(3).index.tolist()
+    assert [r["key"] for r in summary["levels"]["adset_name"]["top_spend"][:3]] == top_exact
+
+    focus = agent.heavy_hitters()["campaign_name"]
+    trends = InsightAgent(df, focus=focus)._metric_trend("ctr")
+    assert trends and {t["campaign"] for t in trends} <= set(focus)
+
+
+def test_approx_load_keeps_only_focus_rows():
+    config = {"aggregation_mode": "approx", "approx_top_k": 5, "approx_chunksize": 500}
+    opened = []
+
+    def opener(path):
+        opened.append(path)
+        return open(path, "rb")
+
+    agent = DataAgent(DATA, config=config, opener=opener)
+    df = agent.load_focus()
+    focus = agent.heavy_hitters()["campaign_name"]
+    # one sketch pass plus one filtered pass; the full frame is never built
+    assert len(opened) == 2
+    assert set(df["campaign_name"]) == set(focus)
+
+    full = DataAgent(DATA).load()
+    assert len(df) == full["campaign_name"].isin(focus).sum()
+    assert agent.summary()["mode"] == "approx"
+
+    # the account-level correlation still sees every campaign via the exact daily totals
+    exact = InsightAgent(full)._roas_spend_correlation()
+    focused = InsightAgent(df, focus=focus, daily=agent.daily_totals)._roas_spend_correlation()
+    assert focused == pytest.approx(exact)
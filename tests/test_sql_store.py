@@ -0,0 +1,160 @@
+import sys
+import os
+import pandas as pd
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+
+from agents.data_agent import DataAgent, SchemaError
+from agents.insight_agent import InsightAgent
+from agents.metric_store import MetricStore
+from agents.sql_store import SqlStore
+from src.orchestrator import run_analysis
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def _records_close(a, b):
+    assert len(a) == len(b)
+    for ra, rb in zip(a, b):
+        assert ra.keys() == rb.keys()
+        for k in ra:
+            if isinstance(ra[k], float):
+                assert ra[k] == pytest.approx(rb[k])
+            else:
+                assert ra[k] == rb[k]
+
+
+def _sqlite_agent(tmp_path, **config):
+    config = {"execution_backend": "sqlite", "sqlite_path": str(tmp_path / "m.sqlite"), **config}
+    agent = DataAgent(DATA, config=config)
+    agent.load()
+    return agent
+
+
+def test_sql_summary_matches_frame(tmp_path):
+    agent = _sqlite_agent(tmp_path, sqlite_batch_rows=1000)
+    assert isinstance(agent.store, SqlStore)
+    # the rows went straight from the chunked parse into the database
+    assert agent.df is None
+    from_sql = agent.summary()
+
+    pandas_agent = DataAgent(DATA)
+    pandas_agent.load()
+    from_frame = pandas_agent.summary()
+
+    _records_close(from_sql["timeseries"], from_frame["timeseries"])
+    _records_close(from_sql["campaign_summary"], from_frame["campaign_summary"])
+
+
+def test_queries_use_index_and_return_aggregates(tmp_path):
+    store = _sqlite_agent(tmp_path).store
+    indexes = [r[0] for r in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+    assert "idx_rows_campaign_day" in indexes
+    plan = " ".join(str(r) for r in store.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT campaign_name, TOTAL(spend) FROM rows GROUP BY campaign_name"))
+    assert "idx_rows_campaign_day" in plan
+
+    totals = store.campaign_totals(("impressions", "clicks"))
+    assert list(totals["campaign_name"]) == store.campaigns
+    assert len(store.daily_totals(("spend", "revenue"))) <= store.n_days
+    assert (totals["first_date"] <= totals["last_date"]).all()
+
+
+def test_matrices_match_metric_store(tmp_path):
+    sql = _sqlite_agent(tmp_path).store
+    agent = DataAgent(DATA)
+    agent.load()
+    mem = MetricStore.create(str(tmp_path / "store"), agent.df)
+
+    assert sorted(mem.campaigns) == sql.campaigns and sql.n_days == mem.n_days
+    for m in SqlStore.METRICS:
+        pd.testing.assert_frame_equal(
+            pd.DataFrame(sql.matrix(m), index=sql.campaigns),
+            pd.DataFrame(mem.matrix(m), index=mem.campaigns).loc[sql.campaigns],
+            check_dtype=False, rtol=1e-5,
+        )
+
+
+def test_sqlite_load_returns_the_stored_rows(tmp_path):
+    agent = DataAgent(DATA, config={"execution_backend": "sqlite", "sqlite_path": str(tmp_path / "m.sqlite"),
+                                    "sqlite_batch_rows": 1000})
+    rows = agent.load()
+    full = DataAgent(DATA).load()
+
+    assert list(rows.columns) == list(SqlStore.ROW_COLUMNS)
+    pd.testing.assert_frame_equal(rows, full[list(SqlStore.ROW_COLUMNS)], check_dtype=False)
+    assert agent.daily_totals["spend"].to_numpy() == pytest.approx(full.groupby("date")["spend"].sum().to_numpy())
+
+
+def test_backends_produce_the_same_creatives(tmp_path):
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(data_csv=DATA, stage_cache=False, creative_fatigue=True, sqlite_dir=str(tmp_path / "db"))
+    results = {}
+    for backend in ("pandas", "sqlite"):
+        path = tmp_path / f"{backend}.yaml"
+        path.write_text(yaml.safe_dump({**config, "execution_backend": backend}))
+        results[backend] = run_analysis("Why did ROAS drop?", str(path), use_cache=False)
+
+    assert results["sqlite"]["creatives"] == results["pandas"]["creatives"]
+    assert [v["id"] for v in results["sqlite"]["validated"]] == [v["id"] for v in results["pandas"]["validated"]]
+
+
+def test_insights_match_pandas_path(tmp_path):
+    agent = DataAgent(DATA, config={"execution_backend": "sqlite", "sqlite_path": str(tmp_path / "m.sqlite")})
+    via_sql = InsightAgent(agent.load(), {}, store=agent.store).generate_candidates()
+    via_frame = InsightAgent(DataAgent(DATA).load(), {}).generate_candidates()
+
+    assert [h["id"] for h in via_sql] == [h["id"] for h in via_frame]
+    for a, b in zip(via_sql, via_frame):
+        _records_close([a.get("evidence", {})], [b.get("evidence", {})])
+
+
+def test_database_reused_for_same_input(tmp_path):
+    first = _sqlite_agent(tmp_path).store
+    first.conn.execute("INSERT INTO meta VALUES ('marker', '1')")
+    first.conn.commit()
+    opened = []
+    reuse = DataAgent(DATA, config={"execution_backend": "sqlite", "sqlite_path": str(tmp_path / "m.sqlite")},
+                      opener=lambda path: opened.append(path) or open(path, "rb"))
+    reuse.load()
+    second = reuse.store
+    assert second.conn.execute("SELECT value FROM meta WHERE key = 'marker'").fetchone() == ("1",)
+    assert opened == []  # the input is not parsed again
+
+    rebuilt = SqlStore.create(str(tmp_path / "m.sqlite"), DataAgent(DATA).load().head(100), source="other")
+    assert rebuilt.source == "other"
+    assert rebuilt.conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0] == 100
+
+
+def test_failed_load_leaves_no_database(tmp_path):
+    bad = tmp_path / "bad.csv"
+    df = pd.read_csv(DATA)
+    df["spend"] = None
+    df.to_csv(bad, index=False)
+
+    db_dir = tmp_path / "db"
+    agent = DataAgent(str(bad), config={"execution_backend": "sqlite", "sqlite_dir": str(db_dir),
+                                        "sqlite_batch_rows": 1000})
+    with pytest.raises(SchemaError):
+        agent.load()
+    assert list(db_dir.iterdir()) == []
+
+
+def test_default_database_is_per_input(tmp_path):
+    other = tmp_path / "other.csv"
+    pd.read_csv(DATA).head(500).to_csv(other, index=False)
+
+    db_dir = tmp_path / "db"
+    paths = []
+    for path in (DATA, str(other)):
+        agent = DataAgent(path, config={"execution_backend": "sqlite", "sqlite_dir": str(db_dir)})
+        agent.load()
+        paths.append(agent.store.path)
+        assert os.path.basename(agent.store.path) == f"{agent.fingerprint()}.sqlite"
+    assert paths[0] != paths[1]
+    assert sorted(p.name for p in db_dir.iterdir()) == sorted(os.path.basename(p) for p in paths)
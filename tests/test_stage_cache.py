@@ -0,0 +1,110 @@
+import sys
+import os
+import shutil
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.orchestrator import run_analysis
+from src.stage_cache import StageCache
+from src.utils import Metrics
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def _config(tmp_path, data, **overrides):
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(data_csv=str(data), stage_cache_dir=str(tmp_path / "stages"), **overrides)
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+
+def test_keys_follow_inputs():
+    cache = StageCache(enabled=False)
+    base = cache.key("evaluation", {"confidence_min": 0.6}, upstream="abc")
+    assert base == cache.key("evaluation", {"confidence_min": 0.6, "insight_workers": 8}, upstream="abc")
+    assert base != cache.key("evaluation", {"confidence_min": 0.7}, upstream="abc")
+    assert base != cache.key("evaluation", {"confidence_min": 0.6}, upstream="abd")
+
+    creatives = cache.key("creatives", {"creative_fatigue": True}, upstream="abc")
+    assert creatives != cache.key("creatives", {"creative_fatigue": False}, upstream="abc")
+    assert creatives != cache.key("creatives", {"creative_fatigue": True, "creative_fatigue_min_t": 3.0}, upstream="abc")
+
+    # float32 downcasting changes the frame the insights are computed from
+    insights = cache.key("insights", {}, fingerprint="f")
+    assert insights != cache.key("insights", {"compact_dtypes": True}, fingerprint="f")
+    assert insights != cache.key("insights", {"max_memory_mb": 64}, fingerprint="f")
+    assert insights != cache.key("insights", {"execution_backend": "sqlite"}, fingerprint="f")
+    assert insights != cache.key("insights", {"memory_plan_chunksize": 1000}, fingerprint="f")
+
+
+def test_second_run_hits_every_stage(tmp_path):
+    data = tmp_path / "ads.csv"
+    shutil.copy(DATA, data)
+    config = _config(tmp_path, data)
+
+    cold, warm = Metrics(), Metrics()
+    first = run_analysis("q", config, metrics=cold)
+    second = run_analysis("q", config, metrics=warm)
+
+    assert cold.counters == {"cache.miss": 3, "cache.insights.miss": 1, "cache.evaluation.miss": 1,
+                             "cache.creatives.miss": 1}
+    assert warm.counters == {"cache.hit": 3, "cache.insights.hit": 1, "cache.evaluation.hit": 1,
+                             "cache.creatives.hit": 1}
+    assert [v["id"] for v in second["validated"]] == [v["id"] for v in first["validated"]]
+    assert second["creatives"] == first["creatives"]
+
+    # a config change only invalidates the stages that read it
+    changed = Metrics()
+    run_analysis("q", _config(tmp_path, data, confidence_min=0.9), metrics=changed)
+    assert changed.counters["cache.insights.hit"] == 1
+    assert changed.counters["cache.evaluation.miss"] == 1
+    assert changed.counters["cache.creatives.miss"] == 1
+
+    # rewriting the data invalidates everything
+    os.utime(data, ns=(0, 0))
+    stale = Metrics()
+    run_analysis("q", config, metrics=stale)
+    assert stale.counters["cache.miss"] == 3
+
+    # --no-cache bypasses lookups altogether
+    bypass = Metrics()
+    run_analysis("q", config, use_cache=False, metrics=bypass)
+    assert bypass.counters == {}
+
+
+def test_lru_eviction(tmp_path):
+    metrics = Metrics()
+    cache = StageCache(str(tmp_path), max_mb=0.002, metrics=metrics)  # ~2 KB
+    payload = ["x" * 500]
+
+    for i in range(3):
+        cache.put("insights", f"{i:064d}", payload)
+        os.utime(cache._path(f"{i:064d}"), (1000 + i, 1000 + i))
+    assert cache.get("insights", f"{0:064d}")[0]       # touching 0 makes it recent
+
+    cache.put("insights", f"{3:064d}", payload)
+    assert cache.get("insights", f"{1:064d}") == (False, None)  # least recently used went first
+    assert cache.get("insights", f"{3:064d}")[0]
+    assert metrics.counters["cache.evicted"] >= 1
+
+
+def test_code_version_covers_stage_modules(monkeypatch, tmp_path):
+    import src.stage_cache as stage_cache
+
+    (tmp_path / "agents").mkdir()
+    (tmp_path / "agents" / "a.py").write_text("x = 1\n")
+    for name in stage_cache._STAGE_MODULES:
+        (tmp_path / name).write_text("")
+    monkeypatch.setattr(stage_cache, "_SRC_DIR", str(tmp_path))
+    monkeypatch.setattr(stage_cache, "_AGENTS_DIR", str(tmp_path / "agents"))
+
+    stage_cache.code_version.cache_clear()
+    before = stage_cache.code_version()
+    (tmp_path / "orchestrator.py").write_text("# focus selection changed\n")
+    stage_cache.code_version.cache_clear()
+    assert stage_cache.code_version() != before
+    stage_cache.code_version.cache_clear()
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PY = os.path.join(ROOT, "src", "run.py")
+
+
+def test_run_module_import_is_light():
+    code = (
+        "import sys; sys.path.insert(0, 'src'); import run; "
+        "heavy = [m for m in ('pandas', 'numpy', 'sklearn', 'yaml', 'src.agents.data_agent') if m in sys.modules]; "
+        "print(','.join(heavy))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_help_runs():
+    out = subprocess.run([sys.executable, RUN_PY, "--help"], capture_output=True, text=True, check=True)
+    assert "query" in out.stdout
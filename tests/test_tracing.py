@@ -0,0 +1,130 @@
+import sys
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.agents.data_agent import DataAgent
+from src.agents.tracing import NULL_TRACER, Tracer, from_config
+from src.orchestrator import run_analysis
+from src.utils import save_json
+
+DATA = os.path.join(ROOT, "data", "synthetic_fb_ads_undergarments.csv")
+
+
+def _spans(tracer, name):
+    return [e for e in tracer.events if e["name"] == name]
+
+
+def _inside(child, parent):
+    return (child["tid"] == parent["tid"] and child["ts"] >= parent["ts"]
+            and child["ts"] + child["dur"] <= parent["ts"] + parent["dur"] + 1e-3)
+
+
+def test_load_spans_nest_and_export_as_chrome_trace(tmp_path):
+    tracer = Tracer()
+    DataAgent(DATA, tracer=tracer).load()
+
+    load = _spans(tracer, "data.load")[0]
+    assert load["args"]["rows"] > 0 and load["ph"] == "X" and load["pid"] == os.getpid()
+    for name in ("data.parse", "data.validate_columns", "data.clean", "data.validate_profile"):
+        assert _inside(_spans(tracer, name)[0], load), name
+
+    path = tracer.export(str(tmp_path / "trace.json"))
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    names = {e["name"] for e in doc["traceEvents"]}
+    assert {"process_name", "thread_name", "data.load"} <= names
+    ts = [e["ts"] for e in doc["traceEvents"] if e["ph"] == "X"]
+    assert ts == sorted(ts)
+
+
+def test_threads_and_sampling():
+    tracer = Tracer(sample_rate=0.0)
+
+    def work(i):
+        with tracer.span("group", sampled=True, i=i):
+            pass
+        with tracer.span("task", i=i):
+            return threading.get_native_id()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        tids = set(pool.map(work, range(32)))
+    assert not _spans(tracer, "group")
+    assert {e["tid"] for e in _spans(tracer, "task")} == tids
+
+    tracer = Tracer(sample_rate=0.5, seed=1)
+    for i in range(1000):
+        with tracer.span("group", sampled=True):
+            pass
+    assert 400 < len(tracer.events) < 600
+
+
+def test_failed_span_is_recorded_with_error():
+    tracer = Tracer()
+    try:
+        with tracer.span("boom"):
+            raise KeyError("x")
+    except KeyError:
+        pass
+    assert tracer.events[0]["args"]["error"] == "KeyError"
+
+
+def test_disabled_tracing_records_nothing(tmp_path):
+    assert from_config({"trace_file": None}) is NULL_TRACER
+    assert from_config({"trace_file": "t.json"}).enabled
+    DataAgent(DATA, tracer=NULL_TRACER).load()
+    assert list(NULL_TRACER.events) == [] and NULL_TRACER.export(str(tmp_path / "t.json")) is None
+
+    tracer = Tracer()
+    save_json({"a": 1}, str(tmp_path / "out.json"), tracer=tracer)
+    outer = _spans(tracer, "save_json")[0]
+    assert _inside(_spans(tracer, "save_json.write")[0], outer)
+
+
+def test_pipeline_spans_cover_every_agent(tmp_path):
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(data_csv=DATA, stage_cache=False)
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+
+    tracer = Tracer()
+    result = run_analysis("Why did ROAS drop?", str(path), tracer=tracer)
+    names = {e["name"] for e in tracer.events}
+    assert {"data.load", "data.summary", "insights", "insights.trend", "insights.fit",
+            "evaluate", "creatives", "creatives.campaign"} <= names
+    assert _inside(_spans(tracer, "insights.fit")[0], _spans(tracer, "insights.trend")[0])
+    assert len(_spans(tracer, "creatives.campaign")) == len(result["creatives"])
+
+
+def test_failed_run_still_exports_trace(tmp_path, monkeypatch):
+    from src.agents.insight_agent import InsightAgent
+    from src.run import main as run_main
+
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    trace = tmp_path / "trace.json"
+    config.update(
+        data_csv=DATA, stage_cache=False, run_log_json=False, logs_dir=str(tmp_path / "logs"),
+        report_file=str(tmp_path / "report.md"), output_dir=str(tmp_path), trace_file=str(trace),
+    )
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+
+    def fail(self, account_level=True):
+        raise RuntimeError("insights failed")
+
+    monkeypatch.setattr(InsightAgent, "candidate_batch", fail)
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    with pytest.raises(RuntimeError):
+        run_main("Why did ROAS drop?", str(path))
+    with open(trace, encoding="utf-8") as f:
+        events = {e["name"]: e for e in json.load(f)["traceEvents"]}
+    assert events["run"]["args"]["error"] == "RuntimeError"
+    assert "data.load" in events